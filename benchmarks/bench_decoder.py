@@ -0,0 +1,49 @@
+"""Compare parse throughput of the installed JSON decoder backends
+
+Usage:
+    python benchmarks/bench_decoder.py [--lines 50000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from corpus import write_corpus  # noqa: E402
+from sumonitor.data.decoder import available_decoders  # noqa: E402
+from sumonitor.data.log_reader import LogReader  # noqa: E402
+
+def run(jsonl_file: Path, decoder: str, prefilter: bool) -> float:
+    """Seconds to parse the corpus once with a fresh LogReader"""
+    reader = LogReader(decoder=decoder, prefilter=prefilter)
+    with patch.object(reader, "get_jsonl_files", return_value=[jsonl_file]):
+        start = time.perf_counter()
+        reader.parse_json_files()
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_file = Path(tmp) / "session.jsonl"
+        size = write_corpus(jsonl_file, args.lines)
+        print(f"corpus: {args.lines} lines, {size / 1e6:.1f} MB")
+
+        for prefilter in (False, True):
+            print(f"prefilter={prefilter}")
+            baseline = None
+            for decoder in reversed(available_decoders()):
+                best = min(run(jsonl_file, decoder, prefilter) for _ in range(args.repeat))
+                baseline = baseline or best
+                print(f"{decoder:>10}: {best:.3f}s  {args.lines / best:,.0f} lines/s  "
+                      f"{size / best / 1e6:.0f} MB/s  {baseline / best:.1f}x")
+
+if __name__ == "__main__":
+    main()
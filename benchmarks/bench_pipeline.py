@@ -0,0 +1,171 @@
+"""Time every stage from log parsing to the drawn overlay on a generated corpus
+
+Stages: cold parse (fresh LogReader over every file), warm tick (parse lines
+appended to one file since the last tick), session build (SessionTracker over
+all entries) and overlay render (snapshot, format and escape sequence). Each
+stage reports its timings and the peak memory tracemalloc saw while it ran
+once more; results can be written as JSON and compared against an older run.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--files 10] [--lines 2000] [--repeat 5]
+                                        [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from corpus import CorpusSpec, add_corpus_arguments, generate_corpus, spec_from_args, transcript_line  # noqa: E402
+from sumonitor.data.log_reader import LogReader  # noqa: E402
+from sumonitor.data.log_watcher import PollingWatcher  # noqa: E402
+from sumonitor.session.session_tracker import SessionTracker  # noqa: E402
+from sumonitor.terminal.terminal_handler import TerminalHandler  # noqa: E402
+
+# overlay renders are microseconds, time batches of this many
+RENDERS_PER_SAMPLE = 1000
+
+def new_reader(files: List[Path], workers: int) -> LogReader:
+    reader = LogReader(scan_workers=workers)
+    reader.get_jsonl_files = lambda *args, **kwargs: files
+    return reader
+
+def append_lines(jsonl_file: Path, count: int, spec: CorpusSpec, start: int) -> None:
+    """Append count new usage-era lines, as Claude does during a turn"""
+    rng = random.Random(start)
+    now = datetime.now(timezone.utc)
+    with open(jsonl_file, "a") as f:
+        for i in range(start, start + count):
+            f.write(transcript_line(rng, i, now, spec.model_mix, spec.line_size) + "\n")
+
+def measure(stage: Callable[[], Callable[[], object]], repeat: int) -> Dict[str, object]:
+    """Run a stage repeat times and once more under tracemalloc
+
+        Args:
+            stage: returns the callable to time, so setup isn't measured
+
+        Returns:
+            Seconds per run, best and median, and the traced peak in bytes
+    """
+    seconds = []
+    for _ in range(repeat):
+        run = stage()
+        start = time.perf_counter()
+        run()
+        seconds.append(time.perf_counter() - start)
+    run = stage()
+    tracemalloc.start()
+    try:
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": seconds, "best": min(seconds), "median": statistics.median(seconds),
+            "peak_bytes": peak}
+
+def run_pipeline(files: List[Path], spec: CorpusSpec, repeat: int, workers: int,
+                 tick_lines: int) -> Dict[str, Dict[str, object]]:
+    results = {}
+    results["cold_parse"] = measure(lambda: new_reader(files, workers).parse_json_files, repeat)
+
+    warm = new_reader(files, 1)
+    entries = warm.parse_json_files()
+    appended = [spec.lines]
+    def warm_tick():
+        append_lines(files[-1], tick_lines, spec, appended[0])
+        appended[0] += tick_lines
+        return warm.parse_new_entries
+    results["warm_tick"] = measure(warm_tick, repeat)
+
+    results["session_build"] = measure(lambda: lambda: SessionTracker().build_sessions(entries), repeat)
+
+    tracker = SessionTracker()
+    tracker.build_sessions(entries)
+    with tempfile.TemporaryDirectory() as empty:
+        handler = TerminalHandler(warm, pexpect_obj=None, watcher=PollingWatcher(empty), threaded=False)
+    handler.session_tracker = tracker
+    def render():
+        for _ in range(RENDERS_PER_SAMPLE):
+            # force a full redraw, the worst case
+            handler.last_frame = None
+            text = handler.format_overlay(handler.build_snapshot(refresh=False))
+            handler.render_frame(text[:120], 40, 120)
+    render_result = measure(lambda: render, repeat)
+    # per render, the peak stays that of a whole batch
+    for key in ("best", "median"):
+        render_result[key] /= RENDERS_PER_SAMPLE
+    render_result["seconds"] = [s / RENDERS_PER_SAMPLE for s in render_result["seconds"]]
+    results["overlay_render"] = render_result
+    return results
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1, help="scan workers for the cold parse")
+    parser.add_argument("--tick-lines", type=int, default=10, help="lines appended before each warm tick")
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+    spec = spec_from_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = generate_corpus(Path(tmp), spec)
+        size = sum(f.stat().st_size for f in files)
+        print(f"corpus: {spec.files} files in {spec.projects} projects, "
+              f"{spec.files * spec.lines} lines, {size / 1e6:.1f} MB")
+        stages = run_pipeline(files, spec, args.repeat, args.workers, args.tick_lines)
+
+    baseline = json.loads(args.compare.read_text())["stages"] if args.compare else {}
+    for name, result in stages.items():
+        line = (f"{name:>15}: median {format_seconds(result['median']):>9}  "
+                f"best {format_seconds(result['best']):>9}  peak {result['peak_bytes'] / 1e6:.1f} MB")
+        if name in baseline:
+            line += f"  {baseline[name]['median'] / result['median']:.2f}x vs baseline"
+        print(line)
+
+    if args.output:
+        results = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "corpus": {**vars(spec), "bytes": size},
+            "repeat": args.repeat,
+            "workers": args.workers,
+            "tick_lines": args.tick_lines,
+            "stages": stages,
+            # kilobytes on Linux
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare parse throughput with and without the byte level line pre-filter and mmap reads
+
+Each installed JSON decoder is measured separately, the prefilter saves less
+when decoding is already cheap.
+
+Usage:
+    python benchmarks/bench_prefilter.py [--lines 50000] [--repeat 3] [--decoder json]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from corpus import write_corpus  # noqa: E402
+from sumonitor.data.decoder import available_decoders  # noqa: E402
+from sumonitor.data.log_reader import LogReader  # noqa: E402
+
+def run(jsonl_file: Path, decoder: str, prefilter: bool, use_mmap: bool) -> float:
+    """Seconds to parse the corpus once with a fresh LogReader"""
+    reader = LogReader(prefilter=prefilter, decoder=decoder)
+    mmap_min = 0 if use_mmap else float("inf")
+    with patch("sumonitor.data.log_reader.MMAP_MIN_BYTES", mmap_min), \
+         patch.object(reader, "get_jsonl_files", return_value=[jsonl_file]):
+        start = time.perf_counter()
+        reader.parse_json_files()
+        return time.perf_counter() - start
+
+def peak_memory(jsonl_file: Path, decoder: str, prefilter: bool, use_mmap: bool) -> int:
+    """Peak bytes allocated by Python while parsing the corpus once"""
+    tracemalloc.start()
+    try:
+        run(jsonl_file, decoder, prefilter, use_mmap)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--decoder", action="append", choices=available_decoders(),
+                        help="Decoder to measure, repeatable (default: every installed one)")
+    args = parser.parse_args()
+    decoders = args.decoder or list(reversed(available_decoders()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_file = Path(tmp) / "session.jsonl"
+        size = write_corpus(jsonl_file, args.lines)
+        print(f"corpus: {args.lines} lines, {size / 1e6:.1f} MB")
+
+        for decoder in decoders:
+            print(f"decoder={decoder}")
+            baseline = None
+            for label, prefilter, use_mmap in (
+                ("decode every line", False, False),
+                ("prefilter", True, False),
+                ("prefilter + mmap", True, True),
+            ):
+                best = min(run(jsonl_file, decoder, prefilter, use_mmap) for _ in range(args.repeat))
+                baseline = baseline or best
+                peak = peak_memory(jsonl_file, decoder, prefilter, use_mmap)
+                print(f"{label:>18}: {best:.3f}s  {args.lines / best:,.0f} lines/s  "
+                      f"{size / best / 1e6:.0f} MB/s  {baseline / best:.2f}x  peak {peak / 1e6:.0f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare a cold start parse on one core against the process pool scan
+
+Usage:
+    python benchmarks/bench_scan.py [--files 200] [--lines 2000] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from corpus import write_corpus  # noqa: E402
+from sumonitor.data.log_reader import LogReader  # noqa: E402
+
+def run(files, workers: int) -> float:
+    """Seconds for a fresh LogReader to parse every file"""
+    reader = LogReader(scan_workers=workers)
+    with patch.object(reader, "get_jsonl_files", return_value=files):
+        start = time.perf_counter()
+        reader.parse_json_files()
+        return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=2000, help="lines per file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files, size = [], 0
+        for i in range(args.files):
+            project = Path(tmp) / f"project-{i % 20}"
+            project.mkdir(exist_ok=True)
+            jsonl_file = project / f"session-{i}.jsonl"
+            size += write_corpus(jsonl_file, args.lines, seed=i)
+            files.append(jsonl_file)
+        print(f"corpus: {args.files} files, {args.files * args.lines} lines, {size / 1e6:.0f} MB")
+
+        baseline = run(files, 1)
+        print(f"{'1 process':>12}: {baseline:.2f}s  {size / baseline / 1e6:.0f} MB/s")
+        elapsed = run(files, args.workers)
+        print(f"{f'{args.workers} workers':>12}: {elapsed:.2f}s  {size / elapsed / 1e6:.0f} MB/s  "
+              f"{baseline / elapsed:.1f}x")
+
+if __name__ == "__main__":
+    main()
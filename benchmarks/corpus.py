@@ -0,0 +1,152 @@
+"""Synthetic Claude Code transcript corpus shared by the benchmarks
+
+Usage:
+    python benchmarks/corpus.py OUTPUT_DIR [--projects 4] [--files 10] [--lines 2000]
+                                [--line-size 1.0] [--models sonnet=0.6,opus=0.3,haiku=0.1]
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+MODELS = {
+    "sonnet": "claude-sonnet-4-5-20250929",
+    "opus": "claude-opus-4-5-20251101",
+    "haiku": "claude-haiku-4-5",
+}
+
+@dataclass
+class CorpusSpec:
+    """Shape of a generated corpus
+
+    files are spread round robin over projects, every file has lines lines
+    covering the last days days. line_size scales the text, tool output and
+    prompt lengths, model_mix maps model ids to relative weights.
+    """
+    projects: int = 4
+    files: int = 10
+    lines: int = 2000
+    line_size: float = 1.0
+    days: float = 4.0
+    model_mix: Dict[str, float] = field(
+        default_factory=lambda: {MODELS["sonnet"]: 0.6, MODELS["opus"]: 0.3, MODELS["haiku"]: 0.1})
+    seed: int = 0
+
+def parse_model_mix(value: str) -> Dict[str, float]:
+    """Parse "sonnet=0.6,opus=0.4" (short names or full model ids) into weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[MODELS.get(name.strip(), name.strip())] = float(weight or 1)
+    return mix
+
+def transcript_line(rng: random.Random, i: int, timestamp: datetime,
+                    model_mix: Dict[str, float] = None, line_size: float = 1.0) -> str:
+    """One line shaped like Claude Code's transcripts: user turns, large tool
+    results and summaries without usage, and assistant turns with usage"""
+    model_mix = model_mix or CorpusSpec().model_mix
+    size = lambda low, high: max(1, int(rng.randint(low, high) * line_size))
+    base = {
+        "parentUuid": f"uuid-{i - 1}",
+        "isSidechain": False,
+        "userType": "external",
+        "cwd": "/home/dev/project",
+        "sessionId": "0f6c1f3e-session",
+        "version": "2.0.0",
+        "gitBranch": "main",
+    }
+    kind = rng.random()
+    if kind < 0.35:
+        base.update({
+            "message": {
+                "id": f"msg_{i}",
+                "type": "message",
+                "role": "assistant",
+                "model": rng.choices(list(model_mix), weights=list(model_mix.values()))[0],
+                "content": [{"type": "text", "text": "x" * size(200, 2000)}],
+                "usage": {
+                    "input_tokens": rng.randint(1, 5000),
+                    "output_tokens": rng.randint(1, 2000),
+                    "cache_creation_input_tokens": rng.randint(0, 20000),
+                    "cache_read_input_tokens": rng.randint(0, 100000),
+                },
+            },
+            "requestId": f"req_{i}",
+            "type": "assistant",
+        })
+    elif kind < 0.75:
+        # tool results carry whole file contents and command output
+        base.update({
+            "message": {"role": "user", "content": [{
+                "type": "tool_result",
+                "tool_use_id": f"toolu_{i}",
+                "content": "line of output\n" * size(100, 3000),
+            }]},
+            "type": "user",
+        })
+    elif kind < 0.95:
+        base.update({"message": {"role": "user", "content": "please " * size(5, 60)}, "type": "user"})
+    else:
+        base.update({"type": "summary", "summary": "Refactor parser " * 5})
+    base["uuid"] = f"uuid-{i}"
+    base["timestamp"] = timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    return json.dumps(base, separators=(",", ":"))
+
+def write_corpus(path: Path, lines: int, seed: int = 0, days: float = 4.0,
+                 model_mix: Dict[str, float] = None, line_size: float = 1.0) -> int:
+    """Write a transcript spanning the last days days and return its size in bytes"""
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    step = timedelta(days=days) / lines
+    with open(path, "w") as f:
+        for i in range(lines):
+            f.write(transcript_line(rng, i, start + step * i, model_mix, line_size) + "\n")
+    return path.stat().st_size
+
+def generate_corpus(root: Path, spec: CorpusSpec) -> List[Path]:
+    """Write spec.files transcripts under root/project-N/ and return their paths"""
+    files = []
+    for i in range(spec.files):
+        project = Path(root) / f"project-{i % spec.projects}"
+        project.mkdir(parents=True, exist_ok=True)
+        jsonl_file = project / f"session-{i}.jsonl"
+        write_corpus(jsonl_file, spec.lines, seed=spec.seed + i, days=spec.days,
+                     model_mix=spec.model_mix, line_size=spec.line_size)
+        files.append(jsonl_file)
+    return files
+
+def add_corpus_arguments(parser: argparse.ArgumentParser) -> None:
+    """Corpus shape options shared by the benchmark scripts"""
+    defaults = CorpusSpec()
+    parser.add_argument("--projects", type=int, default=defaults.projects)
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--lines", type=int, default=defaults.lines, help="lines per file")
+    parser.add_argument("--line-size", type=float, default=defaults.line_size,
+                        help="multiplier for message and tool output lengths")
+    parser.add_argument("--days", type=float, default=defaults.days,
+                        help="time span covered by each file")
+    parser.add_argument("--models", type=parse_model_mix, default=defaults.model_mix,
+                        help="model weights, e.g. sonnet=0.6,opus=0.3,haiku=0.1")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+def spec_from_args(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(projects=args.projects, files=args.files, lines=args.lines,
+                      line_size=args.line_size, days=args.days, model_mix=args.models,
+                      seed=args.seed)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", type=Path)
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    files = generate_corpus(args.output, spec_from_args(args))
+    size = sum(f.stat().st_size for f in files)
+    print(f"wrote {len(files)} files, {size / 1e6:.1f} MB to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+### Shared background process that parses the logs once for every running sumonitor
+
+import os
+import sys
+import json
+import time
+import fcntl
+import socket
+import asyncio
+import logging
+import argparse
+import subprocess
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional, Set
+
+from .config import Config
+from .data.decoder import DECODERS
+from .data.log_reader import DEFAULT_HOURS_BACK, LogReader
+from .data.log_watcher import LogWatcher, create_watcher
+from .data.pricing import PlanLimits
+from .session.session_data import SessionData, UsageSnapshot
+from .session.shared_snapshot import SharedSnapshotWriter
+from .session.session_tracker import SessionTracker
+from .terminal.refresh_scheduler import RefreshScheduler
+
+DEFAULT_SOCKET_PATH = '~/.cache/sumonitor/daemon.sock'
+# an auto-spawned daemon exits once no client has been connected for this long
+IDLE_TIMEOUT = 60.0
+# how long a client waits for a freshly spawned daemon to listen
+CONNECT_TIMEOUT = 5.0
+# clients that stop reading are dropped once this much is queued for them
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+def default_socket_path() -> str:
+    return os.path.expanduser(DEFAULT_SOCKET_PATH)
+
+class UsageDaemon:
+    """Owns the only LogReader and SessionTracker and pushes snapshots to clients
+
+    Clients connect to a Unix domain socket and receive one JSON line per
+    change of the current session's numbers (UsageSnapshot.to_dict(), without
+    plan limits, so clients on different plans can share a daemon). A newly
+    connected client gets the latest snapshot straight away. Parsing follows
+    the same watcher and RefreshScheduler rules as a standalone sumonitor.
+
+    Only one daemon runs per socket path: a lock file next to the socket is
+    held for the daemon's lifetime, a second daemon exits immediately.
+    """
+    def __init__(self, log_reader: LogReader, socket_path: Optional[str] = None,
+                 watcher: Optional[LogWatcher] = None,
+                 scheduler: Optional[RefreshScheduler] = None,
+                 idle_timeout: float = IDLE_TIMEOUT,
+                 shared_snapshot: Optional[SharedSnapshotWriter] = None):
+        self.log_reader = log_reader
+        self.socket_path = socket_path if socket_path else default_socket_path()
+        self.scheduler = scheduler if scheduler is not None else RefreshScheduler()
+        self.watcher = watcher if watcher is not None else \
+            create_watcher(poll_interval=self.scheduler.idle_interval)
+        self.idle_timeout = idle_timeout
+        # every refresh is also copied here for readers that don't subscribe
+        self.shared_snapshot = shared_snapshot
+        self.session_tracker = SessionTracker()
+        self.clients: Set[asyncio.StreamWriter] = set()
+        # last published line, sent to new clients and used to skip repeats
+        self.last_line: Optional[bytes] = None
+        self.idle_since = time.monotonic()
+        self.refreshing = False
+        self.refresh_pending = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.done: Optional[asyncio.Future] = None
+
+    def build_snapshot(self, refresh: bool = True) -> UsageSnapshot:
+        """Update the sessions and return the current session's UsageSnapshot"""
+        if refresh:
+            new_entries = self.log_reader.parse_new_entries(save=False)
+            if new_entries:
+                self.scheduler.record_activity()
+            self.session_tracker.add_entries(new_entries)
+            self.session_tracker.prune_before(
+                datetime.now(timezone.utc) - timedelta(hours=DEFAULT_HOURS_BACK))
+            # saved with the cursors so `sumonitor stats` can skip the rows
+            self.log_reader.save_index(self.session_tracker.last_summary())
+        # plan only affects the limits, which clients apply themselves
+        session_data = SessionData(usage_data=None, plan="pro", session_tracker=self.session_tracker)
+        return session_data.snapshot()
+
+    def run(self) -> None:
+        """Serve until idle_timeout passes without clients, or return at once
+        if another daemon already owns the socket"""
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+        lock = open(f"{self.socket_path}.lock", "w")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return
+
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        watcher_fd = self.watcher.fileno()
+        server = None
+        try:
+            # left behind by a daemon that crashed, the lock says nobody serves it
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            server = await asyncio.start_unix_server(self.on_client, path=self.socket_path)
+            os.chmod(self.socket_path, 0o600)
+            if watcher_fd is not None:
+                self.loop.add_reader(watcher_fd, self.on_log_event)
+            self.refresh(parse=True)
+            self.schedule_poll()
+            await self.done
+        finally:
+            if watcher_fd is not None:
+                self.loop.remove_reader(watcher_fd)
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+            for writer in list(self.clients):
+                writer.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            self.watcher.close()
+            if self.shared_snapshot is not None:
+                self.shared_snapshot.close()
+            lock.close()
+
+    async def on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Keep a subscriber until it disconnects, clients never send anything"""
+        self.clients.add(writer)
+        if self.last_line is not None:
+            writer.write(self.last_line)
+        try:
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self.idle_since = time.monotonic()
+            writer.close()
+
+    def on_log_event(self) -> None:
+        if self.watcher.poll():
+            self.refresh(parse=True)
+
+    def schedule_poll(self) -> None:
+        """Poll a PollingWatcher, drop expired sessions and exit when idle"""
+        if not self.clients and time.monotonic() - self.idle_since >= self.idle_timeout:
+            if not self.done.done():
+                self.done.set_result(None)
+            return
+        changed = self.watcher.fileno() is None and bool(self.watcher.poll())
+        self.refresh(parse=changed)
+        self.loop.call_later(min(self.scheduler.poll_interval(), self.idle_timeout), self.schedule_poll)
+
+    def refresh(self, parse: bool) -> None:
+        """Publish a new snapshot, parsing in the executor if asked to"""
+        if self.refreshing:
+            self.refresh_pending = self.refresh_pending or parse
+            return
+        if not parse:
+            self.publish(self.build_snapshot(refresh=False))
+            return
+        self.refreshing = True
+        future = self.loop.run_in_executor(None, self.build_snapshot, True)
+        future.add_done_callback(self.on_parsed)
+
+    def on_parsed(self, future: asyncio.Future) -> None:
+        self.refreshing = False
+        try:
+            snapshot = future.result()
+        except Exception:
+            # e.g. no ~/.claude/projects yet, clients still get the sessions known so far
+            logger.exception("parsing the logs failed")
+            snapshot = self.build_snapshot(refresh=False)
+        self.publish(snapshot)
+        if self.refresh_pending:
+            self.refresh_pending = False
+            self.refresh(parse=True)
+
+    def publish(self, snapshot: UsageSnapshot) -> None:
+        """Send a changed snapshot to every client
+
+            The shared snapshot is rewritten even when unchanged, its publish
+            time tells readers the daemon is still alive.
+        """
+        if self.shared_snapshot is not None:
+            self.shared_snapshot.publish(snapshot)
+        line = (json.dumps(snapshot.to_dict()) + "\n").encode()
+        if line == self.last_line:
+            return
+        self.last_line = line
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                self.clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+def spawn_daemon(socket_path: str, args: tuple = ()) -> subprocess.Popen:
+    """Start a detached daemon that outlives the sumonitor that started it"""
+    return subprocess.Popen(
+        [sys.executable, "-m", "sumonitor.daemon", "--socket", socket_path, *args],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True, close_fds=True)
+
+class DaemonClient:
+    """Receives snapshots from the daemon, starting one if none is running"""
+    def __init__(self, plan_limits: PlanLimits, socket_path: Optional[str] = None,
+                 spawn: bool = True, daemon_args: tuple = ()):
+        self.plan_limits = plan_limits
+        self.socket_path = socket_path if socket_path else default_socket_path()
+        self.spawn = spawn
+        # passed on to an auto-spawned daemon, e.g. ("--json-decoder", "json")
+        self.daemon_args = daemon_args
+        self.sock: Optional[socket.socket] = None
+
+    def connect(self) -> socket.socket:
+        """Connect to the daemon, spawning it and waiting for it to listen if needed
+
+            Raises:
+                OSError: no daemon could be reached within CONNECT_TIMEOUT
+        """
+        deadline = time.monotonic() + CONNECT_TIMEOUT
+        spawned = False
+        while True:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                self.sock = sock
+                return sock
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if not self.spawn or time.monotonic() >= deadline:
+                    raise
+                if not spawned:
+                    spawn_daemon(self.socket_path, self.daemon_args)
+                    spawned = True
+                time.sleep(0.05)
+
+    def snapshots(self) -> Iterator[UsageSnapshot]:
+        """Yield each snapshot the daemon pushes until the connection closes"""
+        sock = self.connect()
+        try:
+            with sock.makefile("rb") as stream:
+                for line in stream:
+                    try:
+                        data = json.loads(line)
+                    except ValueError:
+                        continue
+                    yield UsageSnapshot.from_dict(data, self.plan_limits)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+def get_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='sumonitor-daemon',
+        description='Shared log parser for sumonitor instances started with --daemon')
+    parser.add_argument('--socket', default=None, type=str,
+                        help=f'Unix socket to serve on (default: {DEFAULT_SOCKET_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not use the on-disk usage index in ~/.cache/sumonitor')
+    parser.add_argument('--json-decoder', default='auto', choices=['auto', *DECODERS],
+                        help='JSON backend for parsing logs (default: auto, the fastest installed)')
+    parser.add_argument('--shared-snapshot', default=None, type=str,
+                        help='Memory mapped file the latest snapshot is published to '
+                             '(default: /dev/shm/sumonitor-UID.snapshot)')
+    parser.add_argument('--idle-timeout', default=IDLE_TIMEOUT, type=float,
+                        help='Exit after this many seconds without clients (default: 60)')
+    return parser
+
+def main():
+    from .main import open_usage_index
+
+    args = get_args_parser().parse_args()
+    log_reader = LogReader(index=open_usage_index(args.no_cache), decoder=args.json_decoder)
+    try:
+        shared_snapshot = SharedSnapshotWriter(args.shared_snapshot)
+    except OSError:
+        # the socket still serves every sumonitor
+        shared_snapshot = None
+    UsageDaemon(log_reader, socket_path=args.socket,
+                scheduler=RefreshScheduler.from_config(Config().load_config()),
+                idle_timeout=args.idle_timeout, shared_snapshot=shared_snapshot).run()
+
+if __name__ == "__main__":
+    main()
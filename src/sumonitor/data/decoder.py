@@ -0,0 +1,161 @@
+### Pluggable JSON decoding of jsonl lines - msgspec or orjson when installed, stdlib json otherwise
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # optional - falls back to stdlib json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional - falls back to orjson or stdlib json
+    msgspec = None
+
+@dataclass
+class LogLine:
+    """The fields of a jsonl line that LogReader uses, whatever the backend"""
+    timestamp: Optional[str] = None
+    request_id: Optional[Any] = None
+    # False when the line has no "message" object
+    has_message: bool = False
+    message_id: Optional[Any] = None
+    model: Optional[str] = None
+    # False when the message has no "usage" object
+    has_usage: bool = False
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_write_tokens: int = 0
+    cache_read_tokens: int = 0
+
+class JsonDecoder:
+    """Decodes a whole line with the stdlib json module"""
+    name = "json"
+
+    def loads(self, line: bytes) -> Any:
+        return json.loads(line)
+
+    def decode(self, line: bytes) -> Optional[LogLine]:
+        """Decode a jsonl line
+
+            Args:
+                line: one line of a jsonl file, without the newline
+
+            Returns:
+                LogLine, or None if the line is not a valid JSON object
+        """
+        try:
+            data = self.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        entry = LogLine(timestamp=data.get("timestamp"), request_id=data.get("requestId"))
+        message = data.get("message")
+        if isinstance(message, dict):
+            entry.has_message = True
+            entry.message_id = message.get("id")
+            entry.model = message.get("model")
+            usage = message.get("usage")
+            if isinstance(usage, dict):
+                entry.has_usage = True
+                entry.input_tokens = usage.get("input_tokens", 0)
+                entry.output_tokens = usage.get("output_tokens", 0)
+                entry.cache_write_tokens = usage.get("cache_creation_input_tokens", 0)
+                entry.cache_read_tokens = usage.get("cache_read_input_tokens", 0)
+        return entry
+
+class OrjsonDecoder(JsonDecoder):
+    """Same as JsonDecoder with orjson doing the parsing"""
+    name = "orjson"
+
+    def loads(self, line: bytes) -> Any:
+        # orjson.JSONDecodeError is a ValueError
+        return orjson.loads(line)
+
+if msgspec is not None:
+    class _Usage(msgspec.Struct):
+        input_tokens: int = 0
+        output_tokens: int = 0
+        cache_creation_input_tokens: int = 0
+        cache_read_input_tokens: int = 0
+
+    class _Message(msgspec.Struct):
+        id: Optional[str] = None
+        model: Optional[str] = None
+        usage: Optional[_Usage] = None
+
+    class _Line(msgspec.Struct):
+        timestamp: Optional[str] = None
+        requestId: Optional[str] = None
+        message: Optional[_Message] = None
+
+class MsgspecDecoder:
+    """Decodes into a typed schema, skipping every field LogReader doesn't use
+
+    Tool output and message content are validated but never turned into
+    Python objects, which is where most of the time goes on large lines.
+    """
+    name = "msgspec"
+
+    def __init__(self):
+        self.decoder = msgspec.json.Decoder(_Line)
+
+    def decode(self, line: bytes) -> Optional[LogLine]:
+        try:
+            data = self.decoder.decode(line)
+        except msgspec.DecodeError:
+            # also raised for lines that don't match the schema, e.g. a
+            # string "message" - those never carry usage
+            return None
+
+        entry = LogLine(timestamp=data.timestamp, request_id=data.requestId)
+        message = data.message
+        if message is not None:
+            entry.has_message = True
+            entry.message_id = message.id
+            entry.model = message.model
+            usage = message.usage
+            if usage is not None:
+                entry.has_usage = True
+                entry.input_tokens = usage.input_tokens
+                entry.output_tokens = usage.output_tokens
+                entry.cache_write_tokens = usage.cache_creation_input_tokens
+                entry.cache_read_tokens = usage.cache_read_input_tokens
+        return entry
+
+DECODERS = {
+    "msgspec": MsgspecDecoder,
+    "orjson": OrjsonDecoder,
+    "json": JsonDecoder,
+}
+
+def available_decoders() -> List[str]:
+    """Names of the decoders usable in this environment, fastest first"""
+    installed: Dict[str, bool] = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in DECODERS if installed[name]]
+
+def get_decoder(name: str = "auto"):
+    """Create a line decoder
+
+        Args:
+            name: "auto" for the fastest installed backend, or one of
+                "msgspec", "orjson" and "json"
+
+        Returns:
+            Decoder with a decode(line) -> Optional[LogLine] method
+
+        Raises:
+            ValueError: if the name is unknown
+            ImportError: if the requested backend is not installed
+    """
+    if name == "auto":
+        name = available_decoders()[0]
+    if name not in DECODERS:
+        raise ValueError(f"Unknown JSON decoder '{name}', expected one of: auto, {', '.join(DECODERS)}")
+    if name not in available_decoders():
+        raise ImportError(f"JSON decoder '{name}' is not installed")
+    return DECODERS[name]()
@@ -0,0 +1,83 @@
+### Compact, time-bucketed set of already counted message:request ids
+
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Dict, Optional, Set
+
+class DedupStore:
+    """Set of 64-bit entry keys grouped into time buckets
+
+    The newest buckets are plain sets so inserts are cheap. Older buckets are
+    frozen into sorted arrays (8 bytes per key) and searched with bisect, and
+    whole buckets are dropped once they fall out of the hours_back window.
+    """
+    def __init__(self, bucket_seconds: int = 3600, hot_buckets: int = 2):
+        self.bucket_seconds = bucket_seconds
+        self.hot_buckets = hot_buckets
+        self.hot: Dict[int, Set[int]] = {}
+        self.frozen: Dict[int, array] = {}
+
+    @staticmethod
+    def key(message_id: Optional[str], request_id: Optional[str]) -> int:
+        """Stable 64-bit key for a message:request pair, same across processes"""
+        h = blake2b(digest_size=8)
+        h.update(str(message_id).encode())
+        h.update(b":")
+        h.update(str(request_id).encode())
+        return int.from_bytes(h.digest(), "little", signed=True)
+
+    def bucket(self, timestamp: float) -> int:
+        """Bucket number for an epoch timestamp in seconds"""
+        return int(timestamp) // self.bucket_seconds
+
+    def contains(self, key: int, timestamp: float) -> bool:
+        """Check if a key was added with a timestamp in or next to this bucket
+
+            Args:
+                key: entry key from DedupStore.key()
+                timestamp: entry time in epoch seconds
+
+            Returns:
+                True if the entry was already added
+        """
+        b = self.bucket(timestamp)
+        # copies of a message can be logged a little apart, check neighbours too
+        for n in (b, b - 1, b + 1):
+            hot = self.hot.get(n)
+            if hot is not None and key in hot:
+                return True
+            frozen = self.frozen.get(n)
+            if frozen is not None:
+                i = bisect_left(frozen, key)
+                if i < len(frozen) and frozen[i] == key:
+                    return True
+        return False
+
+    def add(self, key: int, timestamp: float) -> None:
+        """Add an entry key to the bucket of its timestamp"""
+        b = self.bucket(timestamp)
+        hot = self.hot.get(b)
+        if hot is None:
+            frozen = self.frozen.pop(b, None)
+            hot = set(frozen) if frozen is not None else set()
+            self.hot[b] = hot
+        hot.add(key)
+
+    def compact(self) -> None:
+        """Freeze all but the newest hot buckets into sorted arrays"""
+        if len(self.hot) <= self.hot_buckets:
+            return
+        for b in sorted(self.hot)[:-self.hot_buckets]:
+            self.frozen[b] = array("q", sorted(self.hot.pop(b)))
+
+    def expire_before(self, timestamp: float) -> None:
+        """Drop every bucket that ends before the given epoch timestamp"""
+        oldest = self.bucket(timestamp)
+        for buckets in (self.hot, self.frozen):
+            for b in [b for b in buckets if b < oldest]:
+                del buckets[b]
+
+    def __len__(self) -> int:
+        return sum(len(keys) for keys in self.hot.values()) + \
+            sum(len(keys) for keys in self.frozen.values())
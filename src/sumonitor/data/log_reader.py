@@ -1,12 +1,22 @@
 ### Identify project relating jsonl files and parse them
 
-import json
+import os
+import time
+import heapq
+import mmap
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from sumonitor.data.pricing import _get_pricing
+from sumonitor.data.dedup import DedupStore
+from sumonitor.metrics import METRICS
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from sumonitor.data.usage_index import UsageIndex
+    from sumonitor.session.session_tracker import SessionSummary
+    from sumonitor.data.usage_store import UsageColumns
+
 def _calculate_total_cost(model: str, input_tokens: int, output_tokens: int,
                           cache_write_tokens: int, cache_read_tokens: int) -> float:
     """Apply relevant pricing per token for relevant Claude model
@@ -45,28 +55,222 @@ def _calculate_total_cost(model: str, input_tokens: int, output_tokens: int,
 
     return input_cost + output_cost + cache_write_cost + cache_read_cost
 
-@dataclass
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MS = timedelta(milliseconds=1)
+
+def to_epoch_ms(timestamp: datetime) -> int:
+    """Epoch milliseconds of a datetime, naive datetimes are taken as UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return (timestamp - EPOCH) // ONE_MS
+
+def from_epoch_ms(timestamp_ms: int) -> datetime:
+    """Aware UTC datetime for epoch milliseconds"""
+    return EPOCH + timedelta(milliseconds=timestamp_ms)
+
+def parse_timestamp_ms(value: str) -> int:
+    """Parse an ISO 8601 timestamp into epoch milliseconds
+
+        fromisoformat is implemented in C and beats slicing the fixed format in
+        Python, so the work saved is in what follows: entries carry an int and
+        every later comparison is an integer one.
+
+        Args:
+            value: timestamp string from a jsonl line
+
+        Returns:
+            Milliseconds since the epoch, UTC
+
+        Raises:
+            ValueError: if value is not an ISO 8601 timestamp
+    """
+    return to_epoch_ms(datetime.fromisoformat(value.replace('Z', '+00:00')))
+
+USAGE_KEY = b'"usage"'
+TIMESTAMP_KEY = b'"timestamp":'
+# longest ISO timestamp Claude writes is ~32 bytes, don't scan further than this
+MAX_TIMESTAMP_SCAN = 48
+
+def _is_usage_candidate(line: bytes, cutoff_ms: int) -> bool:
+    """Cheap byte level check run before json decoding a line
+
+        Lines without a "usage" key can't produce UsageData. When the line has
+        exactly one "timestamp" key it has to be the top level one, so it is
+        read with a bounded scan and lines older than the window are dropped.
+        Anything unusual is passed on to the full decode.
+
+        Args:
+            line: raw jsonl line
+            cutoff_ms: oldest timestamp still inside the window, in epoch milliseconds
+
+        Returns:
+            False if the line can be skipped without decoding it
+    """
+    if USAGE_KEY not in line:
+        return False
+    if line.count(TIMESTAMP_KEY) != 1:
+        return True
+
+    start = line.index(TIMESTAMP_KEY) + len(TIMESTAMP_KEY)
+    start = line.find(b'"', start, start + 4) + 1
+    if start == 0:
+        return True
+    end = line.find(b'"', start, start + MAX_TIMESTAMP_SCAN)
+    if end == -1:
+        return True
+    try:
+        return parse_timestamp_ms(line[start:end].decode()) >= cutoff_ms
+    except (ValueError, TypeError):
+        # not a timestamp we understand, let the full decode handle it
+        return True
+
+@dataclass(init=False)
 class UsageData:
+    """Usage of one message. The time is kept as integer epoch milliseconds so
+    filtering and sorting compare ints, timestamp is only built for display"""
+    # one instance per message, slots keep it small for long histories
+    __slots__ = ('model', 'input_tokens', 'output_tokens', 'cache_write_tokens',
+                 'cache_read_tokens', 'cost', 'timestamp_ms', '_timestamp')
     model: str
     input_tokens: int
     output_tokens: int
     cache_write_tokens: int
     cache_read_tokens: int
     cost: float
-    timestamp: datetime
+    timestamp_ms: int
+
+    def __init__(self, model: str, input_tokens: int, output_tokens: int,
+                 cache_write_tokens: int, cache_read_tokens: int, cost: float,
+                 timestamp: Optional[datetime] = None, timestamp_ms: Optional[int] = None):
+        self.model = model
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_write_tokens = cache_write_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.cost = cost
+        if timestamp is not None:
+            self.timestamp = timestamp
+        elif timestamp_ms is not None:
+            self.timestamp_ms = timestamp_ms
+            self._timestamp = None
+        else:
+            raise TypeError("UsageData needs a timestamp or timestamp_ms")
+
+    @property
+    def timestamp(self) -> datetime:
+        """Entry time as an aware datetime, created on first use"""
+        if self._timestamp is None:
+            self._timestamp = from_epoch_ms(self.timestamp_ms)
+        return self._timestamp
+
+    @timestamp.setter
+    def timestamp(self, value: datetime) -> None:
+        self.timestamp_ms = to_epoch_ms(value)
+        self._timestamp = value
+
+@dataclass
+class ModelUsage:
+    """Running totals of UsageData, for a whole session or a single model"""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_write_tokens: int = 0
+    cache_read_tokens: int = 0
+    cost: float = 0.0
+    messages: int = 0
+
+    def add(self, entry: UsageData) -> None:
+        """Add an entry's usage to the totals"""
+        self.input_tokens += entry.input_tokens
+        self.output_tokens += entry.output_tokens
+        self.cache_write_tokens += entry.cache_write_tokens
+        self.cache_read_tokens += entry.cache_read_tokens
+        self.cost += entry.cost
+        self.messages += 1
+
+@dataclass
+class FileCursor:
+    """Read position inside a jsonl file so only newly appended bytes get parsed"""
+    inode: int
+    size: int
+    offset: int
+
+@dataclass
+class DirectoryListing:
+    """Cached contents of one directory under the Claude projects path"""
+    mtime_ns: Optional[int]
+    files: List[Path]
+    subdirs: List[str]
+
+# directory mtimes this close to the scan time may still change within the same
+# timestamp tick, so such listings are rescanned on the next call
+RACY_MTIME_NS = 2_000_000_000
+
+# default lookback window for parsing (5 days)
+DEFAULT_HOURS_BACK = 120
+
+# how often entries that fell out of the hours_back window are dropped from memory
+EVICTION_INTERVAL = timedelta(hours=1)
+
+# unread files smaller than this in total are parsed in-process, a process pool
+# only pays off once there is enough to parse
+MIN_PARALLEL_SCAN_BYTES = 64 * 1024 * 1024
+# appended regions at least this big are scanned through mmap for usage lines
+# instead of being read and split whole
+MMAP_MIN_BYTES = 4 * 1024 * 1024
+
+# chunks handed out per worker, so one slow chunk doesn't hold up the whole scan
+CHUNKS_PER_WORKER = 4
+
+@dataclass
+class FileScan:
+    """Result of parsing one file in a scan worker, kept small for pickling"""
+    path: str
+    cursor: Optional[FileCursor]
+    # (DedupStore key, model, input, output, cache write, cache read, cost, timestamp_ms)
+    rows: List[tuple]
 
 class LogReader:
     """Reads relevant jsonl files and creates a set of valid tokens to use for calculations"""
-    def __init__(self):
-        # track processed files
-        self.processed_entries = set() 
+    def __init__(self, index: Optional["UsageIndex"] = None,
+                 columns: Optional["UsageColumns"] = None, prefilter: bool = True,
+                 decoder: str = "auto", scan_workers: int = 1):
+        # keys of processed entries, bucketed by entry time
+        self.processed_entries = DedupStore()
         self.usage_data = []
         self.session_start_time = None
+        self.last_eviction: Optional[datetime] = None
+        # per file read position, keyed by file path
+        self.cursors: Dict[str, FileCursor] = {}
+        # optional on-disk cache of cursors and parsed rows
+        self.index = index
+        self.index_loaded = False
+        self.dirty_cursors: Dict[str, Optional[FileCursor]] = {}
+        # rows parsed since the last successful save, kept with dirty_cursors until written
+        self.unsaved_rows: List[Tuple[int, UsageData]] = []
+        # optional compact store for long retention, replaces usage_data when given
+        self.columns = columns
+        # skip json decoding of lines that can't hold usage inside the window
+        self.prefilter = prefilter
+        # json backend, see sumonitor.data.decoder. Imported here, like the process
+        # pool below, so importing this module for its data classes stays cheap
+        from sumonitor.data.decoder import get_decoder
+        self.decoder = get_decoder(decoder)
+        # processes used to parse files that have never been read, 1 disables
+        self.scan_workers = scan_workers
+        # cached directory listings for file discovery, keyed by directory path
+        self.discovery_root: Optional[str] = None
+        self.dir_cache: Dict[str, DirectoryListing] = {}
 
-    def get_jsonl_files(self, data_path: Optional[str] = None) -> List[str]:
+    def get_jsonl_files(self, data_path: Optional[str] = None, refresh: bool = False) -> List[str]:
         """Gets the path of jsonl files relating to the current project
+
+            Directory listings are cached and a directory is only listed again
+            when its mtime changes, so a call with no new files or project
+            directories costs one stat per directory.
+
             Args:
                 data_path: Path to Claude data directory
+                refresh: drop the cached listings and rescan the whole tree
 
             Returns:
                 Array of jsonl file paths
@@ -80,77 +284,515 @@ class LogReader:
             raise FileNotFoundError(
                 f"Claude projects directory not found at {data_path}"
             )
-        # if path exists read the relevant jsonl files
-        return list(data_path.rglob("*.jsonl"))
-    
 
-    def parse_json_files(self, hours_back: int = 120) -> List[UsageData]:
+        root = str(data_path)
+        if refresh or root != self.discovery_root:
+            self.refresh_file_cache()
+            self.discovery_root = root
+
+        files: List[Path] = []
+        self.collect_jsonl_files(root, files)
+        return files
+
+    def refresh_file_cache(self) -> None:
+        """Forget cached directory listings so the next discovery rescans everything"""
+        self.dir_cache = {}
+
+    def collect_jsonl_files(self, directory: str, files: List[Path]) -> None:
+        """Add jsonl files under a directory to files, listing only changed directories
+
+            Args:
+                directory: directory to collect from
+                files: list the found paths are appended to
+        """
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            self.forget_directory(directory)
+            return
+
+        listing = self.dir_cache.get(directory)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            listing = self.scan_directory(directory, mtime_ns)
+            if listing is None:
+                return
+
+        files.extend(listing.files)
+        for subdir in listing.subdirs:
+            self.collect_jsonl_files(subdir, files)
+
+    def forget_directory(self, directory: str) -> None:
+        """Drop the cached listing of a removed directory and everything below it"""
+        listing = self.dir_cache.pop(directory, None)
+        if listing is not None:
+            for subdir in listing.subdirs:
+                self.forget_directory(subdir)
+
+    def scan_directory(self, directory: str, mtime_ns: int) -> Optional[DirectoryListing]:
+        """List a directory and cache its jsonl files and subdirectories
+
+            Args:
+                directory: directory to list
+                mtime_ns: mtime of the directory before listing it
+
+            Returns:
+                The new listing, or None if the directory disappeared
+        """
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.endswith(".jsonl") and entry.is_file():
+                        files.append(Path(entry.path))
+        except FileNotFoundError:
+            self.forget_directory(directory)
+            return None
+
+        old = self.dir_cache.get(directory)
+        if old is not None:
+            for subdir in set(old.subdirs).difference(subdirs):
+                self.forget_directory(subdir)
+
+        if time.time_ns() - mtime_ns < RACY_MTIME_NS:
+            mtime_ns = None
+        listing = DirectoryListing(mtime_ns=mtime_ns, files=files, subdirs=subdirs)
+        self.dir_cache[directory] = listing
+        return listing
+
+    def read_new_lines(self, json_file, cutoff_time: Optional[datetime] = None) -> List[bytes]:
+        """Read only the complete lines appended to a file since the last call
+
+            A file whose inode changed or that shrank below the saved offset was
+            rotated or truncated, so it is read again from the start. A trailing
+            line without a newline is still being written and is left for the
+            next call. A file last modified before cutoff_time can only hold
+            older entries, so it is skipped without being opened. With the
+            prefilter on, large appends are scanned in place with mmap and only
+            lines containing "usage" are copied out.
+
+            Args:
+                json_file: path of the jsonl file
+                cutoff_time: skip the file if it wasn't modified after this time
+
+            Returns:
+                List of raw lines (bytes) that have not been read before
+        """
+        key = str(json_file)
+        try:
+            stat = os.stat(json_file)
+        except FileNotFoundError:
+            if self.cursors.pop(key, None) is not None:
+                self.dirty_cursors[key] = None
+            return []
+
+        cursor = self.cursors.get(key)
+        if cursor is None or cursor.inode != stat.st_ino or stat.st_size < cursor.offset:
+            cursor = FileCursor(inode=stat.st_ino, size=0, offset=0)
+            self.cursors[key] = cursor
+
+        # nothing appended since last read
+        if stat.st_size == cursor.size:
+            return []
+
+        if cutoff_time is not None and stat.st_mtime < cutoff_time.timestamp():
+            # every line is older than the window, only appends after this matter
+            cursor.size = cursor.offset = stat.st_size
+            self.dirty_cursors[key] = cursor
+            return []
+
+        start_offset = cursor.offset
+        with open(json_file, 'rb') as f:
+            if self.prefilter and stat.st_size - cursor.offset >= MMAP_MIN_BYTES:
+                lines, cursor.size, cursor.offset = _read_usage_lines_mmap(f, cursor.offset)
+            else:
+                lines, cursor.size, cursor.offset = _read_lines(f, cursor.offset)
+        self.dirty_cursors[key] = cursor
+        METRICS.count("bytes_read", cursor.offset - start_offset)
+        return lines
+
+    def parse_json_files(self, hours_back: int = DEFAULT_HOURS_BACK) -> List[UsageData]:
         """Parse relevant files only and return a collection of input and output tokens
 
             Args:
                 hours_back: how far back to look for entries (default: 120 hours = 5 days)
 
             Returns:
-                List of objects of data class that contains input and output tokens
+                List of objects of data class that contains input and output tokens,
+                materialized from the columns when a UsageColumns store is used
+        """
+        self.parse_new_entries(hours_back)
+        if self.columns is not None:
+            return [self.columns.row(i) for i in range(len(self.columns))]
+        return self.usage_data
+
+    def parse_new_entries(self, hours_back: int = DEFAULT_HOURS_BACK,
+                          save: bool = True) -> List[UsageData]:
+        """Parse lines appended since the last call and return only the new entries
+
+            Args:
+                hours_back: how far back to look for entries (default: 120 hours = 5 days)
+                save: write the index before returning. Callers that track sessions
+                    pass False and call save_index() with the updated session
+
+            Returns:
+                UsageData added by this call, including rows restored from the index
+                on the first call
         """
-        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours_back)
-        jsonl_files_path = self.get_jsonl_files()
+        now = datetime.now(timezone.utc)
+        cutoff_time = now - timedelta(hours=hours_back)
+        cutoff_ms = to_epoch_ms(cutoff_time)
+        new_entries = []
+        if self.index is not None and not self.index_loaded:
+            new_entries.extend(self.load_index(cutoff_time))
+
+        if self.last_eviction is None or now - self.last_eviction >= EVICTION_INTERVAL:
+            self.evict_before(cutoff_time)
+            self.last_eviction = now
+
+        new_rows = []
+        with METRICS.timer("discover"):
+            jsonl_files_path = self.get_jsonl_files()
+        METRICS.count("files_scanned", len(jsonl_files_path))
+        if self.scan_workers > 1:
+            with METRICS.timer("pool_scan"):
+                new_rows.extend(self.scan_unread_files(jsonl_files_path, cutoff_ms))
         for json_file in jsonl_files_path:
-            with open(json_file, encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-
-                    if not line:
-                        continue
-
-                    try:
-                        data = json.loads(line)
-                    except json.JSONDecodeError:
-                        continue
-
-                    message = data.get("message")
-                    timestamp = data.get("timestamp")
-
-                    if not timestamp: 
-                        continue
-
-                    timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                    if timestamp < cutoff_time:
-                        continue
-
-                    if isinstance(message, dict):
-                        # uniquely identify each request within each message
-                        message_id = message.get("id")
-                        request_id = data.get("requestId")
-                        unique_id = f"{message_id}:{request_id}"
-
-                        if unique_id in self.processed_entries: continue
-
-                        model = message.get("model")
-                        usage = message.get("usage")
-                        if isinstance(usage, dict):
-                            input_tokens = usage.get("input_tokens", 0)
-                            output_tokens = usage.get("output_tokens", 0)
-                            cache_write_tokens = usage.get("cache_creation_input_tokens", 0)
-                            cache_read_tokens = usage.get("cache_read_input_tokens", 0)
-
-                            total_cost = _calculate_total_cost(
-                                model=model,
-                                input_tokens=input_tokens,
-                                output_tokens=output_tokens,
-                                cache_write_tokens=cache_write_tokens,
-                                cache_read_tokens=cache_read_tokens,
-                            )
-
-                            user_usage = UsageData(
-                                model=model,
-                                input_tokens=input_tokens,
-                                output_tokens=output_tokens,
-                                cache_write_tokens=cache_write_tokens,
-                                cache_read_tokens=cache_read_tokens,
-                                cost=total_cost,
-                                timestamp=timestamp
-                                )
-                            self.usage_data.append(user_usage)
-                        self.processed_entries.add(unique_id)
-        return self.usage_data
\ No newline at end of file
+            with METRICS.timer("read"):
+                lines = self.read_new_lines(json_file, cutoff_time)
+            new_rows.extend(self.parse_lines(lines, cutoff_ms))
+        METRICS.count("entries_added", len(new_rows))
+
+        new_entries.extend(entry for _, entry in new_rows)
+        if self.columns is not None:
+            self.columns.extend(new_entries)
+        else:
+            self.usage_data.extend(new_entries)
+
+        self.processed_entries.compact()
+        if self.index is None:
+            self.dirty_cursors = {}
+        else:
+            self.unsaved_rows.extend(new_rows)
+            if save:
+                self.save_index()
+        return new_entries
+
+    def save_index(self, session: Optional["SessionSummary"] = None) -> None:
+        """Write cursors and rows parsed since the last successful save
+
+            A failed save keeps them for the next call, saving the cursors alone
+            would skip those lines on the next launch.
+
+            Args:
+                session: newest session including every parsed entry, read by
+                    `sumonitor stats` instead of the rows
+        """
+        if self.index is None or not (self.unsaved_rows or self.dirty_cursors):
+            return
+        if self.index.save(self.dirty_cursors, self.unsaved_rows, session):
+            self.dirty_cursors = {}
+            self.unsaved_rows = []
+
+    def scan_unread_files(self, files: List[Path], cutoff_ms: int) -> List[Tuple[int, UsageData]]:
+        """Parse files that have no cursor yet across a process pool
+
+            Used on a cold start, when every file has to be read from the start.
+            Files are split into chunks of similar total size, each worker parses
+            its chunk on its own and the results are merged here in file order,
+            deduplicated against everything already counted. Files already read
+            and small scans are left to the sequential path.
+
+            Args:
+                files: jsonl files to consider
+                cutoff_ms: lines older than this (epoch milliseconds) are ignored
+
+            Returns:
+                List of (DedupStore key, UsageData) for the new entries
+        """
+        unread = []
+        for json_file in files:
+            if str(json_file) in self.cursors:
+                continue
+            try:
+                unread.append((str(json_file), os.stat(json_file).st_size))
+            except FileNotFoundError:
+                continue
+        if sum(size for _, size in unread) < MIN_PARALLEL_SCAN_BYTES:
+            return []
+
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        chunks = _chunk_by_size(unread, self.scan_workers * CHUNKS_PER_WORKER)
+        try:
+            # spawn, since forking a process that runs the overlay thread isn't safe
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.scan_workers, mp_context=context) as pool:
+                futures = [
+                    pool.submit(_scan_files, chunk, cutoff_ms, self.prefilter, self.decoder.name)
+                    for chunk in chunks
+                ]
+                scanned = {scan.path: scan for future in futures for scan in future.result()}
+        except (OSError, BrokenProcessPool):
+            # no pool available, the sequential path parses these files instead
+            return []
+
+        rows = []
+        for path, _ in unread:
+            scan = scanned[path]
+            if scan.cursor is None:
+                continue
+            self.cursors[path] = self.dirty_cursors[path] = scan.cursor
+            for unique_id, model, input_tokens, output_tokens, cache_write_tokens, \
+                    cache_read_tokens, cost, timestamp_ms in scan.rows:
+                entry_time = timestamp_ms / 1000
+                if self.processed_entries.contains(unique_id, entry_time):
+                    continue
+                self.processed_entries.add(unique_id, entry_time)
+                rows.append((unique_id, UsageData(
+                    model=model,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cache_write_tokens=cache_write_tokens,
+                    cache_read_tokens=cache_read_tokens,
+                    cost=cost,
+                    timestamp_ms=timestamp_ms
+                )))
+        return rows
+
+    def parse_lines(self, lines: List[bytes], cutoff_ms: int) -> List[Tuple[int, UsageData]]:
+        """Decode raw jsonl lines into UsageData, skipping ones already counted
+
+            Args:
+                lines: raw lines from read_new_lines()
+                cutoff_ms: lines older than this (epoch milliseconds) are ignored
+
+            Returns:
+                List of (DedupStore key, UsageData) for the new entries
+        """
+        rows = []
+        # per line timers only while profiling, perf_counter calls aren't free
+        profiling = METRICS.enabled
+        decode_time = cost_time = 0.0
+        decoded = 0
+        for line in lines:
+            line = line.strip()
+
+            if not line:
+                continue
+
+            if self.prefilter and not _is_usage_candidate(line, cutoff_ms):
+                continue
+
+            if profiling:
+                start = time.perf_counter()
+                data = self.decoder.decode(line)
+                decode_time += time.perf_counter() - start
+                decoded += 1
+            else:
+                data = self.decoder.decode(line)
+            if data is None:
+                continue
+
+            timestamp = data.timestamp
+
+            if not timestamp: 
+                continue
+
+            try:
+                timestamp_ms = parse_timestamp_ms(timestamp)
+            except (ValueError, TypeError):
+                continue
+            if timestamp_ms < cutoff_ms:
+                continue
+
+            if data.has_message:
+                # uniquely identify each request within each message
+                unique_id = DedupStore.key(data.message_id, data.request_id)
+                entry_time = timestamp_ms / 1000
+
+                if self.processed_entries.contains(unique_id, entry_time): continue
+
+                model = data.model
+                if data.has_usage:
+                    input_tokens = data.input_tokens
+                    output_tokens = data.output_tokens
+                    cache_write_tokens = data.cache_write_tokens
+                    cache_read_tokens = data.cache_read_tokens
+
+                    if profiling:
+                        start = time.perf_counter()
+                    total_cost = _calculate_total_cost(
+                        model=model,
+                        input_tokens=input_tokens,
+                        output_tokens=output_tokens,
+                        cache_write_tokens=cache_write_tokens,
+                        cache_read_tokens=cache_read_tokens,
+                    )
+                    if profiling:
+                        cost_time += time.perf_counter() - start
+
+                    entry = UsageData(
+                        model=model,
+                        input_tokens=input_tokens,
+                        output_tokens=output_tokens,
+                        cache_write_tokens=cache_write_tokens,
+                        cache_read_tokens=cache_read_tokens,
+                        cost=total_cost,
+                        timestamp_ms=timestamp_ms
+                        )
+                    rows.append((unique_id, entry))
+                    # only lines that carry usage claim the id, same as with the prefilter
+                    self.processed_entries.add(unique_id, entry_time)
+        if profiling and lines:
+            METRICS.count("lines_read", len(lines))
+            METRICS.count("lines_decoded", decoded)
+            METRICS.record("decode", decode_time)
+            METRICS.record("cost", cost_time)
+        return rows
+
+    def load_index(self, cutoff_time: datetime) -> List[UsageData]:
+        """Restore cursors and parsed rows saved by a previous run
+
+            Args:
+                cutoff_time: rows older than this are not loaded
+
+            Returns:
+                The restored UsageData, empty if the index can't be read
+        """
+        import sqlite3
+        self.index_loaded = True
+        try:
+            cursors = self.index.load_cursors()
+            rows = self.index.load_usage(since=cutoff_time)
+        except sqlite3.Error:
+            # index is only a cache, e.g. locked by another instance - parse from scratch
+            self.index = None
+            return []
+        restored = []
+        self.cursors.update(cursors)
+        for unique_id, entry in rows:
+            entry_time = entry.timestamp_ms / 1000
+            if self.processed_entries.contains(unique_id, entry_time):
+                continue
+            self.processed_entries.add(unique_id, entry_time)
+            restored.append(entry)
+        return restored
+
+    def load_session(self) -> Optional["SessionSummary"]:
+        """Restore cursors and the saved session instead of the rows, to read without writing
+
+            Keys of the session's rows are restored too, so copies of them in other
+            files are not counted again. The index is then let go, so
+            parse_new_entries() returns only lines appended since the save and
+            writes nothing.
+
+            Returns:
+                The saved session, None if there is none or the index can't be
+                read, which leaves the reader unchanged
+        """
+        import sqlite3
+        try:
+            with self.index.reading():
+                session = self.index.load_session()
+                if session is None:
+                    return None
+                cursors = self.index.load_cursors()
+                keys = self.index.load_keys(since_ms=session.start_ms)
+        except sqlite3.Error:
+            return None
+        self.cursors.update(cursors)
+        for unique_id, timestamp_ms in keys:
+            self.processed_entries.add(unique_id, timestamp_ms / 1000)
+        self.index = None
+        return session
+
+    def evict_before(self, cutoff_time: datetime) -> None:
+        """Drop entries older than the window so memory stays bounded
+
+            Args:
+                cutoff_time: entries with an older timestamp are removed
+        """
+        cutoff_ms = to_epoch_ms(cutoff_time)
+        self.usage_data = [entry for entry in self.usage_data if entry.timestamp_ms >= cutoff_ms]
+        self.unsaved_rows = [row for row in self.unsaved_rows if row[1].timestamp_ms >= cutoff_ms]
+        if self.columns is not None:
+            self.columns.evict_before(cutoff_time)
+        self.processed_entries.expire_before(cutoff_time.timestamp())
+
+def _read_lines(f, offset: int) -> Tuple[List[bytes], int, int]:
+    """Read every complete line from offset to the end of an open file
+
+        Returns:
+            The lines, the number of bytes seen up to, and the offset after the
+            last complete line
+    """
+    f.seek(offset)
+    data = f.read()
+    size = offset + len(data)
+    end = data.rfind(b'\n')
+    if end == -1:
+        return [], size, offset
+    return data[:end].split(b'\n'), size, offset + end + 1
+
+def _read_usage_lines_mmap(f, offset: int) -> Tuple[List[bytes], int, int]:
+    """Copy out only the complete lines containing "usage" from offset onwards
+
+        The file is mapped instead of read, and searched for the usage key
+        directly, so tool output and other lines without usage are never copied.
+
+        Returns:
+            The usage lines, the number of bytes seen up to, and the offset
+            after the last complete line
+    """
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        end = mm.rfind(b'\n', offset, size)
+        if end == -1:
+            return [], size, offset
+
+        lines = []
+        pos = mm.find(USAGE_KEY, offset, end)
+        while pos != -1:
+            line_start = mm.rfind(b'\n', offset, pos) + 1 or offset
+            line_end = mm.find(b'\n', pos, end + 1)
+            lines.append(mm[line_start:line_end])
+            pos = mm.find(USAGE_KEY, line_end + 1, end)
+        return lines, size, end + 1
+
+def _chunk_by_size(files: List[Tuple[str, int]], chunks: int) -> List[List[str]]:
+    """Split (path, size) pairs into at most `chunks` lists of similar total size
+
+        Largest files are placed first, each into the currently smallest chunk.
+    """
+    heap = [(0, i, []) for i in range(min(chunks, len(files)))]
+    for path, size in sorted(files, key=lambda f: f[1], reverse=True):
+        total, i, paths = heapq.heappop(heap)
+        paths.append(path)
+        heapq.heappush(heap, (total + size, i, paths))
+    return [paths for _, _, paths in sorted(heap, key=lambda c: c[1])]
+
+def _scan_files(paths: List[str], cutoff_ms: int, prefilter: bool, decoder: str) -> List[FileScan]:
+    """Process pool worker - parse whole files with a private LogReader
+
+        Rows are deduplicated within the chunk only, the parent process
+        deduplicates across chunks when merging.
+    """
+    reader = LogReader(prefilter=prefilter, decoder=decoder)
+    cutoff_time = from_epoch_ms(cutoff_ms)
+    results = []
+    for path in paths:
+        rows = reader.parse_lines(reader.read_new_lines(path, cutoff_time), cutoff_ms)
+        results.append(FileScan(
+            path=path,
+            cursor=reader.cursors.get(path),
+            rows=[
+                (unique_id, entry.model, entry.input_tokens, entry.output_tokens,
+                 entry.cache_write_tokens, entry.cache_read_tokens, entry.cost, entry.timestamp_ms)
+                for unique_id, entry in rows
+            ]
+        ))
+    return results
@@ -0,0 +1,294 @@
+### Wait for Claude to create or append jsonl files instead of polling on a timer
+
+import os
+import sys
+import time
+import errno
+import struct
+import ctypes
+import ctypes.util
+import selectors
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from sumonitor.data.log_reader import LogReader
+
+DEFAULT_DATA_PATH = "~/.claude/projects"
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+class LogWatcher:
+    """Base watcher - wait() blocks until a jsonl file changes, times out or wake() is called"""
+    def __init__(self, data_path: Optional[str] = None):
+        self.data_path = Path(data_path if data_path else DEFAULT_DATA_PATH).expanduser()
+        self.selector = selectors.DefaultSelector()
+        # self-pipe so other threads can interrupt a blocking wait
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_r, False)
+        os.set_blocking(self.wake_w, False)
+        self.selector.register(self.wake_r, selectors.EVENT_READ)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Block until a jsonl file is created or appended
+
+            Args:
+                timeout: max seconds to wait, None waits forever
+
+            Returns:
+                Set of changed jsonl paths, empty on timeout or wake()
+        """
+        raise NotImplementedError
+
+    def poll(self) -> Set[str]:
+        """Check for changes without blocking
+
+            Returns:
+                Set of jsonl paths changed since the last check
+        """
+        raise NotImplementedError
+
+    def fileno(self) -> Optional[int]:
+        """Descriptor that becomes readable when poll() has changes to report,
+        None if changes can only be found by calling poll() periodically"""
+        return None
+
+    def poll_until(self, timeout: Optional[float], interval: float) -> Set[str]:
+        """wait() built on calling poll() every interval seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if deadline is not None:
+                interval = min(interval, max(0.0, deadline - time.monotonic()))
+            if self.selector.select(interval):
+                self.drain_wake()
+                return set()
+
+            changed = self.poll()
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def wake(self) -> None:
+        """Interrupt a wait() running in another thread"""
+        try:
+            os.write(self.wake_w, b"\0")
+        except BlockingIOError:
+            # pipe already full, the waiter will wake up anyway
+            pass
+
+    def drain_wake(self) -> None:
+        """Empty the wake pipe after a wake-up"""
+        try:
+            while os.read(self.wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        """Release file descriptors"""
+        self.selector.close()
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+class InotifyWatcher(LogWatcher):
+    """Linux watcher built on inotify via ctypes
+
+        Switches to polling if a directory created later can't be watched,
+        its files would never be reported otherwise.
+    """
+    def __init__(self, data_path: Optional[str] = None, poll_interval: float = 1.0):
+        super().__init__(data_path)
+        self.poll_interval = poll_interval
+        # set once a watch fails, e.g. ENOSPC when fs.inotify.max_user_watches is used up
+        self.fallback: Optional[PollingWatcher] = None
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            super().close()
+            raise OSError(err, os.strerror(err))
+        self.watches: Dict[int, Path] = {}
+        self.selector.register(self.fd, selectors.EVENT_READ)
+        try:
+            self.add_tree(self.data_path)
+        except OSError:
+            # create_watcher() falls back to a PollingWatcher
+            self.close()
+            raise
+
+    def add_watch(self, directory: Path) -> None:
+        """Watch a single directory for new and modified entries
+
+            Raises:
+                OSError: the kernel refused the watch
+        """
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOENT:
+                # removed since it was listed, nothing left to watch
+                return
+            raise OSError(err, os.strerror(err), str(directory))
+        self.watches[wd] = directory
+
+    def add_tree(self, root: Path) -> Set[str]:
+        """Watch a directory and all of its subdirectories
+
+            Returns:
+                jsonl files that already exist in the tree, since they may have been
+                written before the watch was in place
+        """
+        found = set()
+        for dirpath, _, filenames in os.walk(root):
+            self.add_watch(Path(dirpath))
+            found.update(os.path.join(dirpath, name) for name in filenames if name.endswith(".jsonl"))
+        return found
+
+    def read_events(self) -> Tuple[Set[str], bool]:
+        """Read all pending inotify events
+
+            Returns:
+                changed jsonl paths, and whether the kernel queue overflowed
+        """
+        changed: Set[str] = set()
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            pos = 0
+            while pos < len(buf):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(buf, pos)
+                pos += EVENT_HEADER.size
+                name = buf[pos:pos + length].rstrip(b"\0").decode(errors="surrogateescape")
+                pos += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = directory / name
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and self.fallback is None:
+                        try:
+                            changed.update(self.add_tree(path))
+                        except OSError:
+                            self.start_polling()
+                            overflow = True
+                elif name.endswith(".jsonl"):
+                    changed.add(str(path))
+        return changed, overflow
+
+    def start_polling(self) -> None:
+        """Find changes by scanning from now on, inotify would miss the unwatched directory"""
+        self.fallback = PollingWatcher(str(self.data_path), poll_interval=self.poll_interval)
+        # events are still drained by poll(), but no longer wake wait()
+        self.selector.unregister(self.fd)
+
+    def poll(self) -> Set[str]:
+        changed, overflow = self.read_events()
+        if overflow:
+            # events were lost, report every file so callers re-check all of them
+            changed.update(str(p) for p in self.data_path.rglob("*.jsonl"))
+        elif self.fallback is not None:
+            changed = self.fallback.poll()
+        return changed
+
+    def fileno(self) -> Optional[int]:
+        return self.fd if self.fallback is None else None
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        if self.fallback is not None:
+            return self.poll_until(timeout, self.poll_interval)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready = self.selector.select(remaining)
+            if not ready:
+                return set()
+            for key, _ in ready:
+                if key.fd == self.wake_r:
+                    self.drain_wake()
+                    return set()
+            changed = self.poll()
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        super().close()
+        os.close(self.fd)
+        if self.fallback is not None:
+            self.fallback.close()
+
+class PollingWatcher(LogWatcher):
+    """Portable fallback that compares file sizes and mtimes every poll_interval seconds"""
+    def __init__(self, data_path: Optional[str] = None, poll_interval: float = 1.0):
+        super().__init__(data_path)
+        self.poll_interval = poll_interval
+        # reuse LogReader's cached discovery so a poll only lists changed directories
+        self.discovery = LogReader()
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Returns (size, mtime_ns) of every jsonl file under data_path"""
+        snapshot = {}
+        try:
+            files = self.discovery.get_jsonl_files(str(self.data_path))
+        except FileNotFoundError:
+            return snapshot
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[str(path)] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def poll(self) -> Set[str]:
+        snapshot = self.scan()
+        changed = {
+            path for path, state in snapshot.items()
+            if self.snapshot.get(path) != state
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        return self.poll_until(timeout, self.poll_interval)
+
+def create_watcher(data_path: Optional[str] = None, poll_interval: float = 1.0) -> LogWatcher:
+    """Pick the best available watcher for this platform
+
+        Args:
+            data_path: Path to Claude data directory
+            poll_interval: seconds between scans when falling back to polling
+
+        Returns:
+            InotifyWatcher on Linux when the directory exists, PollingWatcher otherwise
+    """
+    path = Path(data_path if data_path else DEFAULT_DATA_PATH).expanduser()
+    if sys.platform.startswith("linux") and path.exists():
+        try:
+            return InotifyWatcher(str(path), poll_interval=poll_interval)
+        except (OSError, AttributeError):
+            # no inotify support (old libc, exhausted instances or watches, ...)
+            pass
+    return PollingWatcher(str(path), poll_interval=poll_interval)
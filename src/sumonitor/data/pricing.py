@@ -1,12 +1,14 @@
 ### Pricing configuration for Claude models
 ### Ref: https://claude.com/pricing#api
 
+import re
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Optional
 
-@dataclass
+@dataclass(frozen=True)
 class ModelPricing:
-    """Model pricing configuration for Claude models"""
+    """Model pricing configuration for Claude models (frozen, instances are shared)"""
     input_base: int
     output_base: int
     cache_write: int
@@ -51,31 +53,34 @@ MODEL_PRICING: Dict[str, ModelPricing] = {
     "haiku-4-5": HAIKU_4_5
 }
 
+# zero-cost pricing shared by every unknown/synthetic model
+UNKNOWN_PRICING = ModelPricing(
+    input_base=0.0,
+    output_base=0.0,
+    cache_write=0.0,
+    cache_read=0.0,
+    tiered=False
+)
+
+# one pass over the model name finds any MODEL_PRICING key it contains
+MODEL_PATTERN = re.compile("|".join(re.escape(key) for key in MODEL_PRICING))
+
+@lru_cache(maxsize=128)
 def _get_pricing(model: str) -> ModelPricing:
-    """Get pricing for a model name
+    """Get pricing for a model name. Results are cached per raw model string,
+    since a log only ever contains a handful of distinct models
     
         Args:
             model: Claude model used for message
         
         Returns:
-            ModelPricing configuration for claude model
-        
-        Raises:
-            ValueError: if model is unknown
+            ModelPricing configuration for claude model, UNKNOWN_PRICING if the
+            model is not in MODEL_PRICING
     """
-    model_lower = model.lower()
-    for key, pricing in MODEL_PRICING.items():
-        if key in model_lower:
-            return pricing
-    
-    # Return zero-cost pricing for unknown/synthetic models
-    return ModelPricing(
-        input_base=0.0,
-        output_base=0.0,
-        cache_write=0.0,
-        cache_read=0.0,
-        tiered=False
-    )
+    match = MODEL_PATTERN.search(model.lower())
+    if match:
+        return MODEL_PRICING[match.group(0)]
+    return UNKNOWN_PRICING
 
 # Ref: https://github.com/Maciek-roboblog/Claude-Code-Usage-Monitor
 @dataclass
@@ -0,0 +1,185 @@
+### Persistent cache of parsed usage so a new launch only parses what changed
+
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sumonitor.data.log_reader import FileCursor, ModelUsage, UsageData, to_epoch_ms
+from sumonitor.session.session_tracker import SessionSummary
+
+# bump when the schema changes, older index files are rebuilt from scratch
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cursors (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage (
+    unique_id INTEGER PRIMARY KEY,
+    model TEXT,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cache_write_tokens INTEGER NOT NULL,
+    cache_read_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    timestamp_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_timestamp ON usage (timestamp_ms);
+CREATE TABLE IF NOT EXISTS session (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    totals TEXT NOT NULL,
+    models TEXT NOT NULL
+);
+"""
+
+class UsageIndex:
+    """SQLite backed store of file cursors and already parsed UsageData rows"""
+    def __init__(self, path: Optional[str] = None):
+        self.path = os.path.expanduser(path if path else '~/.cache/sumonitor/usage_index.db')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        try:
+            self.conn = self._connect()
+        except sqlite3.DatabaseError:
+            # index is only a cache - start over if the file is corrupt
+            os.remove(self.path)
+            self.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and make sure the tables exist"""
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS cursors; DROP TABLE IF EXISTS usage; "
+                               "DROP TABLE IF EXISTS session;")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.executescript(SCHEMA)
+        return conn
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """Read transaction, so loads inside it see one save even while another
+        process writes. Nothing is written"""
+        self.conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self.conn.rollback()
+
+    def load_cursors(self) -> Dict[str, FileCursor]:
+        """Returns saved read positions keyed by file path"""
+        rows = self.conn.execute("SELECT path, inode, size, offset FROM cursors")
+        return {
+            path: FileCursor(inode=inode, size=size, offset=offset)
+            for path, inode, size, offset in rows
+        }
+
+    def load_usage(self, since: datetime) -> List[Tuple[int, UsageData]]:
+        """Returns saved usage rows newer than a cutoff
+
+            Args:
+                since: oldest timestamp to load, older rows are deleted
+
+            Returns:
+                List of (DedupStore key, UsageData) in chronological order
+        """
+        cutoff_ms = to_epoch_ms(since)
+        with self.conn:
+            self.conn.execute("DELETE FROM usage WHERE timestamp_ms < ?", (cutoff_ms,))
+        rows = self.conn.execute(
+            "SELECT unique_id, model, input_tokens, output_tokens, cache_write_tokens, "
+            "cache_read_tokens, cost, timestamp_ms FROM usage ORDER BY timestamp_ms"
+        )
+        return [
+            (unique_id, UsageData(
+                model=model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cache_write_tokens=cache_write_tokens,
+                cache_read_tokens=cache_read_tokens,
+                cost=cost,
+                timestamp_ms=timestamp_ms
+            ))
+            for unique_id, model, input_tokens, output_tokens, cache_write_tokens,
+                cache_read_tokens, cost, timestamp_ms in rows
+        ]
+
+    def load_keys(self, since_ms: int) -> List[Tuple[int, int]]:
+        """Returns (DedupStore key, timestamp_ms) of rows from since_ms on, without building UsageData"""
+        return self.conn.execute(
+            "SELECT unique_id, timestamp_ms FROM usage WHERE timestamp_ms >= ?", (since_ms,)
+        ).fetchall()
+
+    def load_session(self) -> Optional[SessionSummary]:
+        """Returns the newest session as of the saved cursors, None if no save stored one"""
+        row = self.conn.execute("SELECT start_ms, totals, models FROM session").fetchone()
+        if row is None:
+            return None
+        start_ms, totals, models = row
+        return SessionSummary(
+            start_ms=start_ms,
+            totals=ModelUsage(**json.loads(totals)),
+            model_usage={model: ModelUsage(**usage) for model, usage in json.loads(models).items()},
+        )
+
+    def save(self, cursors: Dict[str, Optional[FileCursor]],
+             rows: Iterable[Tuple[int, UsageData]],
+             session: Optional[SessionSummary] = None) -> bool:
+        """Persist changed cursors and newly parsed rows in one transaction
+
+            Args:
+                cursors: changed cursors keyed by path, None for files that disappeared
+                rows: (DedupStore key, UsageData) pairs parsed since the last save
+                session: newest session including these rows. Without one the saved
+                    session is dropped, it would no longer match the cursors
+
+            Returns:
+                False if the transaction was rolled back, e.g. the database is locked
+                by another instance, so the caller can retry with the same data
+        """
+        try:
+            self._save(cursors, rows, session)
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _save(self, cursors: Dict[str, Optional[FileCursor]],
+              rows: Iterable[Tuple[int, UsageData]],
+              session: Optional[SessionSummary]) -> None:
+        with self.conn:
+            for path, cursor in cursors.items():
+                if cursor is None:
+                    self.conn.execute("DELETE FROM cursors WHERE path = ?", (path,))
+                else:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?)",
+                        (path, cursor.inode, cursor.size, cursor.offset)
+                    )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (unique_id, entry.model, entry.input_tokens, entry.output_tokens,
+                     entry.cache_write_tokens, entry.cache_read_tokens, entry.cost,
+                     entry.timestamp_ms)
+                    for unique_id, entry in rows
+                ]
+            )
+            if session is None:
+                self.conn.execute("DELETE FROM session")
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO session VALUES (0, ?, ?, ?, ?)",
+                    (session.start_ms, session.end_ms, json.dumps(asdict(session.totals)),
+                     json.dumps({model: asdict(usage) for model, usage in session.model_usage.items()}))
+                )
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self.conn.close()
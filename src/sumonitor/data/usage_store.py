@@ -0,0 +1,166 @@
+### Columnar, array backed storage of UsageData for long histories
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sumonitor.data.log_reader import ModelUsage, UsageData, to_epoch_ms
+
+try:
+    import numpy as np
+except ImportError:  # optional - sums fall back to the builtin sum()
+    np = None
+
+TOKEN_COLUMNS = ('input_tokens', 'output_tokens', 'cache_write_tokens', 'cache_read_tokens')
+
+class UsageColumns:
+    """Stores usage as parallel typed arrays kept in timestamp order
+
+    A row costs 50 bytes (epoch milliseconds, four token counts, cost and an
+    interned model id) instead of a UsageData object with its own datetime.
+    LogReader(columns=...) keeps its rows only here, not in usage_data.
+    Window totals bisect the timestamp column and sum column slices, using
+    NumPy views over the arrays when NumPy is installed.
+    """
+    def __init__(self):
+        self.timestamps = array('q')
+        self.input_tokens = array('q')
+        self.output_tokens = array('q')
+        self.cache_write_tokens = array('q')
+        self.cache_read_tokens = array('q')
+        self.cost = array('d')
+        self.model_ids = array('H')
+        # interned model names, model_ids index into this list
+        self.models: List[str] = []
+        self.model_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def model_id(self, model: Optional[str]) -> int:
+        """Intern a model name and return its id"""
+        model_id = self.model_index.get(model)
+        if model_id is None:
+            model_id = self.model_index[model] = len(self.models)
+            self.models.append(model)
+        return model_id
+
+    def append(self, entry: UsageData) -> None:
+        """Add a row, inserting in place if it is older than the newest row"""
+        timestamp = entry.timestamp_ms
+        i = len(self.timestamps)
+        if i and timestamp < self.timestamps[-1]:
+            i = bisect_right(self.timestamps, timestamp)
+        values = (
+            (self.timestamps, timestamp),
+            (self.input_tokens, entry.input_tokens),
+            (self.output_tokens, entry.output_tokens),
+            (self.cache_write_tokens, entry.cache_write_tokens),
+            (self.cache_read_tokens, entry.cache_read_tokens),
+            (self.cost, entry.cost),
+            (self.model_ids, self.model_id(entry.model)),
+        )
+        for column, value in values:
+            column.insert(i, value)
+
+    def extend(self, entries: Iterable[UsageData]) -> None:
+        """Add several rows"""
+        for entry in sorted(entries, key=lambda e: e.timestamp_ms):
+            self.append(entry)
+
+    def row(self, i: int) -> UsageData:
+        """Materialize a single row as UsageData"""
+        return UsageData(
+            model=self.models[self.model_ids[i]],
+            input_tokens=self.input_tokens[i],
+            output_tokens=self.output_tokens[i],
+            cache_write_tokens=self.cache_write_tokens[i],
+            cache_read_tokens=self.cache_read_tokens[i],
+            cost=self.cost[i],
+            timestamp_ms=self.timestamps[i]
+        )
+
+    def window(self, start: datetime, end: Optional[datetime] = None) -> slice:
+        """Row range with start <= timestamp <= end"""
+        lo = bisect_left(self.timestamps, to_epoch_ms(start))
+        hi = len(self.timestamps) if end is None else bisect_right(self.timestamps, to_epoch_ms(end))
+        return slice(lo, hi)
+
+    def column_sum(self, column: array, rows: slice):
+        """Sum of a column over a row range"""
+        if rows.stop <= rows.start:
+            return 0
+        if np is not None:
+            return np.frombuffer(column, dtype=column.typecode)[rows].sum().item()
+        return sum(column[rows])
+
+    def window_totals(self, start: datetime, end: Optional[datetime] = None) -> ModelUsage:
+        """Total usage of all rows in a time window
+
+            Args:
+                start: first timestamp to include
+                end: last timestamp to include, None for everything after start
+
+            Returns:
+                ModelUsage with token, cost and message totals
+        """
+        rows = self.window(start, end)
+        totals = ModelUsage(messages=rows.stop - rows.start)
+        for name in TOKEN_COLUMNS:
+            setattr(totals, name, int(self.column_sum(getattr(self, name), rows)))
+        totals.cost = float(self.column_sum(self.cost, rows))
+        return totals
+
+    def window_totals_by_model(self, start: datetime, end: Optional[datetime] = None) -> Dict[str, ModelUsage]:
+        """Usage totals per model for rows in a time window
+
+            Args:
+                start: first timestamp to include
+                end: last timestamp to include, None for everything after start
+
+            Returns:
+                ModelUsage per model name, only for models that have rows in the window
+        """
+        rows = self.window(start, end)
+        totals: Dict[str, ModelUsage] = {}
+        if rows.stop <= rows.start:
+            return totals
+
+        if np is not None:
+            ids = np.frombuffer(self.model_ids, dtype='H')[rows]
+            length = len(self.models)
+            messages = np.bincount(ids, minlength=length)
+            sums = {
+                name: np.bincount(ids, weights=np.frombuffer(getattr(self, name), dtype='q')[rows],
+                                  minlength=length)
+                for name in TOKEN_COLUMNS
+            }
+            costs = np.bincount(ids, weights=np.frombuffer(self.cost, dtype='d')[rows], minlength=length)
+            for model_id in np.flatnonzero(messages):
+                usage = totals[self.models[model_id]] = ModelUsage(messages=int(messages[model_id]))
+                for name in TOKEN_COLUMNS:
+                    setattr(usage, name, int(sums[name][model_id]))
+                usage.cost = float(costs[model_id])
+            return totals
+
+        for i in range(rows.start, rows.stop):
+            model = self.models[self.model_ids[i]]
+            usage = totals.get(model)
+            if usage is None:
+                usage = totals[model] = ModelUsage()
+            usage.input_tokens += self.input_tokens[i]
+            usage.output_tokens += self.output_tokens[i]
+            usage.cache_write_tokens += self.cache_write_tokens[i]
+            usage.cache_read_tokens += self.cache_read_tokens[i]
+            usage.cost += self.cost[i]
+            usage.messages += 1
+        return totals
+
+    def evict_before(self, cutoff_time: datetime) -> None:
+        """Drop rows older than cutoff_time"""
+        i = bisect_left(self.timestamps, to_epoch_ms(cutoff_time))
+        if i == 0:
+            return
+        for column in (self.timestamps, self.input_tokens, self.output_tokens,
+                       self.cache_write_tokens, self.cache_read_tokens, self.cost, self.model_ids):
+            del column[:i]
@@ -2,24 +2,67 @@
 
 ### Entry point. init pexpect and transfer control to claude
 
-import shutil, pexpect, signal, argparse, sys
-from .data.log_reader import LogReader
-from .session.session_data import SessionData
-from .terminal.terminal_handler import TerminalHandler
+import os, signal, argparse, sys
+from .data.pricing import _get_plan_limits
 from .config import Config
+from .metrics import METRICS, MetricsWriter
 
 def get_args_parser():
+    # imported here, `sumonitor stats` never builds this parser
+    import shutil
+    from .data.decoder import DECODERS
+
     parser = argparse.ArgumentParser(
         prog='sumonitor',
-        description='Real-time token and cost monitoring for Claude Code CLI')
+        description='Real-time token and cost monitoring for Claude Code CLI',
+        epilog='Run `sumonitor stats --help` to print usage without starting Claude.')
     parser.add_argument('--version', action='version', version='%(prog)s 0.1.1')
     parser.add_argument('--path', default=shutil.which('claude'), type=str,
                         help='Path to Claude Code installation (default: auto-detect with which)')
     parser.add_argument('--plan', default='pro', type=str, choices=['pro', 'max5', 'max20'],
                         help='Claude plan type (default: pro)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not use the on-disk usage index in ~/.cache/sumonitor')
+    parser.add_argument('--json-decoder', default='auto', choices=['auto', *DECODERS],
+                        help='JSON backend for parsing logs (default: auto, the fastest installed)')
+    parser.add_argument('--scan-workers', default=os.cpu_count() or 1, type=int,
+                        help='Processes used to parse logs on a cold start (default: number of CPUs, 1 disables)')
+    parser.add_argument('--engine', default='thread', choices=['thread', 'asyncio'],
+                        help='Run the overlay in background threads or on one asyncio event loop (default: thread)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Get usage from a background process shared by all sumonitor instances, started on demand')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time parsing, session building and drawing, print a summary on exit')
+    parser.add_argument('--metrics-file', type=str,
+                        help='Write the profile as JSON to this file while running (implies --profile)')
+    parser.add_argument('--metrics-interval', default=5.0, type=float,
+                        help='Seconds between --metrics-file writes (default: 5)')
     return parser
 
+def open_usage_index(disabled: bool = False):
+    """Open the persistent usage index, or None if disabled or unavailable"""
+    if disabled:
+        return None
+    import sqlite3
+    from .data.usage_index import UsageIndex
+    try:
+        return UsageIndex()
+    except (OSError, sqlite3.Error):
+        # the index only speeds up startup, run without it
+        return None
+
 def main():
+    if sys.argv[1:2] == ['stats']:
+        from .stats import main as stats_main
+        sys.exit(stats_main(sys.argv[2:]))
+
+    # the pty, overlay and parsing modules are only loaded here so `sumonitor stats` starts fast
+    import pexpect
+    from .data.log_reader import LogReader
+    from .terminal.terminal_handler import TerminalHandler
+    from .terminal.async_engine import AsyncEngine
+    from .terminal.refresh_scheduler import RefreshScheduler
+
     parser = get_args_parser()
     args = parser.parse_args()
 
@@ -40,13 +83,45 @@ def main():
     plan = cfg.get('plan', args.plan)
     path = cfg.get('path', args.path)
     
+    if args.daemon and args.engine == 'asyncio':
+        parser.error('--daemon is only supported with --engine thread')
+
+    if args.profile or args.metrics_file:
+        METRICS.enable()
+
+    log_reader, daemon = None, None
+    if args.daemon:
+        # imported here so `python -m sumonitor.daemon` doesn't find itself already imported
+        from .daemon import DaemonClient
+        daemon_args = ('--json-decoder', args.json_decoder) + (('--no-cache',) if args.no_cache else ())
+        daemon = DaemonClient(_get_plan_limits(plan), daemon_args=daemon_args)
+    else:
+        try:
+            log_reader = LogReader(index=open_usage_index(args.no_cache), decoder=args.json_decoder,
+                                   scan_workers=max(1, args.scan_workers))
+        except ImportError as e:
+            parser.error(str(e))
+
+    writer = MetricsWriter(METRICS, args.metrics_file, args.metrics_interval).start() \
+        if args.metrics_file else None
+
     p = pexpect.spawn(path, encoding='utf-8')
-    log_reader = LogReader()
-    th = TerminalHandler(log_reader=log_reader, pexpect_obj=p, plan=plan)
+    th = TerminalHandler(log_reader=log_reader, pexpect_obj=p, plan=plan,
+                         scheduler=RefreshScheduler.from_config(cfg),
+                         threaded=args.engine == 'thread', daemon=daemon)
 
-    p.setwinsize(*th.get_terminal_size()) # set terminal size on launch
-    signal.signal(signal.SIGWINCH, th.on_resize)
-    p.interact()
+    p.setwinsize(*th.cached_terminal_size()) # set terminal size on launch
+    try:
+        if args.engine == 'asyncio':
+            AsyncEngine(th, p).run()
+        else:
+            signal.signal(signal.SIGWINCH, th.on_resize)
+            p.interact()
+    finally:
+        if writer is not None:
+            writer.stop()
+        if METRICS.enabled:
+            print(METRICS.format_summary(), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
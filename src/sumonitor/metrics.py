@@ -0,0 +1,166 @@
+### Opt-in timers and counters for the parse -> session -> overlay hot path
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import ContextManager, Deque, Dict, Iterator
+
+# durations kept per stage for percentiles
+SAMPLE_WINDOW = 4096
+
+NOT_TIMED = nullcontext()
+
+@dataclass
+class StageTimer:
+    """Call count and total time of a stage, plus its most recent durations"""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_WINDOW))
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> float:
+        """Nearest rank percentile of the recent samples, p in 0-100"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+class Metrics:
+    """Collects stage timings and counters while enabled, does nothing otherwise
+
+    Callers in per-line loops check enabled themselves and use record(), so a
+    disabled profile costs one attribute lookup per line.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, StageTimer] = {}
+        self.started = time.monotonic()
+        # the reader and renderer threads record concurrently
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = {}
+            self.timers = {}
+            self.started = time.monotonic()
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add n to a counter"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add one duration to a stage timer"""
+        if not self.enabled:
+            return
+        with self.lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = StageTimer()
+            timer.add(seconds)
+
+    def timer(self, name: str) -> ContextManager[None]:
+        """Time the with block as one call of a stage"""
+        if not self.enabled:
+            # shared no-op, a disabled profile allocates nothing per tick
+            return NOT_TIMED
+        return self.timed(name)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        """Counters and per stage timings (seconds) as a JSON serialisable dict"""
+        with self.lock:
+            return {
+                "uptime": time.monotonic() - self.started,
+                "counters": dict(self.counters),
+                "timers": {name: timer.summary() for name, timer in self.timers.items()},
+            }
+
+    def format_summary(self) -> str:
+        """Human readable table of summary()"""
+        summary = self.summary()
+        lines = [f"sumonitor profile, {summary['uptime']:.1f}s"]
+        if summary["timers"]:
+            lines.append(f"{'stage':<12}{'calls':>8}{'total':>10}{'mean':>10}"
+                         f"{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+            for name, t in sorted(summary["timers"].items()):
+                lines.append(f"{name:<12}{t['count']:>8}{t['total']:>9.3f}s" +
+                             "".join(f"{t[k] * 1000:>8.2f}ms" for k in ("mean", "p50", "p95", "p99", "max")))
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f"{name:<20}{value:>12,}")
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write summary() as JSON, replacing the file atomically"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        os.replace(tmp, path)
+
+class MetricsWriter:
+    """Background thread that writes the metrics to a file every interval seconds"""
+    def __init__(self, metrics: Metrics, path: str, interval: float = 5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self) -> "MetricsWriter":
+        self.thread.start()
+        return self
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        try:
+            self.metrics.write(self.path)
+        except OSError:
+            # a missing directory or full disk shouldn't take the overlay down
+            pass
+
+    def stop(self) -> None:
+        """Stop the thread and write the final numbers"""
+        self.stopped.set()
+        self.thread.join(timeout=1.0)
+        self.write()
+
+# process wide instance used by the instrumented modules, off unless --profile
+METRICS = Metrics()
@@ -1,19 +1,133 @@
 ### Calculate total usage metrics for session
 
 import datetime
-from typing import List
-from sumonitor.data.log_reader import UsageData
-from sumonitor.data.pricing import _get_plan_limits
-from sumonitor.session.session_tracker import SessionTracker
-from datetime import datetime, timezone
+from dataclasses import asdict, dataclass, replace
+from typing import Dict, List, Optional, Tuple
+from sumonitor.data.log_reader import DEFAULT_HOURS_BACK, UsageData, from_epoch_ms, to_epoch_ms
+from sumonitor.data.pricing import PlanLimits, _get_plan_limits
+from sumonitor.session.session_tracker import ModelUsage, SessionSummary, SessionTracker
+from datetime import datetime, timedelta, timezone
+
+def format_time_left(session_end: Optional[datetime], now: Optional[datetime] = None) -> str:
+    """Time left until session_end in user readable form
+
+        Args:
+            session_end: end of the current session, None if there is none
+            now: time to count from, defaults to the current time
+
+        Returns:
+            e.g. "2h 5m", "4m 10s", "9s", or a message if there is no active session
+    """
+    if session_end is None:
+        return "No active session"
+
+    time_left = session_end - (now if now is not None else datetime.now(timezone.utc))
+    total_seconds = int(time_left.total_seconds())
+    # convert to human readable format
+    if total_seconds < 0:
+        return 'Session expired - waiting to start a new conversation'
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+
+    if hours > 0:
+      return f"{hours}h {minutes}m"
+    elif minutes > 0:
+        return f"{minutes}m {seconds}s"
+    else:
+        return f"{seconds}s"
+
+@dataclass(frozen=True)
+class UsageSnapshot:
+    """Immutable copy of the numbers the overlay shows
+
+    Built by whoever parses the logs and handed to the renderer by swapping a
+    single reference, so the renderer never sees a half updated session. The
+    session end is kept rather than the formatted countdown so the renderer can
+    tick the countdown without a new snapshot.
+    """
+    plan_limits: PlanLimits
+    has_sessions: bool = False
+    total_tokens: int = 0
+    session_end: Optional[datetime] = None
+    session_messages: int = 0
+    total_cost: float = 0.0
+    # (model id, totals) of the current session, copies the snapshot owns
+    models: Tuple[Tuple[str, ModelUsage], ...] = ()
+
+    def session_reset_time(self, now: Optional[datetime] = None) -> str:
+        """Time left before the session resets, as of now"""
+        return format_time_left(self.session_end, now)
+
+    def to_dict(self) -> dict:
+        """JSON serialisable numbers without the plan limits, which each reader applies itself"""
+        return {
+            "has_sessions": self.has_sessions,
+            "total_tokens": self.total_tokens,
+            "session_end_ms": to_epoch_ms(self.session_end) if self.session_end else None,
+            "session_messages": self.session_messages,
+            "total_cost": self.total_cost,
+            "models": {model: asdict(usage) for model, usage in self.models},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, plan_limits: PlanLimits) -> "UsageSnapshot":
+        """Rebuild a snapshot from to_dict() output
+
+            Args:
+                data: dict produced by to_dict()
+                plan_limits: limits of the reader's plan
+        """
+        session_end_ms = data.get("session_end_ms")
+        return cls(
+            plan_limits=plan_limits,
+            has_sessions=bool(data.get("has_sessions")),
+            total_tokens=int(data.get("total_tokens", 0)),
+            session_end=from_epoch_ms(session_end_ms) if session_end_ms is not None else None,
+            session_messages=int(data.get("session_messages", 0)),
+            total_cost=float(data.get("total_cost", 0.0)),
+            models=tuple((model, ModelUsage(**usage))
+                         for model, usage in data.get("models", {}).items()),
+        )
+
+    @classmethod
+    def from_summary(cls, summary: Optional[SessionSummary], plan_limits: PlanLimits,
+                     now: Optional[datetime] = None) -> "UsageSnapshot":
+        """Snapshot of the newest session's totals, as SessionData.snapshot() reports it
+
+            Args:
+                summary: newest session, None if there is none
+                plan_limits: limits of the reader's plan
+                now: time the session is checked against, defaults to now
+        """
+        now_ms = to_epoch_ms(now if now is not None else datetime.now(timezone.utc))
+        if summary is None or summary.end_ms <= now_ms:
+            # sessions are dropped once they ended DEFAULT_HOURS_BACK ago
+            window_ms = timedelta(hours=DEFAULT_HOURS_BACK) // timedelta(milliseconds=1)
+            has_sessions = summary is not None and summary.end_ms >= now_ms - window_ms
+            return cls(plan_limits=plan_limits, has_sessions=has_sessions)
+        totals = summary.totals
+        return cls(
+            plan_limits=plan_limits,
+            has_sessions=True,
+            total_tokens=totals.input_tokens + totals.output_tokens,
+            session_end=from_epoch_ms(summary.end_ms),
+            session_messages=totals.messages,
+            total_cost=totals.cost,
+            models=tuple((model, replace(usage)) for model, usage in summary.model_usage.items()),
+        )
 
 class SessionData:
     """Calculates total usage data along with session relevant data like time left before reset"""
-    def __init__(self, usage_data: List[UsageData], plan: str):
+    def __init__(self, usage_data: Optional[List[UsageData]], plan: str,
+                 session_tracker: Optional[SessionTracker] = None):
         self.plan_limits = _get_plan_limits(plan)
 
-        self.session_tracker = SessionTracker()
-        self.session_tracker.build_sessions(usage_data)
+        # an existing tracker is kept up to date by the caller, don't rebuild it
+        if session_tracker is None:
+            session_tracker = SessionTracker()
+            session_tracker.build_sessions(usage_data or [])
+        self.session_tracker = session_tracker
         self.current_session = self.session_tracker.get_current_session()
         
     def total_tokens(self) -> int:
@@ -31,26 +145,7 @@ class SessionData:
             Returns:
                 Time left in user readable form
         """
-
-        if self.current_session is None:
-            return "No active session"
-
-        current_session_end = self.current_session.end_time
-        time_left = current_session_end - datetime.now(timezone.utc)
-        total_seconds = int(time_left.total_seconds())
-        # convert to human readable format
-        if total_seconds < 0:
-            return 'Session expired - waiting to start a new conversation'
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-
-        if hours > 0:
-          return f"{hours}h {minutes}m"
-        elif minutes > 0:
-            return f"{minutes}m {seconds}s"
-        else:
-            return f"{seconds}s"
+        return format_time_left(self.current_session.end_time if self.current_session else None)
 
     def session_messages(self) -> int:
         """Returns how many messages have been sent in session"""
@@ -63,4 +158,22 @@ class SessionData:
         if self.current_session is None:
             return 0.0
         return self.current_session.total_costs
-    
\ No newline at end of file
+
+    def model_breakdown(self) -> Dict[str, ModelUsage]:
+        """Returns usage totals per model for the current session"""
+        if self.current_session is None:
+            return {}
+        return self.current_session.model_usage
+
+    def snapshot(self) -> UsageSnapshot:
+        """Returns the current session's numbers as an immutable UsageSnapshot"""
+        return UsageSnapshot(
+            plan_limits=self.plan_limits,
+            has_sessions=bool(self.session_tracker.sessions),
+            # total_tokens() is 0.0 without a session
+            total_tokens=int(self.total_tokens()),
+            session_end=self.current_session.end_time if self.current_session else None,
+            session_messages=self.session_messages(),
+            total_cost=self.total_cost(),
+            models=tuple((model, replace(usage)) for model, usage in self.model_breakdown().items()),
+        )
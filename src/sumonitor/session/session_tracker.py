@@ -1,48 +1,92 @@
 ### Identifies and groups [UsageData] into sessions
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
-from sumonitor.data.log_reader import UsageData
+from typing import Dict, Iterable, List, Optional
+from sumonitor.data.log_reader import ModelUsage, UsageData, to_epoch_ms
+
+# length of a usage window
+SESSION_DURATION = timedelta(hours=5)
+SESSION_MS = SESSION_DURATION // timedelta(milliseconds=1)
+
+def _count_entry(totals: ModelUsage, model_usage: Dict[str, ModelUsage], entry: UsageData) -> None:
+    """Add an entry's usage to session and per model totals"""
+    totals.add(entry)
+    usage = model_usage.get(entry.model)
+    if usage is None:
+        usage = model_usage[entry.model] = ModelUsage()
+    usage.add(entry)
 
 @dataclass
 class Session:
+    """5 hour usage window. Totals are kept up to date as entries are added with
+    add_entry(), so reading them doesn't loop over entries"""
     session_id: str
     start_time: datetime
     entries: List[UsageData]
+    totals: ModelUsage = field(default_factory=ModelUsage, init=False)
+    model_usage: Dict[str, ModelUsage] = field(default_factory=dict, init=False)
+    # start_time and end_time in epoch milliseconds, for comparing against entries
+    start_ms: int = field(default=0, init=False)
+    end_ms: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self.start_ms = to_epoch_ms(self.start_time)
+        self.end_ms = self.start_ms + SESSION_MS
+        for entry in self.entries:
+            self.count_entry(entry)
+
+    def add_entry(self, entry: UsageData) -> None:
+        """Append an entry and update the running totals"""
+        self.entries.append(entry)
+        self.count_entry(entry)
+
+    def count_entry(self, entry: UsageData) -> None:
+        """Add an entry's usage to the session and per model totals"""
+        _count_entry(self.totals, self.model_usage, entry)
+
+    def summary(self) -> "SessionSummary":
+        """Copy of the session's totals without its entries"""
+        return SessionSummary(
+            start_ms=self.start_ms,
+            totals=replace(self.totals),
+            model_usage={model: replace(usage) for model, usage in self.model_usage.items()},
+        )
 
     @property
     def end_time(self) -> datetime:
         """Tells when session expires - 5 hours from start"""
-        return self.start_time + timedelta(hours=5)
+        return self.start_time + SESSION_DURATION
     
     @property
     def is_active(self) -> bool:
         """checks if session is within 5 hours window"""
-        return datetime.now(timezone.utc) < self.end_time
+        return to_epoch_ms(datetime.now(timezone.utc)) < self.end_ms
     
     @property
     def total_input_usage(self) -> int:
         """Returns total input tokens in session"""
-        token_usage = 0
-        for entry in self.entries:
-            token_usage += entry.input_tokens
-        return token_usage
+        return self.totals.input_tokens
     
     @property
     def total_output_usage(self) -> int:
         """Returns total output tokens in session"""
-        token_usage =  0
-        for entry in self.entries:
-            token_usage += entry.output_tokens
-        return token_usage
+        return self.totals.output_tokens
+
+    @property
+    def total_cache_write_usage(self) -> int:
+        """Returns total cache write tokens in session"""
+        return self.totals.cache_write_tokens
+
+    @property
+    def total_cache_read_usage(self) -> int:
+        """Returns total cache read tokens in session"""
+        return self.totals.cache_read_tokens
     
     @property
     def total_tokens(self) -> int:
         """Returns total input + output tokens in session"""
-        inp_tokens = self.total_input_usage
-        out_tokens = self.total_output_usage
-        return inp_tokens + out_tokens
+        return self.totals.input_tokens + self.totals.output_tokens
     
     @property
     def total_messages(self) -> int:
@@ -52,12 +96,53 @@ class Session:
     @property
     def total_costs(self) -> float:
         """Returns total dollar cost usage in session"""
-        total_cost = 0.0
-        for entry in self.entries:
-            total_cost += entry.cost
-        return total_cost
+        return self.totals.cost
     
+@dataclass
+class SessionSummary:
+    """Totals of a session without its entries, saved in the usage index so
+    `sumonitor stats` can report the current session without loading every row"""
+    start_ms: int
+    totals: ModelUsage = field(default_factory=ModelUsage)
+    model_usage: Dict[str, ModelUsage] = field(default_factory=dict)
+
+    @property
+    def end_ms(self) -> int:
+        """End of the 5 hour window in epoch milliseconds"""
+        return self.start_ms + SESSION_MS
+
+    def extend(self, entries: Iterable[UsageData]) -> "SessionSummary":
+        """Add entries parsed after the summary was saved
+
+            Entries past the end of the window start a new session, like
+            SessionTracker.append_entry(). Entries older than the session belong
+            to earlier ones and are skipped.
+
+            Returns:
+                Summary of the session the newest entry falls in, self if none did
+        """
+        summary = self
+        for entry in sorted(entries, key=lambda e: e.timestamp_ms):
+            if entry.timestamp_ms > summary.end_ms:
+                summary = SessionSummary(start_ms=entry.timestamp_ms)
+            if entry.timestamp_ms >= summary.start_ms:
+                _count_entry(summary.totals, summary.model_usage, entry)
+        return summary
+
+def _bisect_right(items: list, timestamp: int, key) -> int:
+    """bisect_right over items sorted by key(item), for Pythons without bisect's key="""
+    lo, hi = 0, len(items)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if timestamp < key(items[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
 class SessionTracker:
+    """Groups entries into sessions. Entries can be added incrementally with
+    add_entries(), build_sessions() starts over from a full list"""
     def __init__(self):
         self.sessions: List[Session] = []
 
@@ -68,10 +153,16 @@ class SessionTracker:
     def get_active_sessions(self) -> List[Session]:
         return [session for session in self.sessions if session.is_active]
     
+    def last_summary(self) -> Optional[SessionSummary]:
+        """Totals of the newest session, None without sessions"""
+        return self.sessions[-1].summary() if self.sessions else None
+
     def get_current_session(self) -> Session:
         """Get most recent session"""
-        active = self.get_active_sessions()
-        return active[-1] if active else None
+        # sessions don't overlap, so only the newest one can still be active
+        if self.sessions and self.sessions[-1].is_active:
+            return self.sessions[-1]
+        return None
 
     def build_sessions(self, entries: List[UsageData]):
         """Build session windows from usage entries
@@ -81,32 +172,68 @@ class SessionTracker:
 
         """
         self.sessions=[]
-        current_session: Session = None
+        self.add_entries(entries)
 
-        if not entries:
-            return
-        
+    def add_entries(self, entries: List[UsageData]) -> None:
+        """Add newly parsed entries to the existing sessions
+
+            Entries newer than everything seen so far are appended to the current
+            session or start a new one. An older entry is bisect-inserted into the
+            session it falls in, and only when it lands before or between sessions
+            are the later sessions regrouped.
+
+            Args:
+                entries: new UsageData objects, in any order
+        """
         # sort UsageData objects by time created
-        sorted_entries = sorted(entries, key=lambda e: e.timestamp)
-        
-        for entry in sorted_entries:
-            if current_session is None:
-                current_session = Session(
-                    session_id=self.generate_session_id(entry.timestamp),
-                    start_time=entry.timestamp,
-                    entries=[entry]
-                )
-                self.sessions.append(current_session)
-
-            # if entry is after session block, create a new session
-            elif entry.timestamp > current_session.end_time:
-                current_session = Session(
-                    session_id=self.generate_session_id(entry.timestamp),
-                    start_time=entry.timestamp,
-                    entries=[entry]
-                )
-                self.sessions.append(current_session)
-            
-            # add entry to existing session
+        for entry in sorted(entries, key=lambda e: e.timestamp_ms):
+            if not self.sessions or entry.timestamp_ms >= self.sessions[-1].entries[-1].timestamp_ms:
+                self.append_entry(entry)
             else:
-                current_session.entries.append(entry)
\ No newline at end of file
+                self.insert_entry(entry)
+
+    def append_entry(self, entry: UsageData) -> None:
+        """Add an entry that is not older than any entry already tracked"""
+        current_session = self.sessions[-1] if self.sessions else None
+
+        # if entry is after session block, create a new session
+        if current_session is None or entry.timestamp_ms > current_session.end_ms:
+            self.sessions.append(Session(
+                session_id=self.generate_session_id(entry.timestamp),
+                start_time=entry.timestamp,
+                entries=[entry]
+            ))
+
+        # add entry to existing session
+        else:
+            current_session.add_entry(entry)
+
+    def insert_entry(self, entry: UsageData) -> None:
+        """Add an entry that arrived out of order"""
+        i = _bisect_right(self.sessions, entry.timestamp_ms, key=lambda s: s.start_ms) - 1
+        if i >= 0 and entry.timestamp_ms <= self.sessions[i].end_ms:
+            # inside an existing window - no session boundary moves
+            session = self.sessions[i]
+            pos = _bisect_right(session.entries, entry.timestamp_ms, key=lambda e: e.timestamp_ms)
+            session.entries.insert(pos, entry)
+            session.count_entry(entry)
+            return
+
+        # before the first session or in a gap - it starts a new window that
+        # may take over entries of the following sessions, so regroup those
+        replay = [entry]
+        for session in self.sessions[i + 1:]:
+            replay.extend(session.entries)
+        del self.sessions[i + 1:]
+        for replayed in replay:
+            self.append_entry(replayed)
+
+    def prune_before(self, cutoff_time: datetime) -> None:
+        """Drop sessions that ended before cutoff_time
+
+            Args:
+                cutoff_time: sessions whose window closed before this are removed
+        """
+        cutoff_ms = to_epoch_ms(cutoff_time)
+        while self.sessions and self.sessions[0].end_ms < cutoff_ms:
+            self.sessions.pop(0)
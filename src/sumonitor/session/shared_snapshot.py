@@ -0,0 +1,179 @@
+### Fixed layout memory mapped copy of the latest snapshot, guarded by a seqlock
+
+import os
+import time
+import mmap
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sumonitor.data.log_reader import ModelUsage, from_epoch_ms, to_epoch_ms
+from sumonitor.data.pricing import PlanLimits
+from sumonitor.session.session_data import UsageSnapshot
+
+MAGIC = b'SUMS'
+LAYOUT_VERSION = 1
+
+# Layout, little endian:
+#   header   magic, layout version, sequence number
+#   body     has_sessions, model count, total tokens, session end (ms, NO_SESSION_END
+#            if none), session messages, total cost, publish time (ms)
+#   models   MAX_MODELS slots of model id (utf-8, NUL padded), input, output,
+#            cache write and cache read tokens, cost, messages
+HEADER = struct.Struct('<4sIQ')
+SEQUENCE = struct.Struct('<Q')
+SEQUENCE_OFFSET = 8
+BODY = struct.Struct('<?3xIqqqdq')
+MODEL_NAME_BYTES = 48
+MODEL = struct.Struct(f'<{MODEL_NAME_BYTES}sqqqqdq')
+MAX_MODELS = 8
+PAYLOAD_OFFSET = HEADER.size
+PAYLOAD_SIZE = BODY.size + MAX_MODELS * MODEL.size
+SIZE = PAYLOAD_OFFSET + PAYLOAD_SIZE
+
+NO_SESSION_END = -(1 << 63)
+# attempts before a reader gives up on a writer that keeps the sequence odd
+READ_ATTEMPTS = 1000
+
+def default_snapshot_path() -> str:
+    """tmpfs under /dev/shm when available, so publishing never touches a disk"""
+    if os.path.isdir('/dev/shm'):
+        return f'/dev/shm/sumonitor-{os.getuid()}.snapshot'
+    return os.path.expanduser('~/.cache/sumonitor/snapshot.shm')
+
+@dataclass(frozen=True)
+class PublishedSnapshot:
+    """A snapshot read from shared memory and when the writer published it"""
+    snapshot: UsageSnapshot
+    published_ms: int
+
+    def age(self, now: Optional[datetime] = None) -> float:
+        """Seconds since publication, a large age means the writer is gone"""
+        now = now if now is not None else datetime.now(timezone.utc)
+        return (to_epoch_ms(now) - self.published_ms) / 1000
+
+class SharedSnapshotWriter:
+    """Publishes snapshots into the shared region, one writer per path
+
+    Seqlock: the sequence number is made odd before the payload is copied in
+    and even again afterwards, so a reader that saw the same even number before
+    and after copying the payload has a consistent copy. CPython can't emit
+    memory fences; each store is a single memcpy into the mapping, which is
+    ordered on x86 and in practice on the other platforms CPython runs on.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path else default_snapshot_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != SIZE:
+                os.ftruncate(fd, SIZE)
+            self.mm = mmap.mmap(fd, SIZE)
+        finally:
+            os.close(fd)
+        magic, version, sequence = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            HEADER.pack_into(self.mm, 0, MAGIC, LAYOUT_VERSION, 0)
+        elif sequence % 2:
+            # a previous writer died halfway through, readers would wait forever
+            SEQUENCE.pack_into(self.mm, SEQUENCE_OFFSET, sequence + 1)
+
+    def publish(self, snapshot: UsageSnapshot, now_ms: Optional[int] = None) -> None:
+        """Copy a snapshot into the region
+
+            Models beyond MAX_MODELS, the cheapest first, are left out of the
+            breakdown but still counted in the totals.
+        """
+        payload = bytearray(PAYLOAD_SIZE)
+        models = sorted(snapshot.models, key=lambda item: item[1].cost, reverse=True)[:MAX_MODELS]
+        BODY.pack_into(
+            payload, 0,
+            snapshot.has_sessions,
+            len(models),
+            int(snapshot.total_tokens),
+            to_epoch_ms(snapshot.session_end) if snapshot.session_end else NO_SESSION_END,
+            snapshot.session_messages,
+            snapshot.total_cost,
+            now_ms if now_ms is not None else to_epoch_ms(datetime.now(timezone.utc)),
+        )
+        for i, (model, usage) in enumerate(models):
+            MODEL.pack_into(
+                payload, BODY.size + i * MODEL.size,
+                model.encode()[:MODEL_NAME_BYTES],
+                usage.input_tokens, usage.output_tokens, usage.cache_write_tokens,
+                usage.cache_read_tokens, usage.cost, usage.messages,
+            )
+
+        sequence = SEQUENCE.unpack_from(self.mm, SEQUENCE_OFFSET)[0]
+        SEQUENCE.pack_into(self.mm, SEQUENCE_OFFSET, sequence + 1)
+        self.mm[PAYLOAD_OFFSET:SIZE] = payload
+        SEQUENCE.pack_into(self.mm, SEQUENCE_OFFSET, sequence + 2)
+
+    def close(self) -> None:
+        self.mm.close()
+
+class SharedSnapshotReader:
+    """Reads the latest snapshot from the shared region without any syscalls
+
+    Any number of processes can read concurrently, they never block the writer.
+    """
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path else default_snapshot_path()
+        with open(self.path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+
+    def read(self, plan_limits: PlanLimits) -> Optional[PublishedSnapshot]:
+        """Consistent copy of the last published snapshot
+
+            Args:
+                plan_limits: limits of the reader's plan
+
+            Returns:
+                PublishedSnapshot, or None if nothing was published yet or the
+                writer stayed mid-update for READ_ATTEMPTS tries
+        """
+        magic, version, _ = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            return None
+        for attempt in range(READ_ATTEMPTS):
+            before = SEQUENCE.unpack_from(self.mm, SEQUENCE_OFFSET)[0]
+            if before == 0:
+                return None
+            if before % 2 == 0:
+                payload = self.mm[PAYLOAD_OFFSET:SIZE]
+                if SEQUENCE.unpack_from(self.mm, SEQUENCE_OFFSET)[0] == before:
+                    return _unpack(payload, plan_limits)
+            if attempt >= 10:
+                # writer preempted mid-update, give it the CPU
+                time.sleep(0)
+        return None
+
+    def close(self) -> None:
+        self.mm.close()
+
+def _unpack(payload: bytes, plan_limits: PlanLimits) -> PublishedSnapshot:
+    has_sessions, model_count, total_tokens, session_end_ms, session_messages, \
+        total_cost, published_ms = BODY.unpack_from(payload, 0)
+    models = []
+    for i in range(min(model_count, MAX_MODELS)):
+        name, input_tokens, output_tokens, cache_write_tokens, cache_read_tokens, \
+            cost, messages = MODEL.unpack_from(payload, BODY.size + i * MODEL.size)
+        models.append((name.rstrip(b'\0').decode(errors='replace'), ModelUsage(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_write_tokens=cache_write_tokens,
+            cache_read_tokens=cache_read_tokens,
+            cost=cost,
+            messages=messages,
+        )))
+    snapshot = UsageSnapshot(
+        plan_limits=plan_limits,
+        has_sessions=has_sessions,
+        total_tokens=total_tokens,
+        session_end=from_epoch_ms(session_end_ms) if session_end_ms != NO_SESSION_END else None,
+        session_messages=session_messages,
+        total_cost=total_cost,
+        models=tuple(models),
+    )
+    return PublishedSnapshot(snapshot=snapshot, published_ms=published_ms)
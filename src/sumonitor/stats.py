@@ -0,0 +1,159 @@
+### Headless `sumonitor stats` - current session usage for status bars and scripts
+
+import sys
+import json
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from .config import Config
+from .data.pricing import PlanLimits, _get_plan_limits
+from .session.session_data import SessionData, UsageSnapshot, format_time_left
+from .session.session_tracker import SessionTracker
+from .session.shared_snapshot import SharedSnapshotReader
+
+# the daemon republishes at least every idle refresh interval, an older shared
+# snapshot means it's gone and the logs have to be read here
+MAX_SNAPSHOT_AGE = 15.0
+
+# names of sumonitor.data.decoder.DECODERS, spelled out so the daemon path never
+# imports the JSON backends
+JSON_DECODERS = ('msgspec', 'orjson', 'json')
+
+# same text as the overlay
+DEFAULT_TEMPLATE = ("Tokens: {total_tokens}/{token_limit} | Session reset in: {reset_in} | "
+                    "Messages: {messages}/{message_limit} | Cost: {cost:.2f}/{cost_limit} $")
+
+def get_args_parser():
+    parser = argparse.ArgumentParser(
+        prog='sumonitor stats',
+        description='Print the current session usage without starting Claude')
+    parser.add_argument('--plan', default=None, type=str, choices=['pro', 'max5', 'max20'],
+                        help='Claude plan type (default: the saved plan, else pro)')
+    parser.add_argument('--format', default='line', choices=['line', 'json'],
+                        help='One line of text or a JSON object (default: line)')
+    parser.add_argument('--template', default=DEFAULT_TEMPLATE, type=str,
+                        help='Python format string for --format line, fields: total_tokens, token_limit, '
+                             'messages, message_limit, cost, cost_limit, reset_in, reset_in_seconds, plan')
+    parser.add_argument('--no-daemon', action='store_true',
+                        help="Ignore the snapshot published by a running sumonitor daemon")
+    parser.add_argument('--max-age', default=MAX_SNAPSHOT_AGE, type=float,
+                        help='Oldest daemon snapshot to trust, in seconds (default: 15)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not use the on-disk usage index in ~/.cache/sumonitor')
+    parser.add_argument('--json-decoder', default='auto', choices=['auto', *JSON_DECODERS],
+                        help='JSON backend for parsing logs (default: auto, the fastest installed)')
+    return parser
+
+def read_shared_snapshot(plan_limits: PlanLimits, max_age: float) -> Optional[UsageSnapshot]:
+    """The daemon's latest snapshot, or None if no daemon published one recently"""
+    try:
+        reader = SharedSnapshotReader()
+    except (OSError, ValueError):
+        # missing, or shorter than the layout
+        return None
+    try:
+        published = reader.read(plan_limits)
+    finally:
+        reader.close()
+    if published is None or published.age() > max_age:
+        return None
+    return published.snapshot
+
+def parse_snapshot(plan: str, no_cache: bool = False, decoder: str = "auto") -> UsageSnapshot:
+    """Snapshot built from the session saved in the usage index plus whatever was appended since
+
+        The overlay and the daemon save the newest session with their cursors, so
+        only the appended lines are parsed and nothing is written. Without a saved
+        session every log in the window is parsed once and saved with one.
+        No Claude log directory yet, e.g. on a fresh machine, means no session.
+
+        Raises:
+            ImportError: if the requested JSON decoder is not installed
+    """
+    # only needed without a fresh daemon snapshot
+    from .data.log_reader import LogReader
+    from .main import open_usage_index
+
+    index = open_usage_index(no_cache)
+    log_reader = LogReader(index=index, decoder=decoder)
+    try:
+        session = log_reader.load_session() if index is not None else None
+        if session is not None:
+            try:
+                session = session.extend(log_reader.parse_new_entries())
+            except FileNotFoundError:
+                pass
+            return UsageSnapshot.from_summary(session, _get_plan_limits(plan))
+
+        session_tracker = SessionTracker()
+        try:
+            session_tracker.add_entries(log_reader.parse_new_entries(save=False))
+        except FileNotFoundError:
+            pass
+        log_reader.save_index(session_tracker.last_summary())
+        return SessionData(usage_data=None, plan=plan, session_tracker=session_tracker).snapshot()
+    finally:
+        if index is not None:
+            index.close()
+
+def stats_dict(snapshot: UsageSnapshot, plan: str, source: str,
+               now: Optional[datetime] = None) -> dict:
+    """Everything `sumonitor stats` prints, JSON serialisable
+
+        Args:
+            snapshot: current session snapshot
+            plan: plan whose limits are reported
+            source: "daemon" or "logs"
+            now: time the countdown is computed for, defaults to now
+    """
+    now = now if now is not None else datetime.now(timezone.utc)
+    session_end = snapshot.session_end
+    limits = snapshot.plan_limits
+    return {
+        "plan": plan,
+        "source": source,
+        "active": session_end is not None and session_end > now,
+        "total_tokens": snapshot.total_tokens,
+        "token_limit": limits.tokens,
+        "messages": snapshot.session_messages,
+        "message_limit": limits.messages,
+        "cost": snapshot.total_cost,
+        "cost_limit": limits.cost,
+        "session_end": session_end.isoformat() if session_end else None,
+        "reset_in_seconds": max(0, int((session_end - now).total_seconds())) if session_end else None,
+        "reset_in": format_time_left(session_end, now),
+        "models": {model: asdict(usage) for model, usage in snapshot.models},
+    }
+
+def format_line(stats: dict, template: str = DEFAULT_TEMPLATE) -> str:
+    return template.format(**stats)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = get_args_parser()
+    args = parser.parse_args(argv)
+    plan = args.plan or Config().load_config().get('plan', 'pro')
+    plan_limits = _get_plan_limits(plan)
+
+    snapshot, source = None, "daemon"
+    if not args.no_daemon:
+        snapshot = read_shared_snapshot(plan_limits, args.max_age)
+    if snapshot is None:
+        try:
+            snapshot, source = parse_snapshot(plan, args.no_cache, args.json_decoder), "logs"
+        except ImportError as e:
+            parser.error(str(e))
+
+    stats = stats_dict(snapshot, plan, source)
+    if args.format == 'json':
+        print(json.dumps(stats))
+    else:
+        try:
+            print(format_line(stats, args.template))
+        except (KeyError, IndexError, ValueError) as e:
+            parser.error(f"invalid --template: {e!r}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
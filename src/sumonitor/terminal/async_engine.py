@@ -0,0 +1,177 @@
+### Single event loop alternative to pexpect's interact() plus the overlay threads
+
+import os
+import sys
+import tty
+import errno
+import signal
+import asyncio
+import termios
+from typing import Optional
+
+from .terminal_handler import TerminalHandler
+from ..metrics import METRICS
+
+# Ctrl-], hands control back like pexpect's interact()
+ESCAPE_CHARACTER = b'\x1d'
+READ_SIZE = 64 * 1024
+
+def write_all(fd: int, data: bytes) -> None:
+    """os.write() until everything is written, like pexpect's interact()
+
+    A single write can be short, e.g. a large paste into a full pty buffer.
+    """
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+class AsyncEngine:
+    """Runs Claude's pty proxying, log watching, refresh timers and SIGWINCH
+    handling as callbacks on one asyncio event loop
+
+    Keystrokes and child output are copied by fd readers, the watcher's
+    inotify descriptor is a reader too (a PollingWatcher is polled on a timer),
+    and the overlay is drawn from the same loop right after a snapshot is
+    built, so output and overlay writes never interleave. Only parsing runs in
+    the loop's executor, so a long cold start parse doesn't stall typing.
+    """
+    def __init__(self, handler: TerminalHandler, pexpect_obj,
+                 stdin_fd: Optional[int] = None, stdout_fd: Optional[int] = None):
+        self.handler = handler
+        self.p = pexpect_obj
+        self.stdin_fd = sys.stdin.fileno() if stdin_fd is None else stdin_fd
+        self.stdout_fd = sys.stdout.fileno() if stdout_fd is None else stdout_fd
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.done: Optional[asyncio.Future] = None
+        self.refreshing = False
+        # a log change seen while a refresh was running
+        self.refresh_pending = False
+        self.poll_timer: Optional[asyncio.TimerHandle] = None
+        self.draw_timer: Optional[asyncio.TimerHandle] = None
+
+    def run(self) -> None:
+        """Proxy the terminal until the child exits or the escape character is typed"""
+        asyncio.run(self.main())
+
+    async def main(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.done = self.loop.create_future()
+        mode = termios.tcgetattr(self.stdin_fd) if os.isatty(self.stdin_fd) else None
+        if mode is not None:
+            tty.setraw(self.stdin_fd)
+
+        watcher_fd = self.handler.watcher.fileno()
+        try:
+            self.loop.add_reader(self.stdin_fd, self.on_stdin)
+            self.loop.add_reader(self.p.child_fd, self.on_child_output)
+            if watcher_fd is not None:
+                self.loop.add_reader(watcher_fd, self.on_log_event)
+            self.loop.add_signal_handler(signal.SIGWINCH, self.on_resize)
+            self.refresh(parse=True)
+            self.schedule_poll()
+            await self.done
+        finally:
+            self.loop.remove_reader(self.stdin_fd)
+            self.loop.remove_reader(self.p.child_fd)
+            if watcher_fd is not None:
+                self.loop.remove_reader(watcher_fd)
+            self.loop.remove_signal_handler(signal.SIGWINCH)
+            for timer in (self.poll_timer, self.draw_timer):
+                if timer is not None:
+                    timer.cancel()
+            if mode is not None:
+                termios.tcsetattr(self.stdin_fd, termios.TCSAFLUSH, mode)
+            self.handler.watcher.close()
+
+    def finish(self) -> None:
+        """Stop the loop after the current callback"""
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def on_stdin(self) -> None:
+        """Forward keystrokes to the child"""
+        data = os.read(self.stdin_fd, READ_SIZE)
+        if not data:
+            self.finish()
+            return
+        escape = data.find(ESCAPE_CHARACTER)
+        if escape != -1:
+            data = data[:escape]
+        if data:
+            write_all(self.p.child_fd, data)
+        if escape != -1:
+            self.finish()
+
+    def on_child_output(self) -> None:
+        """Copy child output to the terminal"""
+        try:
+            data = os.read(self.p.child_fd, READ_SIZE)
+        except OSError as e:
+            # Linux raises EIO on the pty master once the child has exited
+            if e.errno != errno.EIO:
+                raise
+            data = b''
+        if not data:
+            self.finish()
+            return
+        write_all(self.stdout_fd, data)
+
+    def on_log_event(self) -> None:
+        """inotify descriptor readable - reparse if a jsonl file changed"""
+        if self.handler.watcher.poll():
+            self.refresh(parse=True)
+
+    def on_resize(self) -> None:
+        """SIGWINCH - update the cached size, resize the child and redraw"""
+        self.handler.terminal_size = self.handler.query_terminal_size()
+        if not self.p.closed:
+            self.p.setwinsize(*self.handler.terminal_size)
+        self.draw()
+
+    def schedule_poll(self) -> None:
+        """Timer that replaces the watcher's wait() timeout
+
+            Polls a PollingWatcher for changes, and otherwise refreshes the
+            snapshot without parsing so an expired session is dropped.
+        """
+        changed = self.handler.watcher.fileno() is None and bool(self.handler.watcher.poll())
+        self.refresh(parse=changed)
+        self.poll_timer = self.loop.call_later(self.handler.scheduler.poll_interval(), self.schedule_poll)
+
+    def refresh(self, parse: bool) -> None:
+        """Publish a new snapshot, parsing in the executor if asked to"""
+        if self.refreshing:
+            self.refresh_pending = self.refresh_pending or parse
+            return
+        if not parse:
+            self.publish(self.handler.build_snapshot(refresh=False))
+            return
+        self.refreshing = True
+        future = self.loop.run_in_executor(None, self.handler.build_snapshot, True)
+        future.add_done_callback(self.on_parsed)
+
+    def on_parsed(self, future: asyncio.Future) -> None:
+        self.refreshing = False
+        self.publish(future.result())
+        if self.refresh_pending:
+            self.refresh_pending = False
+            self.refresh(parse=True)
+
+    def publish(self, snapshot) -> None:
+        self.handler.snapshot = snapshot
+        self.draw()
+
+    def draw(self) -> None:
+        """Write the overlay if it changed and schedule the next countdown update"""
+        if self.draw_timer is not None:
+            self.draw_timer.cancel()
+        handler = self.handler
+        text = handler.format_overlay(handler.snapshot)
+        if text:
+            rows, cols = handler.cached_terminal_size()
+            frame = handler.render_frame(text[:cols], rows, cols)
+            if frame:
+                with METRICS.timer("draw"):
+                    write_all(self.stdout_fd, frame.encode())
+                METRICS.count("redraws")
+        self.draw_timer = self.loop.call_later(handler.redraw_delay(), self.draw)
@@ -0,0 +1,87 @@
+### Decide how long the reader and the renderer sleep between refreshes
+
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+# Config keys, all in seconds
+ACTIVE_INTERVAL_KEY = 'refresh_active_interval'
+IDLE_INTERVAL_KEY = 'refresh_idle_interval'
+ACTIVE_WINDOW_KEY = 'refresh_active_window'
+
+# wake a little after a countdown boundary so the new value is already showing
+BOUNDARY_SLACK = 0.005
+
+@dataclass
+class RefreshScheduler:
+    """Refresh fast while usage is arriving, back off when idle
+
+    The reader thread waits poll_interval() for log changes, which is short
+    for active_window seconds after new entries were parsed and long otherwise.
+    The renderer sleeps until the countdown text will actually change, i.e. the
+    next minute boundary while more than an hour is left, the next second
+    boundary after that.
+    """
+    active_interval: float = 0.2
+    idle_interval: float = 5.0
+    active_window: float = 30.0
+    # time.monotonic() of the last refresh that found new entries
+    last_activity: float = -math.inf
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "RefreshScheduler":
+        """Build a scheduler from the user config, ignoring missing or invalid values
+
+            Args:
+                cfg: dict returned by Config.load_config()
+        """
+        scheduler = cls()
+        for key, attr in ((ACTIVE_INTERVAL_KEY, 'active_interval'),
+                          (IDLE_INTERVAL_KEY, 'idle_interval'),
+                          (ACTIVE_WINDOW_KEY, 'active_window')):
+            value = cfg.get(key)
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+                setattr(scheduler, attr, float(value))
+        return scheduler
+
+    def record_activity(self, now: Optional[float] = None) -> None:
+        """Note that a refresh found new usage"""
+        self.last_activity = time.monotonic() if now is None else now
+
+    def is_active(self, now: Optional[float] = None) -> bool:
+        """True while usage arrived within the last active_window seconds"""
+        now = time.monotonic() if now is None else now
+        return now - self.last_activity < self.active_window
+
+    def poll_interval(self, now: Optional[float] = None) -> float:
+        """Seconds the reader waits for log changes before refreshing anyway"""
+        return self.active_interval if self.is_active(now) else self.idle_interval
+
+    def countdown_delay(self, session_end: Optional[datetime],
+                        now: Optional[datetime] = None) -> Optional[float]:
+        """Seconds until the displayed session countdown next changes
+
+            Args:
+                session_end: end of the current session, None if there is none
+                now: current time, defaults to now
+
+            Returns:
+                Delay in seconds, or None if there is no countdown to update
+        """
+        if session_end is None:
+            return None
+        now = datetime.now(timezone.utc) if now is None else now
+        left = (session_end - now).total_seconds()
+        if left <= -1:
+            # already showing "expired", nothing changes until a new session
+            return None
+        if left < 0:
+            # int() rounds towards zero, "0s" is shown until a full second past the end
+            return left + 1 + BOUNDARY_SLACK
+        shown = int(left)
+        if shown >= 3600:
+            # "Xh Ym" - changes when the minute part rolls over
+            shown -= shown % 60
+        return left - shown + BOUNDARY_SLACK
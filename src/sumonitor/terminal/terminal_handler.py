@@ -1,21 +1,63 @@
 ### Manages the terminal and displays usage data for current session
 
-import sys, fcntl, termios, struct
-import time, threading
+import sys, fcntl, termios, struct, shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional, Tuple
 
-from ..data.log_reader import LogReader
-from ..session.session_data import SessionData
+from ..data.log_reader import DEFAULT_HOURS_BACK, LogReader
+from ..data.log_watcher import LogWatcher, create_watcher
+from ..metrics import METRICS
+from ..session.session_data import SessionData, UsageSnapshot
+from ..session.session_tracker import SessionTracker
+from .refresh_scheduler import RefreshScheduler
+
+if TYPE_CHECKING:
+    from ..daemon import DaemonClient
+
+# the overlay shares the last row with claude's own output, which can overwrite
+# it, so an unchanged frame is still repainted this often
+FULL_REDRAW_INTERVAL = 10.0
+# wait before reconnecting after the daemon went away
+DAEMON_RECONNECT_DELAY = 1.0
 
 class TerminalHandler:
     """Handler for managing terminal and drawing overlays"""
     
-    def __init__(self, log_reader: LogReader, pexpect_obj, plan: str = "pro") -> None:
+    def __init__(self, log_reader: LogReader, pexpect_obj, plan: str = "pro",
+                 watcher: Optional[LogWatcher] = None,
+                 scheduler: Optional[RefreshScheduler] = None, threaded: bool = True,
+                 daemon: Optional["DaemonClient"] = None) -> None:
         self.in_alt_screen = False # to know when to draw in terminal
         self.p = pexpect_obj
         self.log_reader = log_reader
         self.plan = plan
+        self.scheduler = scheduler if scheduler is not None else RefreshScheduler()
+        # snapshots come from a shared daemon instead of parsing the logs here
+        self.daemon = daemon
+        # a polling watcher only needs to scan as often as an idle refresh, waits
+        # with a shorter timeout make it scan faster while usage is arriving
+        if watcher is None and daemon is None:
+            watcher = create_watcher(poll_interval=self.scheduler.idle_interval)
+        self.watcher = watcher
+        self.session_tracker = SessionTracker()
+        # latest stats published by the reader thread, replaced as a whole
+        self.snapshot: Optional[UsageSnapshot] = None
+        # set to wake the renderer - new snapshot or terminal resized
+        self.redraw = threading.Event()
+        # (rows, cols), only refreshed by on_resize so drawing needs no ioctl
+        self.terminal_size: Optional[Tuple[int, int]] = None
+        # (text, rows, cols) of the last frame written and when it was fully drawn
+        self.last_frame: Optional[Tuple[str, int, int]] = None
+        self.last_full_redraw = 0.0
+        self.reader_thread = threading.Thread(
+            target=self.read_logs if daemon is None else self.follow_daemon, daemon=True)
         self.overlay_thread = threading.Thread(target=self.draw_overlay, daemon=True)
-        self.overlay_thread.start()
+        # the asyncio engine drives the same methods from its event loop instead
+        if threaded:
+            self.reader_thread.start()
+            self.overlay_thread.start()
 
     def get_terminal_size(self) -> int:
         """Get terminal size
@@ -28,43 +70,124 @@ class TerminalHandler:
         rows, cols = a[0], a[1]
         return rows, cols
 
+    def query_terminal_size(self) -> Tuple[int, int]:
+        """Terminal size via ioctl, or from the environment if stdout isn't a terminal"""
+        try:
+            return self.get_terminal_size()
+        except OSError:
+            size = shutil.get_terminal_size()
+            return size.lines, size.columns
+
+    def cached_terminal_size(self) -> Tuple[int, int]:
+        """Terminal size as of the last resize, queried only the first time"""
+        size = self.terminal_size
+        if size is None:
+            size = self.terminal_size = self.query_terminal_size()
+        return size
+
     def on_resize(self, sig, _) -> None:
-        """Fetch new terminal size on resize
+        """Fetch new terminal size on resize and wake the renderer to redraw
         
             Args:
                 sig: signal for change (SIGWINCH)
         """
-        global p
-        if not self.p.closed:
-            self.p.setwinsize(*self.get_terminal_size())
+        if self.p.closed:
+            return
+        self.terminal_size = self.query_terminal_size()
+        self.p.setwinsize(*self.terminal_size)
+        self.redraw.set()
+
+    def build_snapshot(self, refresh: bool = True) -> UsageSnapshot:
+        """Update the tracked sessions and capture the current session's stats
+
+            Args:
+                refresh: parse the logs again, otherwise reuse the last parsed data
+
+            Returns:
+                UsageSnapshot of the current session
+        """
+        with METRICS.timer("tick"):
+            if refresh:
+                new_entries = self.log_reader.parse_new_entries(save=False)
+                if new_entries:
+                    self.scheduler.record_activity()
+                with METRICS.timer("sessions"):
+                    self.session_tracker.add_entries(new_entries)
+                    self.session_tracker.prune_before(
+                        datetime.now(timezone.utc) - timedelta(hours=DEFAULT_HOURS_BACK))
+                # saved with the cursors so `sumonitor stats` can skip the rows
+                self.log_reader.save_index(self.session_tracker.last_summary())
+            session_data = SessionData(usage_data=None, plan=self.plan,
+                                       session_tracker=self.session_tracker)
+            return session_data.snapshot()
 
-    def get_overlay_data(self) -> str:
+    def format_overlay(self, snapshot: Optional[UsageSnapshot]) -> str:
+        """Format a snapshot as the overlay line
+
+            Returns:
+                Formatted string that contains (Model | Input tokens, cost | Output tokens, cost)
+        """
+        if snapshot is None or not snapshot.has_sessions:
+            return ""
+        plan_limits = snapshot.plan_limits
+        return (
+            f"Tokens: {snapshot.total_tokens}/{plan_limits.tokens} | " +
+            f"Session reset in: {snapshot.session_reset_time()} | " +
+            f"Messages: {snapshot.session_messages}/{plan_limits.messages} | " +
+            f"Cost: {snapshot.total_cost:.2f}/{plan_limits.cost} $"
+        )
+
+    def get_overlay_data(self, refresh: bool = True) -> str:
         """Fetch total usage metrics for the current session
 
+            Args:
+                refresh: parse the logs again, otherwise reuse the last parsed data
+
             Returns:
                 Formatted string that contains (Model | Input tokens, cost | Output tokens, cost)
         """
-        usage_data = self.log_reader.parse_json_files()
-        session_data = SessionData(usage_data=usage_data, plan=self.plan)
-
-        plan_limits = session_data.plan_limits
-        total_tokens = session_data.total_tokens()
-        session_end = session_data.session_reset_time()
-        session_messages = session_data.session_messages()
-        total_cost = session_data.total_cost()
-
-        if usage_data:
-            return (
-                f"Tokens: {total_tokens}/{plan_limits.tokens} | " +
-                f"Session reset in: {session_end} | " +
-                f"Messages: {session_messages}/{plan_limits.messages} | " +
-                f"Cost: {total_cost:.2f}/{plan_limits.cost} $"
-            )
-        return ""
-        
+        return self.format_overlay(self.build_snapshot(refresh=refresh))
+
+    def publish(self, snapshot: UsageSnapshot) -> None:
+        """Hand a new snapshot to the renderer"""
+        self.snapshot = snapshot
+        self.redraw.set()
+
+    def read_logs(self):
+        """Reader thread - parses logs as they change and publishes snapshots
+
+            Also refreshes after the scheduler's poll interval without log writes,
+            so a session that expires is dropped from the overlay.
+        """
+        changed = True
+        try:
+            while not self.p.closed:
+                # only reparse when the watcher saw a jsonl file change
+                self.publish(self.build_snapshot(refresh=changed))
+                changed = bool(self.watcher.wait(timeout=self.scheduler.poll_interval()))
+        finally:
+            self.watcher.close()
+
+    def follow_daemon(self):
+        """Reader thread with --daemon - publishes the snapshots the daemon pushes
+
+            Reconnects when the daemon goes away, which spawns a new one.
+        """
+        while not self.p.closed:
+            try:
+                for snapshot in self.daemon.snapshots():
+                    self.publish(snapshot)
+                    if self.p.closed:
+                        return
+            except OSError:
+                pass
+            time.sleep(DAEMON_RECONNECT_DELAY)
+
     def draw_overlay(self):
         """Filter that adds overlay to the bottom of terminal
 
+            Only reads the latest snapshot, so a slow parse never delays a redraw.
+
             Returns:
                 Text in bottom line of terminal describing costs of the current input
         """
@@ -77,24 +200,66 @@ class TerminalHandler:
         ### ref https://gist.github.com/fnky/458719343aabd01cfb17a3a4f7296797
 
         while not self.p.closed:
-            text = self.get_overlay_data()
-
-            # get terminal dimensions to get to last row
-            rows, cols = self.get_terminal_size()
+            text = self.format_overlay(self.snapshot)
 
             if text:
-                text = text[:cols]
-
-                # cursor manipulation and adding text
-                overlay_bytes = (
-                    # b'\x1b[0J' +
-                    '\x1b[s'             # save cursor position
-                    f'\x1b[{rows};1H' +  # move to last row
-                    '\x1b[K' +           # clear the entire line
-                    text +               # write the text onto the line
-                    '\x1b[u'             # move cursor to saved position
-                )
-                sys.stdout.write(overlay_bytes)
-                sys.stdout.flush()
-
-            time.sleep(1.0) # read logs every other second
\ No newline at end of file
+                # terminal dimensions to get to last row, kept current by on_resize
+                rows, cols = self.cached_terminal_size()
+                overlay_bytes = self.render_frame(text[:cols], rows, cols)
+                if overlay_bytes:
+                    with METRICS.timer("draw"):
+                        sys.stdout.write(overlay_bytes)
+                        sys.stdout.flush()
+                    METRICS.count("redraws")
+
+            # redraw on a new snapshot or a resize, otherwise when the countdown changes
+            self.redraw.wait(timeout=self.redraw_delay())
+            self.redraw.clear()
+
+    def redraw_delay(self) -> float:
+        """Seconds the renderer can sleep before the overlay text changes on its own"""
+        snapshot = self.snapshot
+        delay = self.scheduler.countdown_delay(snapshot.session_end if snapshot else None)
+        if delay is None:
+            return FULL_REDRAW_INTERVAL
+        return min(delay, FULL_REDRAW_INTERVAL)
+
+    def render_frame(self, text: str, rows: int, cols: int) -> Optional[str]:
+        """Escape sequence that brings the last row from the previous frame to this one
+
+            Nothing is written for an identical frame. When only the end of the line
+            changed, e.g. the countdown, only the text from the first differing column
+            onwards is rewritten. A resize, or FULL_REDRAW_INTERVAL passing, redraws
+            the whole line.
+
+            Args:
+                text: overlay text, already cut to the terminal width
+                rows: terminal rows
+                cols: terminal columns
+
+            Returns:
+                Escape sequence to write, or None if the row is already up to date
+        """
+        now = time.monotonic()
+        full = (self.last_frame is None or self.last_frame[1:] != (rows, cols)
+                or now - self.last_full_redraw >= FULL_REDRAW_INTERVAL)
+        if not full and self.last_frame[0] == text:
+            return None
+
+        start = 0
+        if full:
+            self.last_full_redraw = now
+        else:
+            last_text = self.last_frame[0]
+            while start < len(text) and start < len(last_text) and text[start] == last_text[start]:
+                start += 1
+        self.last_frame = (text, rows, cols)
+
+        # cursor manipulation and adding text
+        return (
+            '\x1b[s' +                    # save cursor position
+            f'\x1b[{rows};{start + 1}H' + # move to the first changed column of the last row
+            '\x1b[K' +                    # clear the row first, after a full width line EL erases the last column
+            text[start:] +                 # write the changed part of the text
+            '\x1b[u'                      # move cursor to saved position
+        )
@@ -1,12 +1,14 @@
 """Shared pytest fixtures and configuration for all tests"""
 
+import json
 import pytest
 from datetime import datetime, timezone, timedelta
 from unittest.mock import Mock, MagicMock
 
-from sumonitor.data.log_reader import UsageData, LogReader
+from sumonitor.data.log_reader import UsageData, LogReader, ModelUsage
 from sumonitor.session.session_tracker import SessionTracker, Session
 from sumonitor.data.pricing import PlanLimits, ModelPricing
+from sumonitor.session.session_data import UsageSnapshot
 
 
 @pytest.fixture
@@ -36,6 +38,37 @@ def mock_usage_entry():
     return _create
 
 
+@pytest.fixture
+def usage_line():
+    """Factory fixture for creating jsonl lines as Claude writes them, without the newline
+
+    Example:
+        jsonl_file.write_text(usage_line("msg_1", hours_ago=2, input_tokens=500) + "\n")
+    """
+    def _create(message_id="msg_1",
+                hours_ago=1,
+                input_tokens=100,
+                output_tokens=50,
+                model="claude-sonnet-4-5",
+                usage=True,
+                content=None,
+                **extra):
+        message = {"id": message_id, "model": model}
+        if content is not None:
+            message["content"] = content
+        if usage:
+            message["usage"] = {"input_tokens": input_tokens, "output_tokens": output_tokens}
+        data = {
+            "timestamp": (datetime.now(timezone.utc) - timedelta(hours=hours_ago)).isoformat(),
+            "message": message,
+            "requestId": f"req_{message_id}",
+        }
+        # other top level fields, e.g. tool={"timestamp": ...}
+        data.update(extra)
+        return json.dumps(data)
+    return _create
+
+
 @pytest.fixture
 def temp_jsonl_dir(tmp_path):
     """Create temporary directory structure mimicking Claude projects directory
@@ -91,6 +124,22 @@ def max20_plan_limits():
     return PlanLimits(tokens=220_000, cost=140.00, messages=2000)
 
 
+@pytest.fixture
+def usage_snapshot(pro_plan_limits):
+    """Factory fixture for creating UsageSnapshot of an active Pro session
+
+    Example:
+        snapshot = usage_snapshot(total_tokens=42, models=[("claude-sonnet-4-5", usage)])
+    """
+    def _create(total_tokens=1500,
+                session_end=datetime(2026, 1, 15, 14, 5, 0, tzinfo=timezone.utc),
+                models=(("claude-sonnet-4-5", ModelUsage(cost=1.25, messages=3)),)):
+        return UsageSnapshot(plan_limits=pro_plan_limits, has_sessions=True,
+                             total_tokens=total_tokens, session_end=session_end,
+                             session_messages=3, total_cost=1.25, models=tuple(models))
+    return _create
+
+
 @pytest.fixture
 def log_reader():
     """Create fresh LogReader instance for each test
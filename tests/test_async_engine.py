@@ -0,0 +1,129 @@
+"""Tests for async_engine.py - pty proxying and overlay drawing on one event loop"""
+
+import os
+import pytest
+import pexpect
+from unittest.mock import Mock, patch
+
+from sumonitor.terminal.async_engine import AsyncEngine, write_all
+from sumonitor.terminal.terminal_handler import TerminalHandler
+from sumonitor.data.log_watcher import LogWatcher
+
+
+def make_handler(pexpect_obj, watcher_fd=None):
+    log_reader = Mock()
+    log_reader.parse_new_entries.return_value = []
+    watcher = Mock(spec=LogWatcher)
+    watcher.fileno.return_value = watcher_fd
+    watcher.poll.return_value = set()
+    handler = TerminalHandler(log_reader, pexpect_obj, watcher=watcher, threaded=False)
+    handler.terminal_size = (24, 80)
+    return handler
+
+
+def read_all(fd):
+    chunks = []
+    while True:
+        data = os.read(fd, 65536)
+        if not data:
+            return b''.join(chunks)
+        chunks.append(data)
+
+
+@pytest.fixture
+def pipes():
+    """(stdin read end, stdin write end, stdout read end, stdout write end)"""
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    yield stdin_r, stdin_w, stdout_r, stdout_w
+    for fd in (stdin_r, stdin_w, stdout_r, stdout_w):
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+
+
+def run_engine(handler, p, pipes):
+    stdin_r, _, stdout_r, stdout_w = pipes
+    AsyncEngine(handler, p, stdin_fd=stdin_r, stdout_fd=stdout_w).run()
+    os.close(stdout_w)
+    return read_all(stdout_r)
+
+
+class TestProxying:
+    """Test copying between the terminal and the child"""
+
+    def test_child_output_reaches_stdout(self, pipes):
+        p = pexpect.spawn('echo', ['hello from claude'])
+        handler = make_handler(p)
+
+        output = run_engine(handler, p, pipes)
+
+        assert b'hello from claude' in output
+        handler.watcher.close.assert_called_once()
+
+    def test_keystrokes_reach_child(self, pipes):
+        p = pexpect.spawn('head', ['-n', '1'])
+        p.setecho(False)
+        handler = make_handler(p)
+        os.write(pipes[1], b'typed line\n')
+
+        output = run_engine(handler, p, pipes)
+
+        assert b'typed line' in output
+
+    def test_escape_character_stops_engine(self, pipes):
+        p = pexpect.spawn('cat')
+        handler = make_handler(p)
+        os.write(pipes[1], b'\x1d')
+
+        run_engine(handler, p, pipes)
+
+        assert p.isalive()
+        p.terminate(force=True)
+
+
+class TestWriteAll:
+    """Test retrying short writes"""
+
+    def test_writes_remainder_after_short_write(self):
+        written = []
+        def short_write(fd, data):
+            # at most 3 bytes per call
+            written.append(bytes(data[:3]))
+            return len(written[-1])
+
+        with patch('sumonitor.terminal.async_engine.os.write', side_effect=short_write):
+            write_all(1, b'large paste')
+
+        assert b''.join(written) == b'large paste'
+        assert len(written) == 4
+
+
+class TestOverlay:
+    """Test refreshing and drawing from the event loop"""
+
+    def test_parses_logs_and_draws_overlay(self, pipes):
+        p = pexpect.spawn('sleep', ['0.3'])
+        handler = make_handler(p)
+        handler.format_overlay = Mock(return_value="Tokens: 10/100")
+
+        output = run_engine(handler, p, pipes)
+
+        handler.log_reader.parse_new_entries.assert_called()
+        assert b'\x1b[24;1H\x1b[KTokens: 10/100' in output
+
+    def test_inotify_event_triggers_parse(self, pipes):
+        event_r, event_w = os.pipe()
+        p = pexpect.spawn('sleep', ['0.3'])
+        handler = make_handler(p, watcher_fd=event_r)
+        handler.watcher.poll.side_effect = lambda: {os.read(event_r, 1)}
+        os.write(event_w, b'x')
+
+        run_engine(handler, p, pipes)
+
+        handler.watcher.poll.assert_called_once()
+        # startup parse plus the one for the event
+        assert handler.log_reader.parse_new_entries.call_count == 2
+        os.close(event_r)
+        os.close(event_w)
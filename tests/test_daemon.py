@@ -0,0 +1,201 @@
+"""Tests for daemon.py - one shared parser pushing snapshots to many clients"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from sumonitor.daemon import DaemonClient, UsageDaemon
+from sumonitor.data.log_reader import LogReader
+from sumonitor.data.log_watcher import LogWatcher
+from sumonitor.terminal.refresh_scheduler import RefreshScheduler
+from sumonitor.terminal.terminal_handler import TerminalHandler
+
+
+@pytest.fixture
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes, pytest's tmp_path can be longer
+    with tempfile.TemporaryDirectory(prefix="sumonitor-") as tmp:
+        yield os.path.join(tmp, "daemon.sock")
+
+
+@pytest.fixture
+def jsonl_file(temp_jsonl_dir, usage_line):
+    path = temp_jsonl_dir / "session.jsonl"
+    path.write_text(usage_line("msg_1") + "\n")
+    return path
+
+
+def make_daemon(socket_path, jsonl_file, idle_timeout=0.3):
+    log_reader = LogReader()
+    log_reader.get_jsonl_files = lambda *args, **kwargs: [jsonl_file]
+    watcher = Mock(spec=LogWatcher)
+    watcher.fileno.return_value = None
+    # every poll reports a change so appended lines are picked up
+    watcher.poll.return_value = {str(jsonl_file)}
+    scheduler = RefreshScheduler(active_interval=0.02, idle_interval=0.02)
+    return UsageDaemon(log_reader, socket_path=socket_path, watcher=watcher,
+                       scheduler=scheduler, idle_timeout=idle_timeout)
+
+
+def start(daemon):
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not os.path.exists(daemon.socket_path):
+        assert time.monotonic() < deadline, "daemon never listened"
+        time.sleep(0.01)
+    return thread
+
+
+class TestDaemon:
+    """Test serving snapshots over the socket"""
+
+    def test_client_receives_current_snapshot(self, socket_path, jsonl_file, pro_plan_limits):
+        thread = start(make_daemon(socket_path, jsonl_file))
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False)
+
+        snapshot = next(client.snapshots())
+
+        assert snapshot.has_sessions
+        assert snapshot.total_tokens == 150
+        assert snapshot.plan_limits == pro_plan_limits
+        client.close()
+        thread.join(timeout=5)
+
+    def test_pushes_new_usage_to_every_client(self, socket_path, jsonl_file, pro_plan_limits, usage_line):
+        thread = start(make_daemon(socket_path, jsonl_file))
+        streams = [DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False).snapshots()
+                   for _ in range(3)]
+        assert [next(s).total_tokens for s in streams] == [150] * 3
+
+        with open(jsonl_file, "a") as f:
+            f.write(usage_line("msg_2", input_tokens=1000) + "\n")
+
+        assert [next(s).total_tokens for s in streams] == [1200] * 3
+        for s in streams:
+            s.close()
+        thread.join(timeout=5)
+
+    def test_exits_when_idle_and_removes_socket(self, socket_path, jsonl_file):
+        thread = start(make_daemon(socket_path, jsonl_file, idle_timeout=0.1))
+
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert not os.path.exists(socket_path)
+
+    def test_publishes_empty_snapshot_when_parsing_fails(self, socket_path, jsonl_file, pro_plan_limits):
+        daemon = make_daemon(socket_path, jsonl_file)
+        daemon.log_reader.get_jsonl_files = Mock(side_effect=FileNotFoundError("~/.claude/projects"))
+        thread = start(daemon)
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False)
+
+        # fail instead of hanging if nothing is published
+        socket.setdefaulttimeout(5)
+        try:
+            snapshot = next(client.snapshots())
+        finally:
+            socket.setdefaulttimeout(None)
+
+        assert not snapshot.has_sessions
+        client.close()
+        thread.join(timeout=5)
+
+    def test_second_daemon_exits_while_first_serves(self, socket_path, jsonl_file, pro_plan_limits):
+        thread = start(make_daemon(socket_path, jsonl_file))
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False)
+        stream = client.snapshots()
+        next(stream)
+
+        second = make_daemon(socket_path, jsonl_file)
+        second.run()
+
+        # returned without serving
+        assert second.loop is None
+        assert os.path.exists(socket_path)
+        stream.close()
+        thread.join(timeout=5)
+
+
+class TestDaemonClient:
+    """Test connecting and auto-spawning"""
+
+    def test_no_daemon_without_spawn(self, socket_path, pro_plan_limits):
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False)
+
+        with pytest.raises(FileNotFoundError):
+            client.connect()
+
+    def test_spawns_daemon_when_none_listens(self, socket_path, jsonl_file, pro_plan_limits):
+        threads = []
+        def spawn(path, args):
+            threads.append(start(make_daemon(path, jsonl_file)))
+
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, daemon_args=("--no-cache",))
+        with patch('sumonitor.daemon.spawn_daemon', side_effect=spawn) as spawn_daemon:
+            snapshot = next(client.snapshots())
+
+        spawn_daemon.assert_called_once_with(socket_path, ("--no-cache",))
+        assert snapshot.total_tokens == 150
+        client.close()
+        threads[0].join(timeout=5)
+
+
+class TestTerminalHandlerWithDaemon:
+    """Test the reader thread following a daemon instead of parsing"""
+
+    def test_publishes_daemon_snapshots(self, mock_pexpect):
+        snapshot = Mock()
+        daemon = Mock()
+        def snapshots():
+            yield snapshot
+            mock_pexpect.closed = True
+            yield snapshot
+        daemon.snapshots.side_effect = snapshots
+
+        handler = TerminalHandler(None, mock_pexpect, daemon=daemon, threaded=False)
+        handler.follow_daemon()
+
+        assert handler.watcher is None
+        assert handler.snapshot is snapshot
+        assert handler.redraw.is_set()
+
+    def test_reconnects_after_daemon_goes_away(self, mock_pexpect):
+        daemon = Mock()
+        calls = []
+        def snapshots():
+            calls.append(1)
+            if len(calls) == 2:
+                mock_pexpect.closed = True
+            raise ConnectionRefusedError
+        daemon.snapshots.side_effect = snapshots
+
+        handler = TerminalHandler(None, mock_pexpect, daemon=daemon, threaded=False)
+        with patch('sumonitor.terminal.terminal_handler.DAEMON_RECONNECT_DELAY', 0):
+            handler.follow_daemon()
+
+        assert len(calls) == 2
+
+
+class TestDaemonSharedSnapshot:
+    """Test the daemon mirroring snapshots into shared memory"""
+
+    def test_publishes_to_shared_snapshot(self, socket_path, jsonl_file, pro_plan_limits):
+        from sumonitor.session.shared_snapshot import SharedSnapshotReader, SharedSnapshotWriter
+        shared_path = os.path.join(os.path.dirname(socket_path), "snapshot.shm")
+        daemon = make_daemon(socket_path, jsonl_file)
+        daemon.shared_snapshot = SharedSnapshotWriter(shared_path)
+        thread = start(daemon)
+        client = DaemonClient(pro_plan_limits, socket_path=socket_path, spawn=False)
+        next(client.snapshots())
+
+        published = SharedSnapshotReader(shared_path).read(pro_plan_limits)
+
+        assert published.snapshot.total_tokens == 150
+        assert [model for model, _ in published.snapshot.models] == ["claude-sonnet-4-5"]
+        client.close()
+        thread.join(timeout=5)
@@ -0,0 +1,123 @@
+"""Tests for decoder.py - pluggable JSON backends for jsonl lines"""
+
+import pytest
+import json
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from sumonitor.data import decoder as decoder_module
+from sumonitor.data.decoder import available_decoders, get_decoder
+from sumonitor.data.log_reader import LogReader
+
+
+@pytest.fixture(params=["json", "orjson", "msgspec"])
+def decoder(request):
+    """Each backend, skipped when it is not installed"""
+    if request.param != "json":
+        pytest.importorskip(request.param)
+    return get_decoder(request.param)
+
+
+def _line(**overrides) -> bytes:
+    data = {
+        "parentUuid": "abc",
+        "timestamp": "2026-01-01T12:00:00.000Z",
+        "requestId": "req_1",
+        "message": {
+            "id": "msg_1",
+            "model": "claude-sonnet-4-5-20250929",
+            "content": [{"type": "tool_result", "content": "x" * 1000}],
+            "usage": {
+                "input_tokens": 10,
+                "output_tokens": 20,
+                "cache_creation_input_tokens": 30,
+                "cache_read_input_tokens": 40,
+                "service_tier": "standard",
+            },
+        },
+    }
+    data.update(overrides)
+    return json.dumps(data).encode()
+
+
+class TestDecode:
+    """Every backend should extract the same fields"""
+
+    def test_usage_line(self, decoder):
+        entry = decoder.decode(_line())
+
+        assert entry.timestamp == "2026-01-01T12:00:00.000Z"
+        assert entry.request_id == "req_1"
+        assert entry.has_message and entry.has_usage
+        assert entry.message_id == "msg_1"
+        assert entry.model == "claude-sonnet-4-5-20250929"
+        assert (entry.input_tokens, entry.output_tokens) == (10, 20)
+        assert (entry.cache_write_tokens, entry.cache_read_tokens) == (30, 40)
+
+    def test_missing_usage_tokens_default_to_zero(self, decoder):
+        line = _line(message={"id": "msg_1", "usage": {"output_tokens": 5}})
+
+        entry = decoder.decode(line)
+
+        assert entry.has_usage
+        assert (entry.input_tokens, entry.output_tokens) == (0, 5)
+        assert entry.model is None
+
+    def test_message_without_usage(self, decoder):
+        entry = decoder.decode(_line(message={"role": "user", "content": "hi"}))
+
+        assert entry.has_message
+        assert not entry.has_usage
+
+    def test_line_without_message(self, decoder):
+        entry = decoder.decode(_line(message=None, type="summary"))
+
+        assert not entry.has_message
+        assert entry.timestamp == "2026-01-01T12:00:00.000Z"
+
+    @pytest.mark.parametrize("line", [b"{not json", b"[1, 2]", b"\xff\xfe"])
+    def test_invalid_lines(self, decoder, line):
+        assert decoder.decode(line) is None
+
+
+class TestGetDecoder:
+    """Test backend selection"""
+
+    def test_auto_picks_fastest_installed(self):
+        assert get_decoder("auto").name == available_decoders()[0]
+
+    def test_stdlib_always_available(self):
+        with patch.object(decoder_module, "orjson", None), patch.object(decoder_module, "msgspec", None):
+            assert available_decoders() == ["json"]
+            assert get_decoder().name == "json"
+
+    def test_unknown_name(self):
+        with pytest.raises(ValueError):
+            get_decoder("simdjson")
+
+    def test_missing_backend(self):
+        with patch.object(decoder_module, "orjson", None):
+            with pytest.raises(ImportError):
+                get_decoder("orjson")
+
+
+class TestLogReaderDecoder:
+    """LogReader should give the same results with every backend"""
+
+    def test_parse_with_backend(self, decoder, temp_jsonl_dir):
+        timestamp = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat().replace('+00:00', 'Z')
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_bytes(b"\n".join([
+            _line(timestamp=timestamp),
+            _line(timestamp=timestamp),
+            _line(timestamp=timestamp, requestId="req_2"),
+        ]) + b"\n")
+
+        reader = LogReader(decoder=decoder.name)
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            usage_data = reader.parse_json_files()
+
+        assert reader.decoder.name == decoder.name
+        assert len(usage_data) == 2
+        assert usage_data[0].input_tokens == 10
+        assert usage_data[0].cost > 0
@@ -0,0 +1,110 @@
+"""Tests for dedup.py - bucketed 64-bit dedup keys"""
+
+from array import array
+
+from sumonitor.data.dedup import DedupStore
+
+HOUR = 3600
+BASE = 1_760_000_000 // HOUR * HOUR  # start of an hour bucket
+
+
+class TestKeys:
+    """Test DedupStore.key() hashing"""
+
+    def test_same_pair_same_key(self):
+        """Key should be deterministic for the same ids"""
+        assert DedupStore.key("msg_1", "req_1") == DedupStore.key("msg_1", "req_1")
+
+    def test_different_request_different_key(self):
+        """Same message with another request id should get another key"""
+        assert DedupStore.key("msg_1", "req_1") != DedupStore.key("msg_1", "req_2")
+
+    def test_separator_prevents_ambiguity(self):
+        """Ids that concatenate to the same string should not collide"""
+        assert DedupStore.key("ab", "c") != DedupStore.key("a", "bc")
+
+    def test_key_fits_signed_64_bit(self):
+        """Keys should fit an array('q') and an SQLite INTEGER"""
+        key = DedupStore.key("msg_1", "req_1")
+        assert -(2**63) <= key < 2**63
+
+    def test_handles_missing_ids(self):
+        """None ids should hash like the original 'None:None' string key"""
+        assert DedupStore.key(None, None) == DedupStore.key("None", "None")
+
+
+class TestMembership:
+    """Test add(), contains() and compaction"""
+
+    def test_added_key_is_found(self):
+        store = DedupStore()
+        store.add(42, BASE + 10)
+
+        assert store.contains(42, BASE + 10)
+        assert not store.contains(43, BASE + 10)
+
+    def test_found_from_neighbouring_bucket(self):
+        """A copy logged just across an hour boundary should still match"""
+        store = DedupStore()
+        store.add(42, BASE + HOUR - 1)
+
+        assert store.contains(42, BASE + HOUR + 1)
+
+    def test_not_found_from_distant_bucket(self):
+        """Lookups only check the entry's bucket and its neighbours"""
+        store = DedupStore()
+        store.add(42, BASE)
+
+        assert not store.contains(42, BASE + 5 * HOUR)
+
+    def test_compact_freezes_old_buckets_into_sorted_arrays(self):
+        """All but the newest hot buckets should become sorted arrays"""
+        store = DedupStore(hot_buckets=2)
+        for i, key in enumerate([5, 3, 9]):
+            store.add(key, BASE)
+            store.add(key + 100, BASE + HOUR * (i + 1))
+
+        store.compact()
+
+        assert len(store.hot) == 2
+        frozen = store.frozen[BASE // HOUR]
+        assert isinstance(frozen, array)
+        assert list(frozen) == [3, 5, 9]
+        assert store.contains(3, BASE) and store.contains(9, BASE)
+
+    def test_add_to_frozen_bucket_thaws_it(self):
+        """Adding a late entry to a frozen bucket should keep its old keys"""
+        store = DedupStore(hot_buckets=1)
+        store.add(1, BASE)
+        store.add(2, BASE + HOUR)
+        store.compact()
+
+        store.add(3, BASE)
+
+        assert store.contains(1, BASE) and store.contains(3, BASE)
+        assert len(store) == 3
+
+
+class TestExpiry:
+    """Test expire_before() drops whole buckets"""
+
+    def test_drops_buckets_before_cutoff(self):
+        store = DedupStore()
+        store.add(1, BASE)
+        store.add(2, BASE + 10 * HOUR)
+        store.compact()
+
+        store.expire_before(BASE + 5 * HOUR)
+
+        assert len(store) == 1
+        assert not store.contains(1, BASE)
+        assert store.contains(2, BASE + 10 * HOUR)
+
+    def test_keeps_bucket_containing_cutoff(self):
+        """A bucket that is only partly outside the window is kept"""
+        store = DedupStore()
+        store.add(1, BASE + 10)
+
+        store.expire_before(BASE + 20)
+
+        assert store.contains(1, BASE + 10)
@@ -2,10 +2,15 @@
 
 import pytest
 import json
+import os
+import time
 from datetime import datetime, timezone, timedelta
 from unittest.mock import patch, MagicMock
 
-from sumonitor.data.log_reader import LogReader, UsageData, _calculate_total_cost
+from sumonitor.data.log_reader import (
+    LogReader, UsageData, _calculate_total_cost, _is_usage_candidate,
+    from_epoch_ms, parse_timestamp_ms, to_epoch_ms
+)
 
 
 class TestCostCalculation:
@@ -341,6 +346,78 @@ class TestTimestampFiltering:
         assert len(usage_data) == 1
 
 
+class TestWindowPruning:
+    """Test skipping old files and evicting entries outside hours_back"""
+
+    def test_file_modified_before_cutoff_not_opened(self, temp_jsonl_dir, usage_line):
+        """File whose mtime predates the window should be skipped without reading"""
+        jsonl_file = temp_jsonl_dir / "old.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", hours_ago=200) + "\n")
+        old = time.time() - 200 * 3600
+        os.utime(jsonl_file, (old, old))
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch('builtins.open') as mock_open:
+                usage_data = reader.parse_json_files()
+
+        mock_open.assert_not_called()
+        assert usage_data == []
+
+    def test_append_to_skipped_file_parses_only_new_lines(self, temp_jsonl_dir, usage_line):
+        """Lines appended to a previously skipped file should still be picked up"""
+        jsonl_file = temp_jsonl_dir / "resumed.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", hours_ago=200) + "\n")
+        old = time.time() - 200 * 3600
+        os.utime(jsonl_file, (old, old))
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            with open(jsonl_file, "a") as f:
+                f.write(usage_line("msg_2", hours_ago=0) + "\n")
+            with patch.object(reader.decoder, 'decode', wraps=reader.decoder.decode) as loads:
+                usage_data = reader.parse_json_files()
+
+        assert loads.call_count == 1
+        assert len(usage_data) == 1
+
+    def test_evict_before_drops_old_entries(self, mock_usage_entry):
+        """evict_before() should remove old rows and their dedup keys"""
+        reader = LogReader()
+        old, new = mock_usage_entry(hours_ago=10), mock_usage_entry(hours_ago=1)
+        reader.usage_data = [old, new]
+        reader.processed_entries.add(1, old.timestamp.timestamp())
+        reader.processed_entries.add(2, new.timestamp.timestamp())
+
+        reader.evict_before(datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert reader.usage_data == [new]
+        assert len(reader.processed_entries) == 1
+        assert reader.processed_entries.contains(2, new.timestamp.timestamp())
+
+    def test_parse_evicts_entries_that_aged_out(self, temp_jsonl_dir, mock_usage_entry):
+        """parse_json_files() should periodically evict entries outside the window"""
+        reader = LogReader()
+        reader.usage_data = [mock_usage_entry(hours_ago=10)]
+        reader.last_eviction = datetime.now(timezone.utc) - timedelta(hours=2)
+
+        with patch.object(reader, 'get_jsonl_files', return_value=[]):
+            usage_data = reader.parse_json_files(hours_back=5)
+
+        assert usage_data == []
+
+    def test_eviction_not_repeated_within_interval(self, temp_jsonl_dir):
+        """Eviction should not run on every call"""
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[]):
+            reader.parse_json_files()
+            with patch.object(reader, 'evict_before') as evict:
+                reader.parse_json_files()
+
+        evict.assert_not_called()
+
+
 class TestFileDiscovery:
     """Test get_jsonl_files() directory traversal"""
 
@@ -383,6 +460,96 @@ class TestFileDiscovery:
         assert len(files) == 0
 
 
+class TestDiscoveryCache:
+    """Test cached directory listings in get_jsonl_files()"""
+
+    def _age(self, *dirs):
+        """Push directory mtimes into the past so listings are cacheable"""
+        for d in dirs:
+            os.utime(d, ns=(time.time_ns() - 60_000_000_000, time.time_ns() - 60_000_000_000))
+
+    def test_unchanged_tree_not_listed_again(self, temp_jsonl_dir):
+        """Second call with no directory changes should not list any directory"""
+        (temp_jsonl_dir / "session.jsonl").touch()
+        root = temp_jsonl_dir.parent.parent
+        self._age(root, root / "projects", temp_jsonl_dir)
+
+        reader = LogReader()
+        first = reader.get_jsonl_files(str(root))
+        with patch('sumonitor.data.log_reader.os.scandir', wraps=os.scandir) as scandir:
+            second = reader.get_jsonl_files(str(root))
+
+        assert scandir.call_count == 0
+        assert first == second
+
+    def test_new_file_found_after_directory_changes(self, temp_jsonl_dir):
+        """A new session file should be found through the directory mtime change"""
+        (temp_jsonl_dir / "first.jsonl").touch()
+        root = temp_jsonl_dir.parent.parent
+        self._age(root, root / "projects", temp_jsonl_dir)
+
+        reader = LogReader()
+        reader.get_jsonl_files(str(root))
+        (temp_jsonl_dir / "second.jsonl").touch()
+        with patch('sumonitor.data.log_reader.os.scandir', wraps=os.scandir) as scandir:
+            files = reader.get_jsonl_files(str(root))
+
+        assert len(files) == 2
+        assert scandir.call_count == 1
+
+    def test_new_project_directory_found(self, temp_jsonl_dir):
+        """Files inside a new project directory should be found"""
+        root = temp_jsonl_dir.parent.parent
+        reader = LogReader()
+        reader.get_jsonl_files(str(root))
+
+        new_project = root / "projects" / "other-project"
+        new_project.mkdir()
+        (new_project / "session.jsonl").touch()
+
+        files = reader.get_jsonl_files(str(root))
+
+        assert [f.name for f in files] == ["session.jsonl"]
+
+    def test_removed_directory_forgotten(self, temp_jsonl_dir):
+        """Files of a deleted project directory should no longer be returned"""
+        (temp_jsonl_dir / "session.jsonl").touch()
+        root = temp_jsonl_dir.parent.parent
+        reader = LogReader()
+        reader.get_jsonl_files(str(root))
+
+        (temp_jsonl_dir / "session.jsonl").unlink()
+        temp_jsonl_dir.rmdir()
+        files = reader.get_jsonl_files(str(root))
+
+        assert files == []
+        assert str(temp_jsonl_dir) not in reader.dir_cache
+
+    def test_refresh_forces_full_rescan(self, temp_jsonl_dir):
+        """refresh=True should list every directory again"""
+        (temp_jsonl_dir / "session.jsonl").touch()
+        root = temp_jsonl_dir.parent.parent
+        self._age(root, root / "projects", temp_jsonl_dir)
+
+        reader = LogReader()
+        reader.get_jsonl_files(str(root))
+        with patch('sumonitor.data.log_reader.os.scandir', wraps=os.scandir) as scandir:
+            reader.get_jsonl_files(str(root), refresh=True)
+
+        assert scandir.call_count == 3
+
+    def test_recently_modified_directory_rescanned(self, temp_jsonl_dir):
+        """Listings taken right after a directory changed should not be trusted"""
+        (temp_jsonl_dir / "session.jsonl").touch()
+        root = temp_jsonl_dir.parent.parent
+        self._age(root, root / "projects")
+
+        reader = LogReader()
+        reader.get_jsonl_files(str(root))
+
+        assert reader.dir_cache[str(temp_jsonl_dir)].mtime_ns is None
+
+
 class TestEdgeCases:
     """Edge cases and boundary conditions"""
 
@@ -474,3 +641,398 @@ class TestEdgeCases:
             usage_data = reader.parse_json_files()
 
         assert usage_data[0].cost == pytest.approx(1.05)
+
+
+class TestIncrementalReading:
+    """Test per-file cursors so only appended bytes are parsed"""
+
+    def test_only_appended_lines_are_decoded(self, temp_jsonl_dir, usage_line):
+        """Second call should decode only the lines appended since the first"""
+        jsonl_file = temp_jsonl_dir / "append.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            with open(jsonl_file, "a") as f:
+                f.write(usage_line("msg_2") + "\n")
+            with patch.object(reader.decoder, 'decode', wraps=reader.decoder.decode) as loads:
+                usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 2
+        assert loads.call_count == 1
+
+    def test_unchanged_file_not_reopened(self, temp_jsonl_dir, usage_line):
+        """File with unchanged size should not be opened again"""
+        jsonl_file = temp_jsonl_dir / "same.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            with patch('builtins.open') as mock_open:
+                reader.parse_json_files()
+
+        mock_open.assert_not_called()
+
+    def test_partial_trailing_line_deferred(self, temp_jsonl_dir, usage_line):
+        """A line without a trailing newline should be parsed once it is completed"""
+        jsonl_file = temp_jsonl_dir / "partial.jsonl"
+        line = usage_line("msg_1")
+        jsonl_file.write_text(line[:20])
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            assert len(reader.parse_json_files()) == 0
+            with open(jsonl_file, "a") as f:
+                f.write(line[20:] + "\n")
+            usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 1
+        assert reader.cursors[str(jsonl_file)].offset == len(line) + 1
+
+    def test_truncated_file_read_from_start(self, temp_jsonl_dir, usage_line):
+        """File shrinking below the saved offset should be read again from byte 0"""
+        jsonl_file = temp_jsonl_dir / "truncate.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n" + usage_line("msg_2") + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            jsonl_file.write_text(usage_line("msg_3") + "\n")
+            usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 3
+
+    def test_replaced_file_read_from_start(self, temp_jsonl_dir, usage_line):
+        """File replaced by a new inode should be read again from byte 0"""
+        jsonl_file = temp_jsonl_dir / "rotate.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            replacement = temp_jsonl_dir / "rotate.tmp"
+            replacement.write_text(usage_line("msg_1") + "\n" + usage_line("msg_2") + "\n")
+            replacement.replace(jsonl_file)
+            usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 2
+
+    def test_deleted_file_drops_cursor(self, temp_jsonl_dir, usage_line):
+        """Cursor of a file that disappeared should be removed"""
+        jsonl_file = temp_jsonl_dir / "gone.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            jsonl_file.unlink()
+            reader.parse_json_files()
+
+        assert str(jsonl_file) not in reader.cursors
+
+
+class TestParseNewEntries:
+    """Test parse_new_entries() returning only entries added by the call"""
+
+    def test_returns_only_new_entries(self, temp_jsonl_dir):
+        jsonl_file = temp_jsonl_dir / "new.jsonl"
+        entry = {
+            "timestamp": (datetime.now(timezone.utc)-timedelta(hours=1)).isoformat(),
+            "message": {
+                "id": "msg_1",
+                "model": "claude-sonnet-4-5",
+                "usage": {"input_tokens": 100, "output_tokens": 50}
+            },
+            "requestId": "req_1"
+        }
+        jsonl_file.write_text(json.dumps(entry) + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            first = reader.parse_new_entries()
+            entry["message"]["id"] = "msg_2"
+            with open(jsonl_file, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            second = reader.parse_new_entries()
+            third = reader.parse_new_entries()
+
+        assert len(first) == 1 and len(second) == 1
+        assert third == []
+        assert reader.usage_data == first + second
+
+
+class TestLinePrefilter:
+    """Test _is_usage_candidate() byte level pre-filter"""
+
+    cutoff = to_epoch_ms(datetime.now(timezone.utc) - timedelta(hours=5))
+
+    def test_rejects_line_without_usage(self, usage_line):
+        assert _is_usage_candidate(usage_line(usage=False).encode(), self.cutoff) is False
+
+    def test_accepts_recent_usage_line(self, usage_line):
+        assert _is_usage_candidate(usage_line(hours_ago=1).encode(), self.cutoff) is True
+
+    def test_rejects_usage_line_older_than_cutoff(self, usage_line):
+        assert _is_usage_candidate(usage_line(hours_ago=10).encode(), self.cutoff) is False
+
+    def test_compact_separators_and_z_suffix(self):
+        """Claude writes compact JSON with Z suffixed timestamps"""
+        old = (datetime.now(timezone.utc)-timedelta(hours=10)).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        line = ('{"message":{"usage":{"input_tokens":1}},"timestamp":"' + old + '"}').encode()
+
+        assert _is_usage_candidate(line, self.cutoff) is False
+
+    def test_multiple_timestamp_keys_left_to_decoder(self, usage_line):
+        """An ambiguous line with nested timestamps should not be dropped early"""
+        line = usage_line(hours_ago=10, tool={"timestamp": "2020-01-01T00:00:00Z"}).encode()
+
+        assert _is_usage_candidate(line, self.cutoff) is True
+
+    def test_escaped_usage_in_string_not_matched(self):
+        """A "usage" key inside an escaped string payload is not a usage block"""
+        line = json.dumps({"timestamp": "2025-01-01T00:00:00Z",
+                           "content": json.dumps({"usage": 1})}).encode()
+
+        assert _is_usage_candidate(line, self.cutoff) is False
+
+    def test_unparseable_timestamp_left_to_decoder(self):
+        line = b'{"usage":{},"timestamp":"yesterday"}'
+
+        assert _is_usage_candidate(line, self.cutoff) is True
+
+    def test_parse_skips_decoding_non_usage_lines(self, temp_jsonl_dir, usage_line):
+        """Only usage lines inside the window should be decoded"""
+        jsonl_file = temp_jsonl_dir / "mixed.jsonl"
+        jsonl_file.write_bytes(b"\n".join([
+            usage_line(usage=False).encode(),
+            usage_line(hours_ago=200).encode(),
+            usage_line(hours_ago=1).encode(),
+        ]) + b"\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch.object(reader.decoder, 'decode', wraps=reader.decoder.decode) as loads:
+                usage_data = reader.parse_json_files()
+
+        assert loads.call_count == 1
+        assert len(usage_data) == 1
+
+    def test_prefilter_can_be_disabled(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "mixed.jsonl"
+        jsonl_file.write_text(usage_line(usage=False) + "\n" + usage_line(hours_ago=1) + "\n")
+
+        reader = LogReader(prefilter=False)
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch.object(reader.decoder, 'decode', wraps=reader.decoder.decode) as loads:
+                usage_data = reader.parse_json_files()
+
+        assert loads.call_count == 2
+        assert len(usage_data) == 1
+
+
+class TestTimestamps:
+    """Test epoch millisecond timestamps"""
+
+    @pytest.mark.parametrize("value", [
+        "2026-01-15T10:30:45.123Z",
+        "2024-02-29T23:59:59.999Z",
+        "1999-12-31T00:00:00.000Z",
+    ])
+    def test_matches_fromisoformat(self, value):
+        expected = datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+        assert parse_timestamp_ms(value) == to_epoch_ms(expected)
+        assert from_epoch_ms(parse_timestamp_ms(value)) == expected
+
+    @pytest.mark.parametrize("value, expected", [
+        ("2026-01-15T10:30:45Z", "2026-01-15T10:30:45+00:00"),
+        ("2026-01-15T12:30:45.123+02:00", "2026-01-15T10:30:45.123+00:00"),
+        ("2026-01-15T10:30:45.123456+00:00", "2026-01-15T10:30:45.123+00:00"),
+    ])
+    def test_other_iso_formats(self, value, expected):
+        assert parse_timestamp_ms(value) == to_epoch_ms(datetime.fromisoformat(expected))
+
+    @pytest.mark.parametrize("value", ["yesterday", "2026-01-15T25:30:45.123Z", "2026-13-15T10:30:45.123Z"])
+    def test_invalid_timestamp_raises(self, value):
+        with pytest.raises(ValueError):
+            parse_timestamp_ms(value)
+
+    def test_usage_data_materializes_datetime_lazily(self):
+        entry = UsageData(model="claude-sonnet-4-5", input_tokens=1, output_tokens=1,
+                          cache_write_tokens=0, cache_read_tokens=0, cost=0.0,
+                          timestamp_ms=1_768_473_045_123)
+
+        assert entry._timestamp is None
+        assert entry.timestamp == datetime(2026, 1, 15, 10, 30, 45, 123000, tzinfo=timezone.utc)
+
+    def test_usage_data_timestamp_setter_updates_ms(self, mock_usage_entry):
+        entry = mock_usage_entry()
+        new_time = datetime(2026, 1, 15, 10, 30, 45, tzinfo=timezone.utc)
+
+        entry.timestamp = new_time
+
+        assert entry.timestamp is new_time
+        assert entry.timestamp_ms == 1_768_473_045_000
+
+    def test_line_with_bad_timestamp_is_skipped(self, temp_jsonl_dir):
+        jsonl_file = temp_jsonl_dir / "bad.jsonl"
+        good = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+        lines = [
+            {"timestamp": ts, "requestId": "req_" + ts,
+             "message": {"id": "msg_1", "model": "claude-sonnet-4-5", "usage": {"input_tokens": 1}}}
+            for ts in ("not a time", good)
+        ]
+        jsonl_file.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+
+        reader = LogReader(prefilter=False)
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 1
+
+
+class TestParallelScan:
+    """Test parsing unread files across a process pool"""
+
+    def _write_files(self, directory, usage_line):
+        files = []
+        for i in range(5):
+            jsonl_file = directory / f"session_{i}.jsonl"
+            lines = [usage_line(f"msg_{i}_{n}", hours_ago=n + 1) for n in range(i + 1)]
+            # copy of another file's entry, as resumed sessions write
+            lines.append(usage_line("msg_0_0", hours_ago=1))
+            jsonl_file.write_text("\n".join(lines) + "\n")
+            files.append(jsonl_file)
+        return files
+
+    def test_chunk_by_size_balances_chunks(self):
+        from sumonitor.data.log_reader import _chunk_by_size
+        files = [("a", 100), ("b", 60), ("c", 50), ("d", 40), ("e", 10)]
+
+        chunks = _chunk_by_size(files, 2)
+
+        sizes = dict(files)
+        totals = sorted(sum(sizes[path] for path in chunk) for chunk in chunks)
+        assert totals == [120, 140]
+        assert sorted(path for chunk in chunks for path in chunk) == ["a", "b", "c", "d", "e"]
+
+    def test_chunk_by_size_never_returns_empty_chunks(self):
+        from sumonitor.data.log_reader import _chunk_by_size
+
+        assert _chunk_by_size([("a", 1)], 8) == [["a"]]
+
+    def test_parallel_scan_matches_sequential(self, temp_jsonl_dir, usage_line):
+        """Pool results should be merged and deduplicated like a sequential parse"""
+        files = self._write_files(temp_jsonl_dir, usage_line)
+
+        sequential = LogReader()
+        with patch.object(sequential, 'get_jsonl_files', return_value=files):
+            expected = sequential.parse_json_files()
+
+        parallel = LogReader(scan_workers=2)
+        with patch('sumonitor.data.log_reader.MIN_PARALLEL_SCAN_BYTES', 0):
+            with patch.object(parallel, 'get_jsonl_files', return_value=files):
+                with patch.object(parallel, 'parse_lines', wraps=parallel.parse_lines) as parse_lines:
+                    usage_data = parallel.parse_json_files()
+
+        assert len(expected) == 15
+        assert sorted(e.timestamp_ms for e in usage_data) == sorted(e.timestamp_ms for e in expected)
+        assert parallel.cursors == sequential.cursors
+        # every file was handled by the pool, nothing left for this process
+        assert all(call.args[0] == [] for call in parse_lines.call_args_list)
+
+    def test_small_scan_stays_in_process(self, temp_jsonl_dir, usage_line):
+        files = self._write_files(temp_jsonl_dir, usage_line)
+
+        reader = LogReader(scan_workers=4)
+        with patch('concurrent.futures.ProcessPoolExecutor') as pool:
+            with patch.object(reader, 'get_jsonl_files', return_value=files):
+                usage_data = reader.parse_json_files()
+
+        pool.assert_not_called()
+        assert len(usage_data) == 15
+
+    def test_pool_failure_falls_back_to_sequential(self, temp_jsonl_dir, usage_line):
+        files = self._write_files(temp_jsonl_dir, usage_line)
+
+        reader = LogReader(scan_workers=2)
+        with patch('sumonitor.data.log_reader.MIN_PARALLEL_SCAN_BYTES', 0), \
+             patch('concurrent.futures.ProcessPoolExecutor', side_effect=OSError):
+            with patch.object(reader, 'get_jsonl_files', return_value=files):
+                usage_data = reader.parse_json_files()
+
+        assert len(usage_data) == 15
+
+
+class TestMmapReading:
+    """Test scanning large appends in place with mmap"""
+
+    # lines should be big enough that copying them out would show
+    CONTENT = "x" * 200
+
+    @pytest.fixture(autouse=True)
+    def always_mmap(self):
+        with patch('sumonitor.data.log_reader.MMAP_MIN_BYTES', 0):
+            yield
+
+    def test_returns_only_usage_lines(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "big.jsonl"
+        lines = [usage_line("msg_1", content=self.CONTENT),
+                 usage_line("msg_2", usage=False, content=self.CONTENT),
+                 usage_line("msg_3", content=self.CONTENT)]
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        reader = LogReader()
+        read = reader.read_new_lines(jsonl_file)
+
+        assert read == [lines[0].encode(), lines[2].encode()]
+        assert reader.cursors[str(jsonl_file)].offset == jsonl_file.stat().st_size
+
+    def test_partial_last_line_left_for_next_read(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "big.jsonl"
+        complete = usage_line("msg_1", content=self.CONTENT)
+        partial = usage_line("msg_2", content=self.CONTENT)
+        jsonl_file.write_text(complete + "\n" + partial[:40])
+
+        reader = LogReader()
+        assert reader.read_new_lines(jsonl_file) == [complete.encode()]
+
+        with open(jsonl_file, "a") as f:
+            f.write(partial[40:] + "\n")
+        assert reader.read_new_lines(jsonl_file) == [partial.encode()]
+
+    def test_no_complete_line(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "big.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", content=self.CONTENT))
+
+        reader = LogReader()
+
+        assert reader.read_new_lines(jsonl_file) == []
+        assert reader.cursors[str(jsonl_file)].offset == 0
+
+    def test_not_used_without_prefilter(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "big.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", usage=False, content=self.CONTENT) + "\n")
+
+        reader = LogReader(prefilter=False)
+
+        assert len(reader.read_new_lines(jsonl_file)) == 1
+
+    def test_parse_matches_buffered_read(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "big.jsonl"
+        lines = [usage_line(f"msg_{i}", usage=i % 3 == 0, content=self.CONTENT) for i in range(30)]
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        mapped = LogReader()
+        with patch.object(mapped, 'get_jsonl_files', return_value=[jsonl_file]):
+            usage_data = mapped.parse_json_files()
+
+        with patch('sumonitor.data.log_reader.MMAP_MIN_BYTES', float('inf')):
+            buffered = LogReader()
+            with patch.object(buffered, 'get_jsonl_files', return_value=[jsonl_file]):
+                expected = buffered.parse_json_files()
+
+        assert usage_data == expected
+        assert len(usage_data) == 10
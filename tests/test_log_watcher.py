@@ -0,0 +1,191 @@
+"""Tests for log_watcher.py - inotify and polling change notification"""
+
+import errno
+import os
+import sys
+import threading
+import pytest
+from unittest.mock import patch
+
+from sumonitor.data.log_watcher import InotifyWatcher, PollingWatcher, create_watcher
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+@pytest.fixture(params=[
+    pytest.param("inotify", marks=linux_only),
+    "polling",
+])
+def watcher_factory(request):
+    """Create either watcher type for the same directory"""
+    created = []
+
+    def _create(path):
+        if request.param == "inotify":
+            watcher = InotifyWatcher(str(path))
+        else:
+            watcher = PollingWatcher(str(path), poll_interval=0.05)
+        created.append(watcher)
+        return watcher
+
+    yield _create
+    for watcher in created:
+        watcher.close()
+
+
+class TestChangeDetection:
+    """Test that both backends report created and appended jsonl files"""
+
+    def test_reports_appended_file(self, watcher_factory, temp_jsonl_dir):
+        """Appending to an existing jsonl file should be reported"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text("{}\n")
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        with open(jsonl_file, "a") as f:
+            f.write("{}\n")
+
+        assert str(jsonl_file) in watcher.wait(timeout=2)
+
+    def test_reports_new_file(self, watcher_factory, temp_jsonl_dir):
+        """Creating a new jsonl file should be reported"""
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        jsonl_file = temp_jsonl_dir / "new.jsonl"
+        jsonl_file.write_text("{}\n")
+
+        assert str(jsonl_file) in watcher.wait(timeout=2)
+
+    def test_reports_file_in_new_project_directory(self, watcher_factory, temp_jsonl_dir):
+        """jsonl files inside a newly created project directory should be reported"""
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        project = temp_jsonl_dir.parent / "new-project"
+        project.mkdir()
+        jsonl_file = project / "session.jsonl"
+        jsonl_file.write_text("{}\n")
+
+        changed = watcher.wait(timeout=2)
+        if str(jsonl_file) not in changed:
+            # the directory event can arrive before the file is written
+            changed = watcher.wait(timeout=2)
+        assert str(jsonl_file) in changed
+
+    def test_ignores_non_jsonl_files(self, watcher_factory, temp_jsonl_dir):
+        """Changes to other files should not wake the watcher"""
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        (temp_jsonl_dir / "notes.txt").write_text("hello")
+
+        assert watcher.wait(timeout=0.3) == set()
+
+    def test_times_out_without_changes(self, watcher_factory, temp_jsonl_dir):
+        """wait() should return an empty set when nothing changes"""
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        assert watcher.wait(timeout=0.1) == set()
+
+    def test_wake_interrupts_wait(self, watcher_factory, temp_jsonl_dir):
+        """wake() from another thread should end a blocking wait"""
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+        timer = threading.Timer(0.05, watcher.wake)
+        timer.start()
+
+        assert watcher.wait(timeout=5) == set()
+        timer.join()
+
+
+class TestCreateWatcher:
+    """Test backend selection"""
+
+    def test_missing_directory_falls_back_to_polling(self, tmp_path):
+        """A projects directory that doesn't exist yet should use polling"""
+        watcher = create_watcher(str(tmp_path / "missing"))
+
+        assert isinstance(watcher, PollingWatcher)
+        assert watcher.wait(timeout=0.05) == set()
+        watcher.close()
+
+    @linux_only
+    def test_uses_inotify_on_linux(self, temp_jsonl_dir):
+        """Existing directory on Linux should use inotify"""
+        watcher = create_watcher(str(temp_jsonl_dir.parent))
+
+        assert isinstance(watcher, InotifyWatcher)
+        watcher.close()
+
+    @linux_only
+    def test_failed_watch_falls_back_to_polling(self, temp_jsonl_dir):
+        """Running out of inotify watches should use polling instead of missing directories"""
+        no_space = OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+        with patch.object(InotifyWatcher, 'add_watch', side_effect=no_space):
+            watcher = create_watcher(str(temp_jsonl_dir.parent))
+
+        assert isinstance(watcher, PollingWatcher)
+        watcher.close()
+
+    def test_polling_sees_directory_created_later(self, tmp_path):
+        """Polling should pick up files once the projects directory appears"""
+        root = tmp_path / "projects"
+        watcher = PollingWatcher(str(root), poll_interval=0.05)
+
+        (root / "project").mkdir(parents=True)
+        jsonl_file = root / "project" / "session.jsonl"
+        jsonl_file.write_text("{}\n")
+
+        assert str(jsonl_file) in watcher.wait(timeout=2)
+        watcher.close()
+
+
+class TestPoll:
+    """Test the non-blocking poll() used by the asyncio engine"""
+
+    def test_poll_reports_change_without_waiting(self, watcher_factory, temp_jsonl_dir):
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text("{}\n")
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+        assert watcher.poll() == set()
+
+        with open(jsonl_file, "a") as f:
+            f.write("{}\n")
+
+        assert watcher.poll() == {str(jsonl_file)}
+        assert watcher.poll() == set()
+
+    def test_fileno(self, watcher_factory, temp_jsonl_dir):
+        watcher = watcher_factory(temp_jsonl_dir.parent)
+
+        if isinstance(watcher, InotifyWatcher):
+            assert watcher.fileno() == watcher.fd
+        else:
+            assert watcher.fileno() is None
+
+
+@linux_only
+class TestInotifyFallback:
+    """Test switching to polling when a new directory can't be watched"""
+
+    def test_missing_directory_is_not_an_error(self, temp_jsonl_dir):
+        watcher = InotifyWatcher(str(temp_jsonl_dir.parent))
+
+        watcher.add_watch(temp_jsonl_dir / "removed")
+
+        watcher.close()
+
+    def test_reports_unwatched_directory(self, temp_jsonl_dir):
+        """Files in a directory the kernel refused to watch should still be reported"""
+        watcher = InotifyWatcher(str(temp_jsonl_dir.parent), poll_interval=0.05)
+        project = temp_jsonl_dir.parent / "new-project"
+        jsonl_file = project / "session.jsonl"
+
+        no_space = OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+        with patch.object(watcher, 'add_watch', side_effect=no_space):
+            project.mkdir()
+            jsonl_file.write_text("{}\n")
+            assert str(jsonl_file) in watcher.wait(timeout=2)
+
+        assert watcher.fileno() is None
+        with open(jsonl_file, "a") as f:
+            f.write("{}\n")
+        assert watcher.wait(timeout=2) == {str(jsonl_file)}
+        watcher.close()
@@ -0,0 +1,127 @@
+"""Tests for metrics.py - profiling timers and counters"""
+
+import pytest
+import json
+from unittest.mock import patch
+
+from sumonitor.metrics import METRICS, Metrics, MetricsWriter, StageTimer
+from sumonitor.data.log_reader import LogReader
+
+
+class TestStageTimer:
+    """Test duration aggregation"""
+
+    def test_percentiles(self):
+        timer = StageTimer()
+        for ms in range(1, 101):
+            timer.add(ms / 1000)
+
+        summary = timer.summary()
+
+        assert summary["count"] == 100
+        assert summary["p50"] == pytest.approx(0.051)
+        assert summary["p99"] == pytest.approx(0.1)
+        assert summary["max"] == pytest.approx(0.1)
+        assert summary["mean"] == pytest.approx(0.0505)
+
+    def test_empty(self):
+        assert StageTimer().summary()["p95"] == 0.0
+
+
+class TestMetrics:
+    """Test recording while enabled and disabled"""
+
+    def test_disabled_records_nothing(self):
+        metrics = Metrics()
+        metrics.count("lines_read", 5)
+        metrics.record("decode", 0.1)
+        with metrics.timer("tick"):
+            pass
+
+        assert metrics.summary()["counters"] == {}
+        assert metrics.summary()["timers"] == {}
+
+    def test_counts_and_times(self):
+        metrics = Metrics(enabled=True)
+        metrics.count("redraws")
+        metrics.count("redraws", 2)
+        with metrics.timer("tick"):
+            pass
+
+        summary = metrics.summary()
+
+        assert summary["counters"] == {"redraws": 3}
+        assert summary["timers"]["tick"]["count"] == 1
+
+    def test_timer_records_when_block_raises(self):
+        metrics = Metrics(enabled=True)
+        with pytest.raises(ValueError):
+            with metrics.timer("tick"):
+                raise ValueError
+
+        assert metrics.summary()["timers"]["tick"]["count"] == 1
+
+    def test_format_summary_lists_stages_and_counters(self):
+        metrics = Metrics(enabled=True)
+        metrics.record("decode", 0.002)
+        metrics.count("bytes_read", 1234)
+
+        text = metrics.format_summary()
+
+        assert "decode" in text
+        assert "bytes_read" in text
+        assert "1,234" in text
+
+    def test_write_json(self, tmp_path):
+        metrics = Metrics(enabled=True)
+        metrics.count("redraws")
+        path = tmp_path / "metrics.json"
+
+        metrics.write(str(path))
+
+        assert json.loads(path.read_text())["counters"] == {"redraws": 1}
+
+    def test_writer_writes_on_stop(self, tmp_path):
+        metrics = Metrics(enabled=True)
+        path = tmp_path / "metrics.json"
+        writer = MetricsWriter(metrics, str(path), interval=60).start()
+        metrics.count("redraws")
+
+        writer.stop()
+
+        assert json.loads(path.read_text())["counters"] == {"redraws": 1}
+
+    def test_writer_ignores_unwritable_path(self, tmp_path):
+        writer = MetricsWriter(Metrics(enabled=True), str(tmp_path / "missing" / "m.json"))
+
+        writer.write()
+
+
+class TestInstrumentation:
+    """Test the counters recorded by LogReader"""
+
+    @pytest.fixture(autouse=True)
+    def profiling(self):
+        METRICS.enable()
+        yield
+        METRICS.enabled = False
+        METRICS.reset()
+
+    def test_parse_counts_files_bytes_lines_and_entries(self, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n" + usage_line("msg_2", usage=False) + "\n")
+
+        reader = LogReader()
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+
+        summary = METRICS.summary()
+        assert summary["counters"] == {
+            "files_scanned": 1,
+            "bytes_read": jsonl_file.stat().st_size,
+            "lines_read": 2,
+            # the prefilter drops the line without usage before decoding
+            "lines_decoded": 1,
+            "entries_added": 1,
+        }
+        assert {"discover", "read", "decode", "cost"} <= set(summary["timers"])
@@ -231,3 +231,45 @@ class TestCostCalculationConsistency:
         assert cost1 == pytest.approx(expected1)
         assert cost2 == pytest.approx(expected2)
         assert cost1 != cost2  # Different token types have different rates
+
+
+class TestPricingCache:
+    """Test memoized model pricing resolution"""
+
+    def test_unknown_models_share_singleton(self):
+        """Unknown models should not allocate a new ModelPricing each call"""
+        from sumonitor.data.pricing import UNKNOWN_PRICING
+
+        assert _get_pricing("unknown-a") is UNKNOWN_PRICING
+        assert _get_pricing("unknown-b") is UNKNOWN_PRICING
+
+    def test_repeated_lookup_is_cache_hit(self):
+        """Second lookup of the same model string should come from the cache"""
+        _get_pricing.cache_clear()
+        _get_pricing("claude-opus-4-5-20251101")
+        _get_pricing("claude-opus-4-5-20251101")
+
+        info = _get_pricing.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+    def test_cached_result_is_same_object(self):
+        """Known models should resolve to the shared MODEL_PRICING entry"""
+        from sumonitor.data.pricing import MODEL_PRICING
+
+        assert _get_pricing("claude-haiku-4-5") is MODEL_PRICING["haiku-4-5"]
+
+    def test_pricing_is_immutable(self):
+        """Shared pricing objects should not be modifiable"""
+        import dataclasses
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            _get_pricing("claude-sonnet-4-5").input_base = 0.0
+
+    def test_cache_is_bounded(self):
+        """Many distinct model strings should not grow the cache without limit"""
+        _get_pricing.cache_clear()
+        for i in range(1000):
+            _get_pricing(f"synthetic-model-{i}")
+
+        assert _get_pricing.cache_info().currsize <= _get_pricing.cache_info().maxsize
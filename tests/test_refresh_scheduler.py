@@ -0,0 +1,91 @@
+"""Tests for refresh_scheduler.py - adaptive refresh intervals"""
+
+import pytest
+from datetime import datetime, timezone, timedelta
+
+from sumonitor.terminal.refresh_scheduler import BOUNDARY_SLACK, RefreshScheduler
+
+
+NOW = datetime(2026, 1, 15, 10, 0, 0, tzinfo=timezone.utc)
+
+
+class TestFromConfig:
+    """Test reading intervals from the user config"""
+
+    def test_defaults_when_not_configured(self):
+        scheduler = RefreshScheduler.from_config({})
+
+        assert scheduler == RefreshScheduler()
+
+    def test_reads_configured_values(self):
+        scheduler = RefreshScheduler.from_config({
+            'refresh_active_interval': 0.5,
+            'refresh_idle_interval': 10,
+            'refresh_active_window': 60,
+        })
+
+        assert scheduler.active_interval == 0.5
+        assert scheduler.idle_interval == 10.0
+        assert scheduler.active_window == 60.0
+
+    @pytest.mark.parametrize("value", [0, -1, "fast", None, True])
+    def test_ignores_invalid_values(self, value):
+        scheduler = RefreshScheduler.from_config({'refresh_idle_interval': value})
+
+        assert scheduler.idle_interval == RefreshScheduler().idle_interval
+
+
+class TestPollInterval:
+    """Test fast refreshes while usage is arriving"""
+
+    def test_idle_without_activity(self):
+        scheduler = RefreshScheduler(active_interval=0.2, idle_interval=5.0)
+
+        assert scheduler.poll_interval(now=100.0) == 5.0
+
+    def test_active_after_new_usage(self):
+        scheduler = RefreshScheduler(active_interval=0.2, idle_interval=5.0, active_window=30.0)
+        scheduler.record_activity(now=100.0)
+
+        assert scheduler.poll_interval(now=110.0) == 0.2
+
+    def test_backs_off_after_active_window(self):
+        scheduler = RefreshScheduler(active_interval=0.2, idle_interval=5.0, active_window=30.0)
+        scheduler.record_activity(now=100.0)
+
+        assert scheduler.poll_interval(now=130.0) == 5.0
+
+
+class TestCountdownDelay:
+    """Test waking only when the countdown text changes"""
+
+    @pytest.fixture
+    def scheduler(self):
+        return RefreshScheduler()
+
+    def test_no_session(self, scheduler):
+        assert scheduler.countdown_delay(None, now=NOW) is None
+
+    def test_next_second_boundary_under_an_hour(self, scheduler):
+        end = NOW + timedelta(minutes=4, seconds=10, milliseconds=300)
+
+        assert scheduler.countdown_delay(end, now=NOW) == pytest.approx(0.3 + BOUNDARY_SLACK)
+
+    def test_next_minute_boundary_over_an_hour(self, scheduler):
+        end = NOW + timedelta(hours=2, minutes=5, seconds=20, milliseconds=500)
+
+        assert scheduler.countdown_delay(end, now=NOW) == pytest.approx(20.5 + BOUNDARY_SLACK)
+
+    def test_switches_to_seconds_below_an_hour(self, scheduler):
+        end = NOW + timedelta(minutes=60, seconds=30)
+
+        # "1h 0m" until 3600s are left, then "59m 59s"
+        assert scheduler.countdown_delay(end, now=NOW) == pytest.approx(30 + BOUNDARY_SLACK)
+
+    def test_zero_seconds_until_expired(self, scheduler):
+        end = NOW - timedelta(milliseconds=400)
+
+        assert scheduler.countdown_delay(end, now=NOW) == pytest.approx(0.6 + BOUNDARY_SLACK)
+
+    def test_expired(self, scheduler):
+        assert scheduler.countdown_delay(NOW - timedelta(seconds=5), now=NOW) is None
@@ -4,7 +4,7 @@ import pytest
 from datetime import datetime, timezone, timedelta
 from freezegun import freeze_time
 
-from sumonitor.session.session_data import SessionData
+from sumonitor.session.session_data import SessionData, UsageSnapshot
 from sumonitor.data.pricing import PlanLimits
 
 
@@ -301,3 +301,113 @@ class TestEdgeCases:
 
         assert data.session_tracker is not None
         assert len(data.session_tracker.sessions) >= 1
+
+
+class TestModelBreakdown:
+    """Test model_breakdown() per model totals"""
+
+    def test_returns_current_session_breakdown(self, mock_usage_entry):
+        entries = [
+            mock_usage_entry(hours_ago=10, model="claude-opus-4-5"),
+            mock_usage_entry(hours_ago=1, input_tokens=500, model="claude-haiku-4-5"),
+        ]
+        data = SessionData(entries, plan="pro")
+
+        breakdown = data.model_breakdown()
+
+        assert list(breakdown) == ["claude-haiku-4-5"]
+        assert breakdown["claude-haiku-4-5"].input_tokens == 500
+
+    def test_empty_without_active_session(self):
+        data = SessionData([], plan="pro")
+
+        assert data.model_breakdown() == {}
+
+
+class TestExistingTracker:
+    """Test SessionData reusing a tracker maintained by the caller"""
+
+    def test_uses_given_tracker_without_rebuilding(self, mock_usage_entry, mocker):
+        from sumonitor.session.session_tracker import SessionTracker
+        tracker = SessionTracker()
+        tracker.add_entries([mock_usage_entry(hours_ago=1, input_tokens=1000, output_tokens=500)])
+        build = mocker.spy(tracker, "build_sessions")
+
+        data = SessionData(None, plan="pro", session_tracker=tracker)
+
+        build.assert_not_called()
+        assert data.session_tracker is tracker
+        assert data.total_tokens() == 1500
+
+
+class TestSnapshot:
+    """Test snapshot() and the countdown computed from it"""
+
+    @freeze_time("2025-12-29 10:00:00")
+    def test_snapshot_copies_current_session(self, mock_usage_entry):
+        data = SessionData([mock_usage_entry(hours_ago=4, input_tokens=100, output_tokens=50, cost=1.5)],
+                           plan="pro")
+
+        snapshot = data.snapshot()
+
+        assert snapshot.has_sessions
+        assert snapshot.total_tokens == 150
+        assert snapshot.session_messages == 1
+        assert snapshot.total_cost == pytest.approx(1.5)
+        assert snapshot.plan_limits == data.plan_limits
+        assert snapshot.session_reset_time() == "1h 0m"
+
+    def test_countdown_ticks_without_new_snapshot(self, mock_usage_entry):
+        """The reset time is computed when read, not when the snapshot is taken"""
+        with freeze_time("2025-12-29 10:00:00"):
+            snapshot = SessionData([mock_usage_entry(hours_ago=4)], plan="pro").snapshot()
+
+        with freeze_time("2025-12-29 10:30:00"):
+            assert snapshot.session_reset_time() == "30m 0s"
+
+    def test_empty_snapshot(self):
+        snapshot = SessionData([], plan="pro").snapshot()
+
+        assert not snapshot.has_sessions
+        assert snapshot.session_end is None
+        assert snapshot.session_reset_time() == "No active session"
+
+    @freeze_time("2025-12-29 10:00:00")
+    def test_dict_round_trip_applies_reader_plan(self, mock_usage_entry, max5_plan_limits):
+        snapshot = SessionData([mock_usage_entry(hours_ago=4, input_tokens=100, cost=1.5)],
+                               plan="pro").snapshot()
+
+        restored = type(snapshot).from_dict(snapshot.to_dict(), max5_plan_limits)
+
+        assert "plan_limits" not in snapshot.to_dict()
+        assert restored.session_end == snapshot.session_end
+        assert restored.total_tokens == snapshot.total_tokens
+        assert restored.total_cost == snapshot.total_cost
+        assert restored.plan_limits == max5_plan_limits
+
+    def test_dict_round_trip_without_session(self, pro_plan_limits):
+        snapshot = SessionData([], plan="pro").snapshot()
+
+        assert type(snapshot).from_dict(snapshot.to_dict(), pro_plan_limits) == snapshot
+
+    @freeze_time("2025-12-29 10:00:00")
+    def test_from_summary_matches_snapshot(self, mock_usage_entry):
+        data = SessionData([mock_usage_entry(hours_ago=4, input_tokens=100, cost=1.5),
+                            mock_usage_entry(hours_ago=1, model="claude-opus-4-1", cost=0.5)],
+                           plan="pro")
+
+        summary = data.session_tracker.last_summary()
+
+        assert UsageSnapshot.from_summary(summary, data.plan_limits) == data.snapshot()
+
+    @freeze_time("2025-12-29 10:00:00")
+    def test_from_summary_of_ended_session(self, mock_usage_entry, pro_plan_limits):
+        data = SessionData([mock_usage_entry(hours_ago=6)], plan="pro")
+
+        snapshot = UsageSnapshot.from_summary(data.session_tracker.last_summary(), pro_plan_limits)
+
+        assert snapshot == data.snapshot()
+        assert snapshot.session_end is None
+
+    def test_from_summary_without_session(self, pro_plan_limits):
+        assert UsageSnapshot.from_summary(None, pro_plan_limits) == SessionData([], plan="pro").snapshot()
@@ -3,7 +3,7 @@
 import pytest
 from datetime import datetime, timezone, timedelta
 
-from sumonitor.session.session_tracker import SessionTracker, Session
+from sumonitor.session.session_tracker import SessionTracker, Session, SessionSummary
 from sumonitor.data.log_reader import UsageData
 
 
@@ -423,3 +423,226 @@ class TestEdgeCases:
         # Should create 4 sessions: 30h, 20h, 10h, (2h+1h)
         assert len(tracker.sessions) == 4
         assert len(tracker.sessions[3].entries) == 2  # Last session has 2 entries
+
+
+class TestRunningTotals:
+    """Test totals maintained incrementally by add_entry()"""
+
+    def test_add_entry_updates_totals(self, mock_usage_entry):
+        """Adding an entry should update every running total"""
+        session = Session(session_id="test", start_time=datetime.now(timezone.utc), entries=[])
+
+        session.add_entry(mock_usage_entry(input_tokens=100, output_tokens=50,
+                                           cache_write=10, cache_read=5, cost=1.0))
+        session.add_entry(mock_usage_entry(input_tokens=200, output_tokens=25,
+                                           cache_write=20, cache_read=15, cost=0.5))
+
+        assert session.total_input_usage == 300
+        assert session.total_output_usage == 75
+        assert session.total_cache_write_usage == 30
+        assert session.total_cache_read_usage == 20
+        assert session.total_tokens == 375
+        assert session.total_costs == pytest.approx(1.5)
+        assert session.total_messages == 2
+
+    def test_initial_entries_are_counted(self, mock_usage_entry):
+        """Entries passed to the constructor should be included in the totals"""
+        entries = [mock_usage_entry(input_tokens=100), mock_usage_entry(input_tokens=200)]
+        session = Session(session_id="test", start_time=datetime.now(timezone.utc), entries=entries)
+
+        assert session.total_input_usage == 300
+        assert session.entries is entries
+
+    def test_totals_do_not_iterate_entries(self, mock_usage_entry):
+        """Reading totals should not loop over the entries"""
+        class NoIterList(list):
+            def __iter__(self):
+                raise AssertionError("entries iterated")
+
+        tracker = SessionTracker()
+        tracker.build_sessions([mock_usage_entry(hours_ago=1, input_tokens=100, output_tokens=50, cost=1.0)])
+        session = tracker.sessions[0]
+        session.entries = NoIterList(session.entries)
+
+        assert session.total_tokens == 150
+        assert session.total_costs == pytest.approx(1.0)
+        assert session.total_messages == 1
+
+    def test_per_model_breakdown(self, mock_usage_entry):
+        """model_usage should keep separate totals for each model"""
+        tracker = SessionTracker()
+        tracker.build_sessions([
+            mock_usage_entry(hours_ago=2, input_tokens=100, cost=1.0, model="claude-sonnet-4-5"),
+            mock_usage_entry(hours_ago=1, input_tokens=200, cost=2.0, model="claude-opus-4-5"),
+            mock_usage_entry(hours_ago=0.5, input_tokens=300, cost=3.0, model="claude-sonnet-4-5"),
+        ])
+        usage = tracker.sessions[0].model_usage
+
+        assert set(usage) == {"claude-sonnet-4-5", "claude-opus-4-5"}
+        assert usage["claude-sonnet-4-5"].input_tokens == 400
+        assert usage["claude-sonnet-4-5"].messages == 2
+        assert usage["claude-opus-4-5"].cost == pytest.approx(2.0)
+
+
+class TestIncrementalAdd:
+    """Test add_entries() updating sessions without a rebuild"""
+
+    def test_appends_to_current_session(self, mock_usage_entry):
+        """Newer entries within the window should join the current session"""
+        tracker = SessionTracker()
+        tracker.add_entries([mock_usage_entry(hours_ago=2)])
+        session = tracker.sessions[0]
+
+        tracker.add_entries([mock_usage_entry(hours_ago=1, input_tokens=300)])
+
+        assert tracker.sessions == [session]
+        assert session.total_messages == 2
+        assert session.entries[-1].input_tokens == 300
+
+    def test_starts_new_session_after_window(self, mock_usage_entry):
+        """Entry past the current session's end should open a new session"""
+        tracker = SessionTracker()
+        tracker.add_entries([mock_usage_entry(hours_ago=8)])
+
+        tracker.add_entries([mock_usage_entry(hours_ago=1)])
+
+        assert len(tracker.sessions) == 2
+
+    def test_out_of_order_entry_inserted_in_place(self, mock_usage_entry):
+        """Older entry inside an existing window should be inserted in time order"""
+        tracker = SessionTracker()
+        early = mock_usage_entry(hours_ago=3)
+        late = mock_usage_entry(hours_ago=1)
+        tracker.add_entries([early, late])
+
+        middle = mock_usage_entry(hours_ago=2, input_tokens=999)
+        tracker.add_entries([middle])
+
+        assert len(tracker.sessions) == 1
+        assert tracker.sessions[0].entries == [early, middle, late]
+        assert tracker.sessions[0].total_input_usage == 100 + 999 + 100
+
+    def test_entry_before_first_session_regroups(self, mock_usage_entry):
+        """Entry older than every session should match a full rebuild"""
+        entries = [mock_usage_entry(hours_ago=h) for h in (6, 4, 1)]
+        late_arrival = mock_usage_entry(hours_ago=9)
+
+        incremental = SessionTracker()
+        incremental.add_entries(entries)
+        incremental.add_entries([late_arrival])
+
+        rebuilt = SessionTracker()
+        rebuilt.build_sessions(entries + [late_arrival])
+
+        assert [s.start_time for s in incremental.sessions] == [s.start_time for s in rebuilt.sessions]
+        assert [s.total_messages for s in incremental.sessions] == [s.total_messages for s in rebuilt.sessions]
+
+    def test_entry_in_gap_between_sessions_regroups(self, mock_usage_entry):
+        """Entry landing between two sessions should match a full rebuild"""
+        entries = [mock_usage_entry(hours_ago=h) for h in (20, 4, 1)]
+        late_arrival = mock_usage_entry(hours_ago=7)
+
+        incremental = SessionTracker()
+        incremental.add_entries(entries)
+        incremental.add_entries([late_arrival])
+
+        rebuilt = SessionTracker()
+        rebuilt.build_sessions(entries + [late_arrival])
+
+        assert [s.start_time for s in incremental.sessions] == [s.start_time for s in rebuilt.sessions]
+        assert [s.total_messages for s in incremental.sessions] == [s.total_messages for s in rebuilt.sessions]
+
+    def test_prune_before_drops_ended_sessions(self, mock_usage_entry):
+        """Sessions that ended before the cutoff should be removed"""
+        tracker = SessionTracker()
+        tracker.add_entries([mock_usage_entry(hours_ago=30), mock_usage_entry(hours_ago=1)])
+
+        tracker.prune_before(datetime.now(timezone.utc) - timedelta(hours=10))
+
+        assert len(tracker.sessions) == 1
+        assert tracker.sessions[0].is_active
+
+
+class TestEpochMilliseconds:
+    """Test integer millisecond session bounds"""
+
+    def test_session_bounds_in_ms(self):
+        start = datetime(2026, 1, 15, 10, 0, tzinfo=timezone.utc)
+        session = Session(session_id="test", start_time=start, entries=[])
+
+        assert session.start_ms == int(start.timestamp() * 1000)
+        assert session.end_ms - session.start_ms == 5 * 3600 * 1000
+        assert session.end_time == start + timedelta(hours=5)
+
+    def test_entries_from_epoch_ms_are_grouped(self):
+        """Entries built from timestamp_ms should group without touching datetimes"""
+        start_ms = 1_768_471_200_000
+        entries = [
+            UsageData(model="claude-sonnet-4-5", input_tokens=1, output_tokens=1,
+                      cache_write_tokens=0, cache_read_tokens=0, cost=0.0, timestamp_ms=ms)
+            for ms in (start_ms + 5 * 3600 * 1000 + 1, start_ms, start_ms + 5 * 3600 * 1000)
+        ]
+        tracker = SessionTracker()
+
+        tracker.build_sessions(entries)
+
+        assert [len(s.entries) for s in tracker.sessions] == [2, 1]
+        assert tracker.sessions[0].start_ms == start_ms
+        assert tracker.sessions[1].start_ms == start_ms + 5 * 3600 * 1000 + 1
+
+
+class TestSessionSummary:
+    """Test the session totals saved in the usage index"""
+
+    def test_last_summary_copies_newest_session(self, mock_usage_entry):
+        tracker = SessionTracker()
+        tracker.build_sessions([
+            mock_usage_entry(hours_ago=12, input_tokens=1000),
+            mock_usage_entry(hours_ago=2, input_tokens=100, output_tokens=50, cost=0.5),
+            mock_usage_entry(hours_ago=1, input_tokens=200, output_tokens=50, cost=0.25),
+        ])
+
+        summary = tracker.last_summary()
+        summary.totals.input_tokens = 0
+
+        assert summary.start_ms == tracker.sessions[-1].start_ms
+        assert tracker.sessions[-1].totals.input_tokens == 300
+        assert tracker.sessions[-1].summary().totals.messages == 2
+
+    def test_no_sessions(self):
+        assert SessionTracker().last_summary() is None
+
+    def test_extend_matches_tracker(self, mock_usage_entry):
+        """Folding entries into a summary should give the tracker's newest session"""
+        saved = [mock_usage_entry(hours_ago=9), mock_usage_entry(hours_ago=8, model="claude-opus-4-1")]
+        appended = [mock_usage_entry(hours_ago=2, cost=0.5), mock_usage_entry(hours_ago=1)]
+        tracker = SessionTracker()
+        tracker.build_sessions(saved)
+        summary = tracker.last_summary()
+
+        tracker.add_entries(appended)
+
+        assert summary.extend(appended) == tracker.last_summary()
+
+    def test_extend_within_window(self, mock_usage_entry):
+        tracker = SessionTracker()
+        tracker.build_sessions([mock_usage_entry(hours_ago=3)])
+        summary = tracker.last_summary()
+
+        extended = summary.extend([mock_usage_entry(hours_ago=1, input_tokens=500)])
+
+        assert extended is summary
+        assert extended.totals.messages == 2
+        assert extended.totals.input_tokens == 600
+
+    def test_extend_skips_entries_before_session(self, mock_usage_entry):
+        tracker = SessionTracker()
+        tracker.build_sessions([mock_usage_entry(hours_ago=1)])
+        summary = tracker.last_summary()
+
+        summary.extend([mock_usage_entry(hours_ago=3)])
+
+        assert summary.totals.messages == 1
+
+    def test_end_ms(self):
+        assert SessionSummary(start_ms=1000).end_ms == 1000 + 5 * 3600 * 1000
@@ -0,0 +1,120 @@
+"""Tests for shared_snapshot.py - seqlock protected snapshot in shared memory"""
+
+import threading
+import pytest
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+
+from sumonitor.data.log_reader import ModelUsage, to_epoch_ms
+from sumonitor.session.session_data import UsageSnapshot
+from sumonitor.session.shared_snapshot import (
+    MAX_MODELS, SEQUENCE, SEQUENCE_OFFSET, SharedSnapshotReader, SharedSnapshotWriter
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "snapshot.shm")
+
+
+class TestRoundTrip:
+    """Test publishing and reading back"""
+
+    def test_reads_published_snapshot(self, path, max5_plan_limits, usage_snapshot):
+        sonnet = ModelUsage(input_tokens=1000, output_tokens=500, cache_write_tokens=10,
+                            cache_read_tokens=20, cost=1.25, messages=3)
+        snapshot = usage_snapshot(models=[("claude-sonnet-4-5", sonnet)])
+        SharedSnapshotWriter(path).publish(snapshot, now_ms=123)
+
+        published = SharedSnapshotReader(path).read(max5_plan_limits)
+
+        assert published.published_ms == 123
+        # the reader applies its own plan
+        assert published.snapshot == replace(snapshot, plan_limits=max5_plan_limits)
+
+    def test_no_session(self, path, pro_plan_limits):
+        SharedSnapshotWriter(path).publish(UsageSnapshot(plan_limits=pro_plan_limits))
+
+        snapshot = SharedSnapshotReader(path).read(pro_plan_limits).snapshot
+
+        assert snapshot == UsageSnapshot(plan_limits=pro_plan_limits)
+
+    def test_nothing_published_yet(self, path, pro_plan_limits):
+        SharedSnapshotWriter(path)
+
+        assert SharedSnapshotReader(path).read(pro_plan_limits) is None
+
+    def test_reader_sees_later_publishes(self, path, pro_plan_limits, usage_snapshot):
+        writer = SharedSnapshotWriter(path)
+        reader = SharedSnapshotReader(path)
+        writer.publish(usage_snapshot(total_tokens=1))
+        writer.publish(usage_snapshot(total_tokens=2))
+
+        assert reader.read(pro_plan_limits).snapshot.total_tokens == 2
+
+    def test_keeps_most_expensive_models(self, path, pro_plan_limits, usage_snapshot):
+        models = [(f"model-{i}", ModelUsage(cost=float(i), messages=1)) for i in range(MAX_MODELS + 2)]
+        SharedSnapshotWriter(path).publish(usage_snapshot(models=models))
+
+        names = [name for name, _ in SharedSnapshotReader(path).read(pro_plan_limits).snapshot.models]
+
+        assert len(names) == MAX_MODELS
+        assert "model-0" not in names and "model-1" not in names
+
+    def test_age(self, path, pro_plan_limits, usage_snapshot):
+        now = datetime(2026, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+        SharedSnapshotWriter(path).publish(usage_snapshot(), now_ms=to_epoch_ms(now - timedelta(seconds=7)))
+
+        assert SharedSnapshotReader(path).read(pro_plan_limits).age(now) == pytest.approx(7)
+
+
+class TestSeqlock:
+    """Test consistency while the writer is active"""
+
+    def test_gives_up_while_writer_mid_update(self, path, pro_plan_limits, usage_snapshot):
+        writer = SharedSnapshotWriter(path)
+        writer.publish(usage_snapshot())
+        SEQUENCE.pack_into(writer.mm, SEQUENCE_OFFSET, 3)
+
+        assert SharedSnapshotReader(path).read(pro_plan_limits) is None
+
+    def test_new_writer_recovers_from_dead_writer(self, path, pro_plan_limits, usage_snapshot):
+        writer = SharedSnapshotWriter(path)
+        writer.publish(usage_snapshot(total_tokens=1))
+        SEQUENCE.pack_into(writer.mm, SEQUENCE_OFFSET, 3)
+
+        SharedSnapshotWriter(path).publish(usage_snapshot(total_tokens=2))
+
+        assert SharedSnapshotReader(path).read(pro_plan_limits).snapshot.total_tokens == 2
+
+    def test_reset_on_unknown_layout(self, path, pro_plan_limits):
+        with open(path, "wb") as f:
+            f.write(b"garbage" * 100)
+
+        SharedSnapshotWriter(path)
+
+        assert SharedSnapshotReader(path).read(pro_plan_limits) is None
+
+    def test_never_reads_torn_snapshot(self, path, pro_plan_limits):
+        """tokens and messages are always published equal, a torn read would differ"""
+        writer = SharedSnapshotWriter(path)
+        writer.publish(UsageSnapshot(plan_limits=pro_plan_limits, total_tokens=0, session_messages=0))
+        stop = threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                writer.publish(UsageSnapshot(plan_limits=pro_plan_limits, total_tokens=i, session_messages=i))
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        reader = SharedSnapshotReader(path)
+        try:
+            for _ in range(2000):
+                published = reader.read(pro_plan_limits)
+                if published is not None:
+                    assert published.snapshot.total_tokens == published.snapshot.session_messages
+        finally:
+            stop.set()
+            thread.join()
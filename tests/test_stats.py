@@ -0,0 +1,231 @@
+"""Tests for stats.py - headless usage output"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from freezegun import freeze_time
+
+from sumonitor import stats
+from sumonitor.data.decoder import DECODERS
+from sumonitor.data.log_reader import LogReader, to_epoch_ms
+from sumonitor.data.usage_index import UsageIndex
+from sumonitor.session.session_data import UsageSnapshot
+from sumonitor.session.shared_snapshot import SharedSnapshotWriter
+from sumonitor.terminal.terminal_handler import TerminalHandler
+
+
+NOW = datetime(2026, 1, 15, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    path = str(tmp_path / "snapshot.shm")
+    with patch('sumonitor.session.shared_snapshot.default_snapshot_path', return_value=path):
+        yield path
+
+
+class TestStatsDict:
+    """Test the fields reported"""
+
+    def test_fields(self, usage_snapshot):
+        result = stats.stats_dict(usage_snapshot(), "pro", "daemon", now=NOW)
+
+        assert result == {
+            "plan": "pro",
+            "source": "daemon",
+            "active": True,
+            "total_tokens": 1500,
+            "token_limit": 19_000,
+            "messages": 3,
+            "message_limit": 250,
+            "cost": 1.25,
+            "cost_limit": 18.00,
+            "session_end": "2026-01-15T14:05:00+00:00",
+            "reset_in_seconds": 7500,
+            "reset_in": "2h 5m",
+            "models": {"claude-sonnet-4-5": {
+                "input_tokens": 0, "output_tokens": 0, "cache_write_tokens": 0,
+                "cache_read_tokens": 0, "cost": 1.25, "messages": 3}},
+        }
+
+    def test_no_session(self, pro_plan_limits):
+        result = stats.stats_dict(UsageSnapshot(plan_limits=pro_plan_limits), "pro", "logs", now=NOW)
+
+        assert result["active"] is False
+        assert result["session_end"] is None
+        assert result["reset_in_seconds"] is None
+        assert result["reset_in"] == "No active session"
+
+    @freeze_time(NOW)
+    def test_default_line_matches_overlay(self, mock_pexpect, usage_snapshot):
+        snapshot = usage_snapshot()
+        handler = TerminalHandler(LogReader(), mock_pexpect, watcher=object(), threaded=False)
+
+        line = stats.format_line(stats.stats_dict(snapshot, "pro", "daemon"))
+
+        assert line == handler.format_overlay(snapshot)
+
+    def test_custom_template(self, usage_snapshot):
+        result = stats.stats_dict(usage_snapshot(), "pro", "daemon", now=NOW)
+
+        assert stats.format_line(result, "{total_tokens} tok {reset_in}") == "1500 tok 2h 5m"
+
+
+class TestSources:
+    """Test preferring the daemon's shared snapshot over parsing"""
+
+    def test_reads_fresh_shared_snapshot(self, shared_path, pro_plan_limits, usage_snapshot):
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot())
+
+        assert stats.read_shared_snapshot(pro_plan_limits, max_age=15) == usage_snapshot()
+
+    def test_ignores_stale_shared_snapshot(self, shared_path, pro_plan_limits, usage_snapshot):
+        old = datetime.now(timezone.utc) - timedelta(minutes=5)
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot(), now_ms=to_epoch_ms(old))
+
+        assert stats.read_shared_snapshot(pro_plan_limits, max_age=15) is None
+
+    def test_missing_shared_snapshot(self, shared_path, pro_plan_limits):
+        assert stats.read_shared_snapshot(pro_plan_limits, max_age=15) is None
+
+    def test_parse_snapshot_uses_index(self, tmp_path, temp_jsonl_dir, usage_line):
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+        index_path = str(tmp_path / "index.db")
+
+        with patch.object(LogReader, 'get_jsonl_files', return_value=[jsonl_file]), \
+             patch('sumonitor.data.usage_index.UsageIndex', lambda: UsageIndex(index_path)):
+            first = stats.parse_snapshot("pro")
+            # second run restores the row from the index instead of decoding it
+            with patch.object(LogReader, 'parse_lines', return_value=[]) as parse_lines:
+                second = stats.parse_snapshot("pro")
+
+        assert first.total_tokens == 150
+        assert second == first
+        assert all(call.args[0] == [] for call in parse_lines.call_args_list)
+
+    def test_parse_snapshot_reads_saved_session(self, tmp_path, temp_jsonl_dir, usage_line):
+        """With a saved session only appended lines are parsed, and nothing is written"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", hours_ago=2) + "\n")
+        index_path = str(tmp_path / "index.db")
+
+        with patch.object(LogReader, 'get_jsonl_files', return_value=[jsonl_file]), \
+             patch('sumonitor.data.usage_index.UsageIndex', lambda: UsageIndex(index_path)):
+            stats.parse_snapshot("pro")
+            with open(jsonl_file, "a") as f:
+                f.write(usage_line("msg_2", input_tokens=1000) + "\n")
+                # copy of an already saved entry, e.g. from a resumed conversation
+                f.write(usage_line("msg_1", hours_ago=2) + "\n")
+            parsed = []
+            parse_lines = LogReader.parse_lines
+
+            def counting_parse_lines(self, lines, cutoff_ms):
+                parsed.append(len(lines))
+                return parse_lines(self, lines, cutoff_ms)
+
+            with patch.object(UsageIndex, 'save') as save, \
+                 patch.object(UsageIndex, 'load_usage') as load_usage, \
+                 patch.object(LogReader, 'parse_lines', counting_parse_lines):
+                snapshot = stats.parse_snapshot("pro")
+
+        save.assert_not_called()
+        load_usage.assert_not_called()
+        assert parsed == [2]
+        assert snapshot.total_tokens == 1200
+        assert snapshot.session_messages == 2
+
+    def test_parse_snapshot_starts_new_session(self, tmp_path, temp_jsonl_dir, usage_line):
+        """Lines past the end of the saved session should be reported as a new one"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1", hours_ago=7) + "\n")
+        index_path = str(tmp_path / "index.db")
+
+        with patch.object(LogReader, 'get_jsonl_files', return_value=[jsonl_file]), \
+             patch('sumonitor.data.usage_index.UsageIndex', lambda: UsageIndex(index_path)):
+            assert stats.parse_snapshot("pro").session_end is None
+            with open(jsonl_file, "a") as f:
+                f.write(usage_line("msg_2", hours_ago=1, input_tokens=1000) + "\n")
+            snapshot = stats.parse_snapshot("pro")
+
+        assert snapshot.total_tokens == 1050
+        assert snapshot.session_messages == 1
+
+    def test_overlay_saves_session_for_stats(self, tmp_path, temp_jsonl_dir, usage_line, mock_pexpect):
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n" + usage_line("msg_2") + "\n")
+        index = UsageIndex(str(tmp_path / "index.db"))
+        log_reader = LogReader(index=index)
+        handler = TerminalHandler(log_reader, mock_pexpect, watcher=object(), threaded=False)
+
+        with patch.object(log_reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            overlay = handler.build_snapshot()
+
+        assert UsageSnapshot.from_summary(index.load_session(), overlay.plan_limits) == overlay
+        index.close()
+
+    def test_parse_snapshot_without_projects_dir(self):
+        with patch.object(LogReader, 'get_jsonl_files', side_effect=FileNotFoundError):
+            snapshot = stats.parse_snapshot("pro", no_cache=True)
+
+        assert not snapshot.has_sessions
+        assert stats.format_line(stats.stats_dict(snapshot, "pro", "logs")).startswith("Tokens: 0/19000 |")
+
+
+class TestMain:
+    """Test the command line"""
+
+    def test_json_from_daemon(self, shared_path, capsys, usage_snapshot):
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot())
+
+        with patch('sumonitor.stats.parse_snapshot') as parse_snapshot:
+            assert stats.main(['--plan', 'pro', '--format', 'json']) == 0
+
+        parse_snapshot.assert_not_called()
+        result = json.loads(capsys.readouterr().out)
+        assert result["source"] == "daemon"
+        assert result["total_tokens"] == 1500
+
+    def test_no_daemon_parses_logs(self, shared_path, capsys, usage_snapshot):
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot())
+
+        with patch('sumonitor.stats.parse_snapshot', return_value=usage_snapshot(42)):
+            stats.main(['--plan', 'pro', '--no-daemon', '--template', '{source} {total_tokens}'])
+
+        assert capsys.readouterr().out == "logs 42\n"
+
+    def test_invalid_template(self, shared_path, usage_snapshot):
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot())
+
+        with pytest.raises(SystemExit):
+            stats.main(['--plan', 'pro', '--template', '{unknown}'])
+
+    def test_decoder_choices_match_decoders(self):
+        assert set(stats.JSON_DECODERS) == set(DECODERS)
+
+    def test_import_skips_parsing_modules(self):
+        """The shared snapshot path must not pay for the pool, sqlite or JSON backends"""
+        code = ("import sys, sumonitor.stats; "
+                "print(sorted(m for m in ('multiprocessing', 'concurrent.futures', 'sqlite3', "
+                "'msgspec', 'orjson', 'pexpect', 'sumonitor.data.decoder') if m in sys.modules))")
+        src = os.path.dirname(os.path.dirname(stats.__file__))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [src, os.environ.get("PYTHONPATH")])))
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                check=True, env=env)
+
+        assert result.stdout.strip() == "[]"
+
+    def test_dispatched_from_sumonitor(self, shared_path, capsys, usage_snapshot):
+        from sumonitor.main import main
+        SharedSnapshotWriter(shared_path).publish(usage_snapshot())
+
+        with patch('sys.argv', ['sumonitor', 'stats', '--plan', 'pro', '--format', 'json']), \
+             pytest.raises(SystemExit) as exit_info:
+            main()
+
+        assert exit_info.value.code == 0
+        assert json.loads(capsys.readouterr().out)["total_tokens"] == 1500
@@ -1,15 +1,26 @@
 """Tests for terminal_handler.py - Terminal rendering and overlay management"""
 
 import pytest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock, MagicMock, PropertyMock, patch
+from dataclasses import FrozenInstanceError
+import os
 import struct
 import threading
 import time
 
-from sumonitor.terminal.terminal_handler import TerminalHandler
+from sumonitor.terminal.terminal_handler import FULL_REDRAW_INTERVAL, TerminalHandler
+from sumonitor.terminal.refresh_scheduler import BOUNDARY_SLACK, RefreshScheduler
 from sumonitor.data.log_reader import LogReader
 
 
+def threaded_handler(pexpect_obj, **kwargs):
+    """Handler running its threads against a reader and watcher that never find usage,
+    so the threads neither parse the real ~/.claude/projects nor draw into stdout"""
+    log_reader = Mock(spec=LogReader, parse_new_entries=Mock(return_value=[]))
+    kwargs.setdefault('watcher', Mock(wait=Mock(return_value=set())))
+    return TerminalHandler(log_reader, pexpect_obj, **kwargs)
+
+
 class TestTerminalSize:
     """Test get_terminal_size() system call"""
     # mocker is automatically injected by pytest when you include it as a parameter
@@ -18,7 +29,7 @@ class TestTerminalSize:
         mock_pexpect = Mock()
         mock_pexpect.closed = False
 
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         mock_ioctl = mocker.patch('fcntl.ioctl')
         mock_ioctl.return_value = struct.pack('hhhh', 24, 80, 0, 0)
@@ -33,7 +44,7 @@ class TestTerminalSize:
         mock_pexpect = Mock()
         mock_pexpect.closed = False
 
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         mock_ioctl = mocker.patch('fcntl.ioctl')
         mock_ioctl.return_value = struct.pack('hhhh', 50, 120, 0, 0)
@@ -53,7 +64,7 @@ class TestOnResize:
         mock_pexpect.closed = False
         mock_pexpect.setwinsize = Mock()
 
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         mocker.patch.object(handler, 'get_terminal_size', return_value=(30, 100))
 
@@ -67,7 +78,7 @@ class TestOnResize:
         mock_pexpect.closed = True
         mock_pexpect.setwinsize = Mock()
 
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         handler.on_resize(None, None)
 
@@ -80,14 +91,14 @@ class TestOverlayDataFormatting:
     def test_formats_with_all_metrics(self, mocker, mock_usage_entry):
         """Should format tokens, cost, messages, reset time"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1, input_tokens=1000, output_tokens=500, cost=1.50)
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result = handler.get_overlay_data()
 
@@ -99,12 +110,12 @@ class TestOverlayDataFormatting:
     def test_returns_empty_when_no_data(self):
         """Should return empty string when no usage data"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = []
+        mock_log_reader.parse_new_entries.return_value = []
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result = handler.get_overlay_data()
 
@@ -113,14 +124,14 @@ class TestOverlayDataFormatting:
     def test_displays_pro_plan_limits(self, mocker, mock_usage_entry):
         """Should display PRO plan limits in overlay"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1, input_tokens=1000, output_tokens=500)
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result = handler.get_overlay_data()
 
@@ -132,14 +143,14 @@ class TestOverlayDataFormatting:
     def test_formats_cost_with_two_decimals(self, mock_usage_entry):
         """Cost should be formatted with 2 decimal places"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1, cost=1.5)
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result = handler.get_overlay_data()
 
@@ -151,22 +162,24 @@ class TestDrawOverlay:
 
     def test_thread_starts_as_daemon(self, mock_pexpect):
         """Overlay thread should be daemon thread"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = threaded_handler(mock_pexpect)
 
         assert handler.overlay_thread.daemon is True
 
     def test_thread_is_alive_after_init(self, mock_pexpect):
         """Thread should be running after initialization"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = threaded_handler(mock_pexpect)
 
         assert handler.overlay_thread.is_alive()
 
     def test_thread_exits_when_process_closes(self, mock_pexpect):
         """Thread should exit when pexpect process closes"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = threaded_handler(mock_pexpect)
 
         # Simulate process closing
         mock_pexpect.closed = True
+        # without a session the renderer sleeps FULL_REDRAW_INTERVAL, wake it
+        handler.redraw.set()
 
         # Wait for thread to notice (max 3 seconds)
         handler.overlay_thread.join(timeout=3)
@@ -180,14 +193,14 @@ class TestOverlayRendering:
     def test_truncates_to_terminal_width(self, mocker, mock_usage_entry):
         """Overlay text should be truncated to terminal width"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1, input_tokens=1000, output_tokens=500)
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         # Mock terminal size to 40 columns
         mocker.patch.object(handler, 'get_terminal_size', return_value=(24, 40))
@@ -203,7 +216,7 @@ class TestOverlayRendering:
     def test_writes_to_stdout(self, mocker, mock_usage_entry):
         """Should write overlay bytes to stdout"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1)
         ]
 
@@ -213,7 +226,7 @@ class TestOverlayRendering:
         mock_stdout_write = mocker.patch('sys.stdout.write')
         mock_stdout_flush = mocker.patch('sys.stdout.flush')
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, watcher=Mock())
 
         # Give thread brief time to execute once before closing
         time.sleep(0.1)
@@ -227,13 +240,13 @@ class TestInitialization:
 
     def test_sets_in_alt_screen_false(self, mock_pexpect):
         """in_alt_screen should default to False"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         assert handler.in_alt_screen is False
 
     def test_stores_pexpect_reference(self, mock_pexpect):
         """Should store reference to pexpect object"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = TerminalHandler(LogReader(), mock_pexpect, threaded=False)
 
         assert handler.p is mock_pexpect
 
@@ -243,13 +256,13 @@ class TestInitialization:
         mock_pexpect = Mock()
         mock_pexpect.closed = False
 
-        handler = TerminalHandler(log_reader, mock_pexpect)
+        handler = TerminalHandler(log_reader, mock_pexpect, threaded=False)
 
         assert handler.log_reader is log_reader
 
     def test_starts_overlay_thread(self, mock_pexpect):
         """Should start overlay thread during initialization"""
-        handler = TerminalHandler(LogReader(), mock_pexpect)
+        handler = threaded_handler(mock_pexpect)
 
         assert handler.overlay_thread is not None
         assert isinstance(handler.overlay_thread, threading.Thread)
@@ -262,14 +275,14 @@ class TestEdgeCases:
         """Should handle overlay text longer than terminal width"""
         mock_log_reader = Mock(spec=LogReader)
         # Create many entries to generate long text
-        mock_log_reader.parse_json_files.return_value = [
+        mock_log_reader.parse_new_entries.return_value = [
             mock_usage_entry(hours_ago=1, input_tokens=100000, output_tokens=50000)
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         mocker.patch.object(handler, 'get_terminal_size', return_value=(24, 20))
 
@@ -281,12 +294,12 @@ class TestEdgeCases:
     def test_handles_empty_log_reader(self):
         """Should handle LogReader with no entries"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = []
+        mock_log_reader.parse_new_entries.return_value = []
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result = handler.get_overlay_data()
 
@@ -295,14 +308,15 @@ class TestEdgeCases:
     def test_overlay_data_called_repeatedly(self, mocker, mock_usage_entry):
         """get_overlay_data() should work when called multiple times"""
         mock_log_reader = Mock(spec=LogReader)
-        mock_log_reader.parse_json_files.return_value = [
-            mock_usage_entry(hours_ago=1)
+        # first call parses the entry, later calls find nothing new
+        mock_log_reader.parse_new_entries.side_effect = [
+            [mock_usage_entry(hours_ago=1)], [], []
         ]
 
         mock_pexpect = Mock()
         mock_pexpect.closed = True  # Prevent background thread from running
 
-        handler = TerminalHandler(mock_log_reader, mock_pexpect)
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
 
         result1 = handler.get_overlay_data()
         result2 = handler.get_overlay_data()
@@ -311,3 +325,270 @@ class TestEdgeCases:
         # Should return consistent results
         assert result1 == result2 == result3
         assert len(result1) > 0
+
+
+class TestRefreshOnChange:
+    """Test that logs are only reparsed when asked to"""
+
+    def test_refresh_false_reuses_last_parse(self, mock_usage_entry):
+        """get_overlay_data(refresh=False) should not parse logs again"""
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1)]
+
+        mock_pexpect = Mock()
+        mock_pexpect.closed = True  # Prevent background thread from running
+
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
+
+        first = handler.get_overlay_data()
+        second = handler.get_overlay_data(refresh=False)
+
+        assert mock_log_reader.parse_new_entries.call_count == 1
+        assert first == second
+
+    def test_new_entries_added_to_existing_sessions(self, mock_usage_entry):
+        """Entries from later parses should be added to the tracked session"""
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.side_effect = [
+            [mock_usage_entry(hours_ago=1)],
+            [mock_usage_entry(hours_ago=0.5)],
+        ]
+
+        mock_pexpect = Mock()
+        mock_pexpect.closed = True  # Prevent background thread from running
+
+        handler = TerminalHandler(mock_log_reader, mock_pexpect, threaded=False)
+
+        handler.get_overlay_data()
+        result = handler.get_overlay_data()
+
+        assert "Messages: 2/" in result
+        assert len(handler.session_tracker.sessions) == 1
+
+    def test_uses_injected_watcher(self, mock_pexpect):
+        """A watcher passed in should be used instead of creating one"""
+        watcher = Mock()
+        watcher.wait.return_value = set()
+
+        handler = threaded_handler(mock_pexpect, watcher=watcher)
+
+        assert handler.watcher is watcher
+        mock_pexpect.closed = True
+        handler.redraw.set()
+        handler.overlay_thread.join(timeout=3)
+
+
+class TestSnapshotHandoff:
+    """Test the reader thread / renderer split"""
+
+    @staticmethod
+    def _closes_after(checks):
+        """pexpect mock whose closed flag turns True after a number of checks"""
+        mock_pexpect = Mock()
+        type(mock_pexpect).closed = PropertyMock(side_effect=[False] * checks + [True] * 10)
+        return mock_pexpect
+
+    def test_starts_reader_thread(self, mock_pexpect):
+        handler = threaded_handler(mock_pexpect)
+
+        assert handler.reader_thread.daemon is True
+        mock_pexpect.closed = True
+        handler.reader_thread.join(timeout=3)
+        assert not handler.reader_thread.is_alive()
+
+    def test_snapshot_is_immutable(self, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1, input_tokens=10)]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+
+        snapshot = handler.build_snapshot()
+
+        assert snapshot.session_messages == 1
+        with pytest.raises(FrozenInstanceError):
+            snapshot.total_tokens = 0
+
+    def test_format_without_snapshot(self):
+        handler = TerminalHandler(Mock(spec=LogReader), Mock(closed=True), watcher=Mock(), threaded=False)
+
+        assert handler.format_overlay(None) == ""
+
+    def test_read_logs_publishes_snapshot(self, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1)]
+        watcher = Mock()
+        watcher.wait.return_value = set()
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=watcher, threaded=False)
+        handler.p = self._closes_after(1)
+
+        handler.read_logs()
+
+        assert handler.snapshot.session_messages == 1
+        assert handler.redraw.is_set()
+        watcher.close.assert_called()
+
+    def test_renderer_draws_published_snapshot_without_parsing(self, mocker, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1)]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+        handler.publish(handler.build_snapshot())
+        mock_log_reader.parse_new_entries.reset_mock()
+
+        mocker.patch.object(handler, 'cached_terminal_size', return_value=(24, 200))
+        write = mocker.patch('sys.stdout.write')
+        mocker.patch('sys.stdout.flush')
+        handler.p = self._closes_after(1)
+
+        handler.draw_overlay()
+
+        mock_log_reader.parse_new_entries.assert_not_called()
+        assert "Messages: 1/" in write.call_args.args[0]
+        assert not handler.redraw.is_set()
+
+
+class TestFrameDiff:
+    """Test render_frame() skipping and shrinking redraws"""
+
+    @pytest.fixture
+    def handler(self):
+        return TerminalHandler(Mock(spec=LogReader), Mock(closed=True), watcher=Mock(), threaded=False)
+
+    def test_first_frame_draws_whole_line(self, handler):
+        frame = handler.render_frame("Tokens: 10 | Session reset in: 4m 10s", 24, 80)
+
+        assert frame == "\x1b[s\x1b[24;1H\x1b[KTokens: 10 | Session reset in: 4m 10s\x1b[u"
+
+    def test_identical_frame_is_skipped(self, handler):
+        handler.render_frame("Tokens: 10", 24, 80)
+
+        assert handler.render_frame("Tokens: 10", 24, 80) is None
+
+    def test_countdown_change_rewrites_only_the_tail(self, handler):
+        handler.render_frame("Tokens: 10 | Session reset in: 4m 10s", 24, 80)
+
+        frame = handler.render_frame("Tokens: 10 | Session reset in: 4m 9s", 24, 80)
+
+        assert frame == "\x1b[s\x1b[24;35H\x1b[K9s\x1b[u"
+
+    def test_full_width_line_is_cleared_before_writing(self, handler):
+        frame = handler.render_frame("x" * 80, 24, 80)
+
+        # erasing after the text would take the last column with it
+        assert frame.endswith("x" * 80 + "\x1b[u")
+
+    def test_resize_redraws_whole_line(self, handler):
+        handler.render_frame("Tokens: 10", 24, 80)
+
+        assert handler.render_frame("Tokens: 10", 30, 100) == "\x1b[s\x1b[30;1H\x1b[KTokens: 10\x1b[u"
+
+    def test_unchanged_frame_repainted_after_interval(self, handler):
+        with patch('sumonitor.terminal.terminal_handler.time.monotonic', side_effect=[100.0, 105.0, 111.0]):
+            handler.render_frame("Tokens: 10", 24, 80)
+            assert handler.render_frame("Tokens: 10", 24, 80) is None
+            assert handler.render_frame("Tokens: 10", 24, 80) is not None
+
+    def test_draw_overlay_writes_unchanged_frame_once(self, mocker, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1)]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+        handler.publish(handler.build_snapshot())
+        mocker.patch.object(handler, 'cached_terminal_size', return_value=(24, 30))
+        mocker.patch.object(handler.redraw, 'wait')
+        write = mocker.patch('sys.stdout.write')
+        mocker.patch('sys.stdout.flush')
+        handler.p = Mock()
+        type(handler.p).closed = PropertyMock(side_effect=[False, False, False, True])
+
+        handler.draw_overlay()
+
+        # text cut to 30 columns leaves out the countdown, so nothing changes after the first frame
+        assert write.call_count == 1
+
+
+class TestTerminalSizeCache:
+    """Test the terminal size cache refreshed on SIGWINCH"""
+
+    @pytest.fixture
+    def handler(self):
+        return TerminalHandler(Mock(spec=LogReader), Mock(closed=True), watcher=Mock(), threaded=False)
+
+    def test_size_queried_once(self, handler, mocker):
+        query = mocker.patch.object(handler, 'get_terminal_size', return_value=(24, 80))
+
+        assert handler.cached_terminal_size() == (24, 80)
+        assert handler.cached_terminal_size() == (24, 80)
+        query.assert_called_once()
+
+    def test_resize_updates_cache_and_wakes_renderer(self, handler, mocker):
+        handler.terminal_size = (24, 80)
+        handler.p = Mock(closed=False)
+        mocker.patch.object(handler, 'get_terminal_size', return_value=(40, 120))
+
+        handler.on_resize(None, None)
+
+        assert handler.cached_terminal_size() == (40, 120)
+        assert handler.redraw.is_set()
+        handler.p.setwinsize.assert_called_once_with(40, 120)
+
+    def test_falls_back_when_stdout_is_not_a_terminal(self, handler, mocker):
+        mocker.patch.object(handler, 'get_terminal_size', side_effect=OSError)
+        mocker.patch('shutil.get_terminal_size', return_value=os.terminal_size((100, 30)))
+
+        assert handler.cached_terminal_size() == (30, 100)
+
+    def test_drawing_makes_no_ioctl(self, mocker, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=1)]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+        handler.publish(handler.build_snapshot())
+        handler.terminal_size = (24, 200)
+        ioctl = mocker.patch('fcntl.ioctl')
+        mocker.patch.object(handler.redraw, 'wait')
+        mocker.patch('sys.stdout.write')
+        mocker.patch('sys.stdout.flush')
+        handler.p = Mock()
+        type(handler.p).closed = PropertyMock(side_effect=[False, False, True])
+
+        handler.draw_overlay()
+
+        ioctl.assert_not_called()
+
+
+class TestAdaptiveRefresh:
+    """Test the handler's use of the RefreshScheduler"""
+
+    def test_new_entries_mark_activity(self, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.side_effect = [[], [mock_usage_entry(hours_ago=1)]]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+
+        handler.build_snapshot()
+        assert not handler.scheduler.is_active()
+
+        handler.build_snapshot()
+        assert handler.scheduler.is_active()
+
+    def test_reader_waits_for_poll_interval(self):
+        watcher = Mock()
+        watcher.wait.return_value = set()
+        scheduler = RefreshScheduler(idle_interval=7.0)
+        handler = TerminalHandler(Mock(spec=LogReader, parse_new_entries=Mock(return_value=[])),
+                                  Mock(closed=True), watcher=watcher, scheduler=scheduler, threaded=False)
+        handler.p = Mock()
+        type(handler.p).closed = PropertyMock(side_effect=[False, True])
+
+        handler.read_logs()
+
+        watcher.wait.assert_called_once_with(timeout=7.0)
+
+    def test_redraw_delay_without_session(self):
+        handler = TerminalHandler(Mock(spec=LogReader), Mock(closed=True), watcher=Mock(), threaded=False)
+
+        assert handler.redraw_delay() == FULL_REDRAW_INTERVAL
+
+    def test_redraw_delay_follows_countdown(self, mock_usage_entry):
+        mock_log_reader = Mock(spec=LogReader)
+        mock_log_reader.parse_new_entries.return_value = [mock_usage_entry(hours_ago=4.9)]
+        handler = TerminalHandler(mock_log_reader, Mock(closed=True), watcher=Mock(), threaded=False)
+        handler.publish(handler.build_snapshot())
+
+        assert 0 < handler.redraw_delay() <= 1.0 + BOUNDARY_SLACK
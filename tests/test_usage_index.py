@@ -0,0 +1,259 @@
+"""Tests for usage_index.py - persistent cursors and usage rows"""
+
+import pytest
+import sqlite3
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from sumonitor.data.log_reader import LogReader, FileCursor
+from sumonitor.data.usage_index import UsageIndex
+from sumonitor.session.session_tracker import SessionTracker
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = UsageIndex(str(tmp_path / "cache" / "usage_index.db"))
+    yield idx
+    idx.close()
+
+
+class TestUsageIndex:
+    """Test saving and loading cursors and rows"""
+
+    def test_creates_cache_directory(self, tmp_path):
+        """Index should create its parent directory"""
+        idx = UsageIndex(str(tmp_path / "nested" / "dir" / "index.db"))
+        idx.close()
+
+        assert (tmp_path / "nested" / "dir" / "index.db").exists()
+
+    def test_round_trips_cursors(self, index):
+        """Saved cursors should be loaded back unchanged"""
+        index.save({"/a.jsonl": FileCursor(inode=1, size=20, offset=10)}, [])
+
+        assert index.load_cursors() == {"/a.jsonl": FileCursor(inode=1, size=20, offset=10)}
+
+    def test_none_cursor_deletes_entry(self, index):
+        """Cursor saved as None should remove the stored cursor"""
+        index.save({"/a.jsonl": FileCursor(inode=1, size=20, offset=10)}, [])
+        index.save({"/a.jsonl": None}, [])
+
+        assert index.load_cursors() == {}
+
+    def test_round_trips_usage_rows(self, index, mock_usage_entry):
+        """Saved rows should be loaded back with UTC timestamps"""
+        entry = mock_usage_entry(hours_ago=1, input_tokens=300, cost=0.5)
+        index.save({}, [(101, entry)])
+
+        rows = index.load_usage(since=datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert len(rows) == 1
+        unique_id, loaded = rows[0]
+        assert unique_id == 101
+        assert loaded.input_tokens == 300
+        assert loaded.cost == pytest.approx(0.5)
+        assert loaded.timestamp == pytest.approx(entry.timestamp, abs=timedelta(milliseconds=1))
+        assert loaded.timestamp.tzinfo == timezone.utc
+
+    def test_save_reports_failure(self, index, mock_usage_entry):
+        """A rolled back save should return False"""
+        with patch.object(index, '_save', side_effect=sqlite3.OperationalError("database is locked")):
+            assert not index.save({}, [(101, mock_usage_entry(hours_ago=1))])
+
+        assert index.save({}, [(101, mock_usage_entry(hours_ago=1))])
+
+    def test_duplicate_rows_ignored(self, index, mock_usage_entry):
+        """Saving a row with an existing unique id should not add another row"""
+        entry = mock_usage_entry(hours_ago=1)
+        index.save({}, [(101, entry)])
+        index.save({}, [(101, entry)])
+
+        assert len(index.load_usage(since=datetime.now(timezone.utc) - timedelta(hours=5))) == 1
+
+    def test_load_usage_drops_rows_before_cutoff(self, index, mock_usage_entry):
+        """Rows older than the cutoff should not be loaded"""
+        index.save({}, [
+            (1, mock_usage_entry(hours_ago=10)),
+            (2, mock_usage_entry(hours_ago=1)),
+        ])
+
+        rows = index.load_usage(since=datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert [unique_id for unique_id, _ in rows] == [2]
+
+    def test_keys_round_trip_full_64_bit_range(self, index, mock_usage_entry):
+        """Negative and large DedupStore keys should be stored exactly"""
+        keys = [-(2**63), 2**63 - 1]
+        index.save({}, [(key, mock_usage_entry(hours_ago=1)) for key in keys])
+
+        rows = index.load_usage(since=datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert sorted(unique_id for unique_id, _ in rows) == keys
+
+    def test_round_trips_session(self, index, mock_usage_entry):
+        """A session saved with the cursors should be loaded back unchanged"""
+        tracker = SessionTracker()
+        tracker.build_sessions([mock_usage_entry(hours_ago=2, cost=0.5),
+                                mock_usage_entry(hours_ago=1, model="claude-opus-4-1")])
+        index.save({"/a.jsonl": FileCursor(inode=1, size=20, offset=20)}, [], tracker.last_summary())
+
+        assert index.load_session() == tracker.last_summary()
+
+    def test_save_without_session_drops_it(self, index, mock_usage_entry):
+        """Cursors saved without a session would no longer match the saved one"""
+        tracker = SessionTracker()
+        tracker.build_sessions([mock_usage_entry(hours_ago=1)])
+        index.save({}, [], tracker.last_summary())
+
+        index.save({"/a.jsonl": FileCursor(inode=1, size=20, offset=20)}, [])
+
+        assert index.load_session() is None
+
+    def test_load_keys(self, index, mock_usage_entry):
+        """Only keys of rows from since_ms on should be returned"""
+        old, new = mock_usage_entry(hours_ago=10), mock_usage_entry(hours_ago=1)
+        index.save({}, [(1, old), (2, new)])
+
+        assert index.load_keys(since_ms=new.timestamp_ms) == [(2, new.timestamp_ms)]
+
+    def test_reading_writes_nothing(self, index):
+        """A read transaction should end without committing"""
+        with index.reading():
+            index.load_cursors()
+
+        assert not index.conn.in_transaction
+        assert index.conn.total_changes == 0
+
+    def test_old_schema_version_rebuilt(self, tmp_path):
+        """An index written with another schema version should be cleared"""
+        path = str(tmp_path / "index.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE usage (unique_id TEXT PRIMARY KEY)")
+        conn.execute("INSERT INTO usage VALUES ('msg:req')")
+        conn.commit()
+        conn.close()
+
+        idx = UsageIndex(path)
+
+        assert idx.load_usage(since=datetime.now(timezone.utc) - timedelta(hours=5)) == []
+        idx.close()
+
+    def test_recovers_from_corrupt_file(self, tmp_path):
+        """A corrupt database file should be replaced with a fresh index"""
+        path = tmp_path / "index.db"
+        path.write_bytes(b"definitely not sqlite" * 100)
+
+        idx = UsageIndex(str(path))
+
+        assert idx.load_cursors() == {}
+        idx.close()
+
+
+class TestLogReaderWithIndex:
+    """Test LogReader restoring state from the index on a new launch"""
+
+    def test_restart_does_not_reparse_history(self, index, temp_jsonl_dir, usage_line):
+        """New reader should load rows from the index and skip unchanged files"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n" + usage_line("msg_2") + "\n")
+
+        first = LogReader(index=index)
+        with patch.object(first, 'get_jsonl_files', return_value=[jsonl_file]):
+            first.parse_json_files()
+
+        second = LogReader(index=index)
+        with patch.object(second, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch('builtins.open') as mock_open:
+                usage_data = second.parse_json_files()
+
+        mock_open.assert_not_called()
+        assert len(usage_data) == 2
+
+    def test_restart_parses_only_delta(self, index, temp_jsonl_dir, usage_line):
+        """Lines appended between runs should be parsed on the next launch"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        first = LogReader(index=index)
+        with patch.object(first, 'get_jsonl_files', return_value=[jsonl_file]):
+            first.parse_json_files()
+
+        with open(jsonl_file, "a") as f:
+            f.write(usage_line("msg_2") + "\n")
+
+        second = LogReader(index=index)
+        with patch.object(second, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch.object(second.decoder, 'decode', wraps=second.decoder.decode) as loads:
+                usage_data = second.parse_json_files()
+
+        assert loads.call_count == 1
+        assert len(usage_data) == 2
+
+    def test_restored_entries_deduplicated(self, index, temp_jsonl_dir, usage_line):
+        """A copy of an indexed entry in another file should not be counted twice"""
+        first_file = temp_jsonl_dir / "first.jsonl"
+        first_file.write_text(usage_line("msg_1") + "\n")
+
+        first = LogReader(index=index)
+        with patch.object(first, 'get_jsonl_files', return_value=[first_file]):
+            first.parse_json_files()
+
+        resumed_file = temp_jsonl_dir / "resumed.jsonl"
+        resumed_file.write_text(usage_line("msg_1") + "\n")
+
+        second = LogReader(index=index)
+        with patch.object(second, 'get_jsonl_files', return_value=[first_file, resumed_file]):
+            usage_data = second.parse_json_files()
+
+        assert len(usage_data) == 1
+
+    def test_restored_rows_returned_as_new_entries(self, index, temp_jsonl_dir, usage_line):
+        """First parse_new_entries() after a restart should include indexed rows"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        first = LogReader(index=index)
+        with patch.object(first, 'get_jsonl_files', return_value=[jsonl_file]):
+            first.parse_new_entries()
+
+        second = LogReader(index=index)
+        with patch.object(second, 'get_jsonl_files', return_value=[jsonl_file]):
+            restored = second.parse_new_entries()
+            again = second.parse_new_entries()
+
+        assert len(restored) == 1
+        assert again == []
+
+    def test_failed_save_retried_on_next_parse(self, index, temp_jsonl_dir, usage_line):
+        """Rows from a save that failed should be written with the next one"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        first = LogReader(index=index)
+        with patch.object(first, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch.object(index, '_save', side_effect=sqlite3.OperationalError("database is locked")):
+                first.parse_new_entries()
+            with open(jsonl_file, "a") as f:
+                f.write(usage_line("msg_2") + "\n")
+            first.parse_new_entries()
+
+        second = LogReader(index=index)
+        with patch.object(second, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch('builtins.open') as mock_open:
+                restored = second.parse_new_entries()
+
+        mock_open.assert_not_called()
+        assert len(restored) == 2
+
+    def test_unreadable_index_falls_back_to_parsing(self, index, temp_jsonl_dir, usage_line):
+        """A locked index on launch should be dropped rather than stop the reader"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        jsonl_file.write_text(usage_line("msg_1") + "\n")
+
+        reader = LogReader(index=index)
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            with patch.object(index, 'load_usage', side_effect=sqlite3.OperationalError("database is locked")):
+                usage_data = reader.parse_new_entries()
+
+        assert len(usage_data) == 1
+        assert reader.index is None
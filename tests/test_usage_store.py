@@ -0,0 +1,146 @@
+"""Tests for usage_store.py - columnar UsageData storage and window sums"""
+
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+from sumonitor.data import usage_store
+from sumonitor.data.log_reader import LogReader, UsageData
+from sumonitor.data.usage_store import UsageColumns
+
+
+@pytest.fixture(params=["builtin", "numpy"])
+def columns(request):
+    """UsageColumns using either the builtin sum or NumPy"""
+    if request.param == "numpy":
+        np = pytest.importorskip("numpy")
+        with patch.object(usage_store, "np", np):
+            yield UsageColumns()
+    else:
+        with patch.object(usage_store, "np", None):
+            yield UsageColumns()
+
+
+class TestColumns:
+    """Test appending rows and reading them back"""
+
+    def test_row_round_trip(self, columns, mock_usage_entry):
+        """A stored row should materialize back to an equal UsageData"""
+        entry = mock_usage_entry(hours_ago=1, input_tokens=123, output_tokens=45,
+                                 cache_write=6, cache_read=7, cost=0.25)
+        columns.append(entry)
+
+        row = columns.row(0)
+
+        assert row.model == entry.model
+        assert (row.input_tokens, row.output_tokens) == (123, 45)
+        assert (row.cache_write_tokens, row.cache_read_tokens) == (6, 7)
+        assert row.cost == pytest.approx(0.25)
+        assert row.timestamp == pytest.approx(entry.timestamp, abs=timedelta(milliseconds=1))
+
+    def test_models_are_interned(self, columns, mock_usage_entry):
+        """Each distinct model name should be stored once"""
+        for _ in range(3):
+            columns.append(mock_usage_entry(model="claude-sonnet-4-5"))
+        columns.append(mock_usage_entry(model="claude-opus-4-5"))
+
+        assert columns.models == ["claude-sonnet-4-5", "claude-opus-4-5"]
+        assert list(columns.model_ids) == [0, 0, 0, 1]
+
+    def test_out_of_order_rows_kept_sorted(self, columns, mock_usage_entry):
+        """Rows should stay in timestamp order regardless of insert order"""
+        columns.extend([mock_usage_entry(hours_ago=1, input_tokens=1)])
+        columns.append(mock_usage_entry(hours_ago=3, input_tokens=3))
+        columns.append(mock_usage_entry(hours_ago=2, input_tokens=2))
+
+        assert list(columns.input_tokens) == [3, 2, 1]
+        assert list(columns.timestamps) == sorted(columns.timestamps)
+
+
+class TestWindowTotals:
+    """Test window_totals() and window_totals_by_model()"""
+
+    def test_sums_only_rows_in_window(self, columns, mock_usage_entry):
+        columns.extend([
+            mock_usage_entry(hours_ago=10, input_tokens=1000, output_tokens=1000, cost=10.0),
+            mock_usage_entry(hours_ago=2, input_tokens=100, output_tokens=50, cost=1.0),
+            mock_usage_entry(hours_ago=1, input_tokens=200, output_tokens=25, cache_read=5, cost=0.5),
+        ])
+
+        totals = columns.window_totals(datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert totals.input_tokens == 300
+        assert totals.output_tokens == 75
+        assert totals.cache_read_tokens == 5
+        assert totals.cost == pytest.approx(1.5)
+        assert totals.messages == 2
+
+    def test_end_bound_is_inclusive(self, columns, mock_usage_entry):
+        entry = mock_usage_entry(hours_ago=1)
+        columns.append(entry)
+
+        totals = columns.window_totals(entry.timestamp - timedelta(hours=1), entry.timestamp)
+
+        assert totals.messages == 1
+
+    def test_empty_window(self, columns):
+        totals = columns.window_totals(datetime.now(timezone.utc))
+
+        assert totals.messages == 0
+        assert totals.cost == 0.0
+
+    def test_totals_by_model(self, columns, mock_usage_entry):
+        columns.extend([
+            mock_usage_entry(hours_ago=2, input_tokens=100, cost=1.0, model="claude-sonnet-4-5"),
+            mock_usage_entry(hours_ago=1.5, input_tokens=200, cost=2.0, model="claude-opus-4-5"),
+            mock_usage_entry(hours_ago=1, input_tokens=300, cost=3.0, model="claude-sonnet-4-5"),
+            mock_usage_entry(hours_ago=20, input_tokens=999, model="claude-haiku-4-5"),
+        ])
+
+        by_model = columns.window_totals_by_model(datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert set(by_model) == {"claude-sonnet-4-5", "claude-opus-4-5"}
+        assert by_model["claude-sonnet-4-5"].input_tokens == 400
+        assert by_model["claude-sonnet-4-5"].messages == 2
+        assert by_model["claude-opus-4-5"].cost == pytest.approx(2.0)
+
+    def test_evict_before_drops_old_rows(self, columns, mock_usage_entry):
+        columns.extend([mock_usage_entry(hours_ago=10), mock_usage_entry(hours_ago=1)])
+
+        columns.evict_before(datetime.now(timezone.utc) - timedelta(hours=5))
+
+        assert len(columns) == 1
+        assert len(columns.cost) == len(columns.model_ids) == 1
+
+
+class TestLogReaderColumns:
+    """Test LogReader filling an optional UsageColumns store"""
+
+    def test_parsed_entries_are_added(self, temp_jsonl_dir, usage_line):
+        """Entries parsed by LogReader should also land in the columns"""
+        jsonl_file = temp_jsonl_dir / "session.jsonl"
+        lines = [usage_line(f"msg_{i}") for i in range(3)]
+        jsonl_file.write_text("\n".join(lines) + "\n")
+
+        columns = UsageColumns()
+        reader = LogReader(columns=columns)
+        with patch.object(reader, 'get_jsonl_files', return_value=[jsonl_file]):
+            reader.parse_json_files()
+            usage_data = reader.parse_json_files()
+
+        assert len(columns) == 3
+        assert columns.window_totals(datetime.now(timezone.utc) - timedelta(hours=5)).input_tokens == 300
+        # rows are only kept in the columns, parse_json_files materializes them
+        assert reader.usage_data == []
+        assert [entry.input_tokens for entry in usage_data] == [100] * 3
+
+
+class TestSlots:
+    """Test UsageData uses __slots__"""
+
+    def test_usage_data_has_no_instance_dict(self, mock_usage_entry):
+        entry = mock_usage_entry()
+
+        assert not hasattr(entry, "__dict__")
+        with pytest.raises(AttributeError):
+            entry.unexpected = 1